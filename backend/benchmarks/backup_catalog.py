@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Backup Catalog Benchmark
+Query latency of the backup catalog over a large synthetic archive
+
+Builds --backups backup directories of --partitions small files each across
+--devices devices in a temporary directory, indexes them, then times the
+lookups the API serves. Nothing outside the temporary directory is touched.
+
+    python3 backend/benchmarks/backup_catalog.py
+    python3 backend/benchmarks/backup_catalog.py --backups 5000 --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from plugins.mtk_tool.backup_catalog import BackupCatalog  # noqa: E402
+
+PARTITIONS = ['preloader', 'boot', 'vbmeta', 'recovery', 'lk', 'seccfg', 'nvram',
+              'nvdata', 'persist', 'metadata', 'super', 'userdata', 'md1img', 'dtbo',
+              'tee', 'logo', 'frp', 'proinfo', 'protect1', 'protect2']
+
+
+def build_archive(root: str, backups: int, partitions: int, devices: int) -> BackupCatalog:
+    catalog = BackupCatalog(os.path.join(root, 'catalog.db'), root=root)
+    start = time.time() - backups * 3600
+    for i in range(backups):
+        path = os.path.join(root, 'mtk_dump', f'backup-{i:06d}')
+        os.makedirs(path)
+        for name in PARTITIONS[:partitions]:
+            with open(os.path.join(path, f'{name}.img'), 'wb') as f:
+                # Vary one partition per backup so hash lookups have a single match
+                f.write(f'{name}:{i if name == "boot" else 0}'.encode())
+        device = {'detected': True, 'usb_id': '0e8d:2000',
+                  'chipset': f'MT67{i % 10:02d}', 'serial': f'SN{i % devices:04d}'}
+        catalog.record_backup(path, device, source='benchmark', created_at=start + i * 3600)
+    return catalog
+
+
+def time_ms(fn, repeat: int) -> dict:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {'median_ms': round(statistics.median(samples), 3),
+            'max_ms': round(max(samples), 3)}
+
+
+def run(backups: int, partitions: int, devices: int, repeat: int) -> dict:
+    with tempfile.TemporaryDirectory() as root:
+        started = time.perf_counter()
+        catalog = build_archive(root, backups, partitions, devices)
+        index_s = time.perf_counter() - started
+
+        device_id = '0e8d:2000/SN0001'
+        boot_hash = catalog.query(partition='boot', limit=1)['backups'][0]['id']
+        boot_hash = {p['name']: p['sha256'] for p in catalog.get(boot_hash)['partitions']}['boot']
+        midpoint = time.time() - backups * 1800
+
+        queries = {
+            'newest_page': lambda: catalog.query(limit=50),
+            'by_device': lambda: catalog.query(device_id=device_id),
+            'by_chipset_since': lambda: catalog.query(chipset='MT6705', since=midpoint),
+            'by_partition_hash': lambda: catalog.query(sha256=boot_hash),
+            'get_one': lambda: catalog.get(backups // 2),
+            'devices': catalog.devices,
+            'retention_plan': lambda: catalog.expired(keep_last=3)
+        }
+        report = {
+            'backups': backups,
+            'partitions_per_backup': partitions,
+            'devices': devices,
+            'index_s': round(index_s, 2),
+            'queries': {name: time_ms(fn, repeat) for name, fn in queries.items()}
+        }
+        catalog.close()
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark backup catalog queries')
+    parser.add_argument('--backups', type=int, default=2000)
+    parser.add_argument('--partitions', type=int, default=len(PARTITIONS))
+    parser.add_argument('--devices', type=int, default=50)
+    parser.add_argument('-n', '--repeat', type=int, default=20)
+    parser.add_argument('--json', action='store_true', help='print the raw report')
+    args = parser.parse_args(argv)
+
+    report = run(args.backups, min(args.partitions, len(PARTITIONS)), args.devices, args.repeat)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{report['backups']} backups x {report['partitions_per_backup']} partitions, "
+          f"{report['devices']} devices (indexed in {report['index_s']}s)")
+    for name, stats in report['queries'].items():
+        print(f"  {name:<20} median {stats['median_ms']:>8.3f} ms   max {stats['max_ms']:>8.3f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Hardware Report Benchmark
+Write throughput, size and filtered scan time of the hardware report
+
+Appends --devices synthetic detection records in batches to a report in a
+temporary directory, once per available format, and compares the result
+with the one-JSON-file-per-device export it replaces.
+
+    python3 backend/benchmarks/hardware_report.py
+    python3 backend/benchmarks/hardware_report.py --devices 200000 --json
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from core.hardware_report import HardwareReport, parquet_available  # noqa: E402
+
+BRANDS = ['samsung', 'motorola', 'google', 'xiaomi', 'oneplus', 'huawei', 'lg']
+HEALTH = ['good'] * 8 + ['overheat', 'dead', 'cold']
+
+
+def synthetic_records(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    start = time.time() - count * 60
+    for i in range(count):
+        brand = rng.choice(BRANDS)
+        total = rng.choice([32, 64, 128, 256]) * 1024 * 1024
+        used = int(total * rng.random())
+        yield {
+            'recorded_at': start + i * 60,
+            'source': f'desk{i % 8}',
+            'serial': f'SN{i:09d}',
+            'brand': brand,
+            'manufacturer': brand,
+            'model': f'{brand}-{rng.randint(1, 40)}',
+            'chipset': rng.choice(['mt6765', 'mt6768', 'sm6225', 'exynos850', 'tensor']),
+            'android_version': str(rng.randint(9, 15)),
+            'sdk_version': rng.randint(28, 35),
+            'security_patch': f'2026-{rng.randint(1, 12):02d}-01',
+            'fingerprint': f'{brand}/{brand}_x/x:13/TP1A.{i % 1000}/release-keys',
+            'rooted': rng.random() < 0.05,
+            'bootloader_unlocked': rng.random() < 0.1,
+            'frp_locked': rng.random() < 0.3,
+            'cpu_count': rng.choice([4, 8]),
+            'mem_total_kb': rng.choice([2, 3, 4, 6, 8]) * 1024 * 1024,
+            'mem_available_kb': rng.randint(200, 4000) * 1024,
+            'storage_total_kb': total,
+            'storage_used_kb': used,
+            'storage_free_kb': total - used,
+            'storage_usage_percent': round(100.0 * used / total, 1),
+            'battery_level': rng.randint(0, 100),
+            'battery_status': rng.choice(['charging', 'discharging', 'full']),
+            'battery_health': rng.choice(HEALTH),
+            'battery_temperature_c': round(rng.uniform(18, 52), 1),
+            'battery_voltage_mv': rng.randint(3400, 4400),
+            'battery_technology': 'Li-ion',
+        }
+
+
+def json_export(directory: str, count: int) -> dict:
+    """The old export: one JSON blob per device"""
+    os.makedirs(directory)
+    started = time.perf_counter()
+    size = 0
+    for record in synthetic_records(count):
+        path = os.path.join(directory, f"{record['serial']}.json")
+        with open(path, 'w') as f:
+            json.dump(record, f)
+        size += os.path.getsize(path)
+    return {'write_s': round(time.perf_counter() - started, 3), 'bytes': size}
+
+
+def timed_scan(report: HardwareReport, columns, filters) -> dict:
+    started = time.perf_counter()
+    rows = sum(1 for _ in report.scan(columns, filters))
+    return {'rows': rows, 'ms': round((time.perf_counter() - started) * 1000, 2)}
+
+
+def bench_format(directory: str, fmt: str, count: int, batch: int) -> dict:
+    report = HardwareReport(directory, fmt, batch_size=batch)
+    started = time.perf_counter()
+    report.extend(synthetic_records(count))
+    report.flush()
+    write_s = time.perf_counter() - started
+    stats = report.stats()
+
+    scans = {
+        'full': timed_scan(report, None, None),
+        'overheating_samsung': timed_scan(
+            report, ['serial', 'battery_temperature_c'],
+            [('brand', '==', 'samsung'), ('battery_health', '==', 'overheat')]),
+        'hot_and_full_storage': timed_scan(
+            report, ['serial', 'model', 'storage_usage_percent'],
+            [('battery_temperature_c', '>=', 45), ('storage_usage_percent', '>', 90)]),
+        'one_serial': timed_scan(report, None, [('serial', '==', f'SN{count // 2:09d}')]),
+    }
+    return {
+        'write_s': round(write_s, 3),
+        'rows_per_s': round(count / write_s),
+        'bytes': stats['bytes'],
+        'parts': stats['parts'],
+        'scans': scans,
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the hardware report')
+    parser.add_argument('--devices', type=int, default=50000)
+    parser.add_argument('--batch', type=int, default=1000, help='rows per written batch')
+    parser.add_argument('--no-json-baseline', action='store_true',
+                        help='skip the one-file-per-device comparison')
+    parser.add_argument('--json', action='store_true', help='print the raw report')
+    args = parser.parse_args(argv)
+
+    formats = ['parquet', 'csv'] if parquet_available() else ['csv']
+    report = {'devices': args.devices}
+    with tempfile.TemporaryDirectory() as root:
+        if not args.no_json_baseline:
+            report['json_files'] = json_export(os.path.join(root, 'json'), args.devices)
+        for fmt in formats:
+            report[fmt] = bench_format(os.path.join(root, fmt), fmt, args.devices, args.batch)
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+
+    print(f"{report['devices']} devices")
+    if 'json_files' in report:
+        baseline = report['json_files']
+        print(f"  json files  write {baseline['write_s']:>8.3f} s   "
+              f"{baseline['bytes'] / 1048576:>8.2f} MB")
+    for fmt in formats:
+        result = report[fmt]
+        print(f"  {fmt:<10}  write {result['write_s']:>8.3f} s   "
+              f"{result['bytes'] / 1048576:>8.2f} MB   {result['rows_per_s']} rows/s")
+        for name, scan in result['scans'].items():
+            print(f"    scan {name:<22} {scan['ms']:>9.2f} ms   {scan['rows']} rows")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
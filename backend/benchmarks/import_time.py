@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Import Time Benchmark
+Measures cold import cost of backend modules with `python -X importtime`
+
+Each sample runs in a fresh interpreter so nothing is already cached in
+sys.modules. importtime is the cumulative figure, stdlib included; own is
+the self time of backend modules (core.*, plugins.*) alone, which is what
+changes here can move. Run from anywhere:
+
+    python3 backend/benchmarks/import_time.py
+    python3 backend/benchmarks/import_time.py core.device_intelligence -n 20 --json
+
+As a check, exit 1 if a module imports something it should defer, or if
+its own import time exceeds --max-own-ms:
+
+    python3 backend/benchmarks/import_time.py --check --max-own-ms 8
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ['core.device_intelligence', 'core.frp_removal']
+
+# Backend modules that must not be imported until first use
+DEFERRED = {
+    'core.device_intelligence': [
+        'core.device_enhancements', 'core.device_parsers',
+        'core.hardware_report', 'core.process_runner'
+    ]
+}
+
+# Work deferred to first use; timed separately so it isn't hidden
+FIRST_USE = {
+    'core.device_intelligence': (
+        'core.device_intelligence.DeviceIntelligence().get_recommended_tools();'
+        'core.device_intelligence.CarrierBypassEnhancements({})'
+    )
+}
+
+
+def importtime(module: str) -> Dict[str, Tuple[int, int]]:
+    """{imported module: (self us, cumulative us)} for a fresh `import module`"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    # Lines look like: "import time:  self [us] | cumulative | imported package"
+    times = {}
+    for line in result.stderr.splitlines():
+        parts = [p.strip() for p in line.split('|')]
+        if len(parts) == 3 and parts[1].isdigit():
+            times[parts[2]] = (int(parts[0].rsplit(':', 1)[-1]), int(parts[1]))
+    if module not in times:
+        raise RuntimeError(f'{module} not found in -X importtime output')
+    return times
+
+
+def own_us(times: Dict[str, Tuple[int, int]]) -> int:
+    """Self time of backend modules only"""
+    return sum(own for name, (own, _) in times.items()
+               if name.startswith(('core', 'plugins')))
+
+
+def wall_ms(code: str) -> float:
+    """Wall-clock time for a fresh interpreter to run code, in milliseconds"""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', code], cwd=BACKEND_DIR, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def first_use_ms(module: str, code: str) -> float:
+    """Time code run right after importing module, inside one interpreter"""
+    timed = (
+        f'import time, {module}\n'
+        'start = time.perf_counter()\n'
+        f'{code}\n'
+        'print((time.perf_counter() - start) * 1000)'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', timed],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip())
+
+
+def bench_module(module: str, samples: int) -> Dict:
+    baseline = [wall_ms('pass') for _ in range(samples)]
+    runs = [importtime(module) for _ in range(samples)]
+    startup = [wall_ms(f'import {module}') for _ in range(samples)]
+
+    report = {
+        'module': module,
+        'samples': samples,
+        'importtime_ms': round(statistics.median(t[module][1] for t in runs) / 1000, 2),
+        'own_ms': round(statistics.median(own_us(t) for t in runs) / 1000, 2),
+        'startup_ms': round(statistics.median(startup) - statistics.median(baseline), 2),
+        'eager': sorted(set(DEFERRED.get(module, ())) & set(runs[0]))
+    }
+    if module in FIRST_USE:
+        first = [first_use_ms(module, FIRST_USE[module]) for _ in range(samples)]
+        report['first_use_ms'] = round(statistics.median(first), 2)
+    return report
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark backend import time')
+    parser.add_argument('modules', nargs='*', default=DEFAULT_MODULES)
+    parser.add_argument('-n', '--samples', type=int, default=10)
+    parser.add_argument('--json', action='store_true', help='print JSON instead of a table')
+    parser.add_argument('--check', action='store_true',
+                        help='fail if a module imports something listed in DEFERRED')
+    parser.add_argument('--max-own-ms', type=float,
+                        help='fail if a module\'s own import time exceeds this')
+    args = parser.parse_args(argv)
+
+    reports = [bench_module(m, args.samples) for m in args.modules]
+
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    else:
+        print(f"{'module':<32} {'importtime':>12} {'own':>10} {'startup':>10} {'first use':>10}")
+        for r in reports:
+            first = f"{r['first_use_ms']:.2f}" if 'first_use_ms' in r else '-'
+            print(f"{r['module']:<32} {r['importtime_ms']:>10.2f}ms {r['own_ms']:>8.2f}ms "
+                  f"{r['startup_ms']:>8.2f}ms {first:>10}")
+
+    failures = []
+    for r in reports:
+        if args.check and r['eager']:
+            failures.append(f"{r['module']} imports {', '.join(r['eager'])} eagerly")
+        if args.max_own_ms is not None and r['own_ms'] > args.max_own_ms:
+            failures.append(f"{r['module']} own import {r['own_ms']:.2f}ms "
+                            f"> {args.max_own_ms:.2f}ms")
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE MTK Pipeline Benchmark
+End-to-end throughput of the MTK plugin against the fake mtk tool
+
+Runs the real executor, SSE route, job log and backup pipeline with
+benchmarks/fake_mtk standing in for the device, so no hardware is needed.
+Everything is written to a temporary directory.
+
+    stream     executor output lines/s for a chatty read
+    fanout     delivery latency of output lines to --viewers SSE clients
+    logging    per-line cost of the job log and operations log writers
+    backup     dump, sparse conversion and catalog hashing, in MB/s of raw image
+
+Results can be saved as a baseline and later runs gated against it:
+
+    python3 backend/benchmarks/mtk_pipeline.py --save baseline.json
+    python3 backend/benchmarks/mtk_pipeline.py --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import re
+import selectors
+import shutil
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_MTK_PATH = os.path.join(BACKEND_DIR, 'benchmarks', 'fake_mtk')
+sys.path.insert(0, BACKEND_DIR)
+
+# Direction of each metric for the regression gate
+METRICS = {
+    'stream_lines_per_s': 'higher',
+    'fanout_latency_p50_ms': 'lower',
+    'fanout_latency_p95_ms': 'lower',
+    'job_log_us_per_line': 'lower',
+    'ops_log_us_per_line': 'lower',
+    'dump_mb_per_s': 'higher',
+    'sparsify_mb_per_s': 'higher',
+    'catalog_mb_per_s': 'higher',
+    'backup_mb_per_s': 'higher',
+}
+
+TIMESTAMP = re.compile(r't=(\d+\.\d+)')
+
+
+def isolate(workdir: str):
+    """Point the plugin at the fake tool and keep its state in workdir"""
+    os.environ.update({
+        'KN3AUX_MTK_PATH': FAKE_MTK_PATH,
+        'KN3AUX_BACKUP_ROOT': os.path.join(workdir, 'backups'),
+        'KN3AUX_BACKUP_CATALOG': os.path.join(workdir, 'catalog.db'),
+        'KN3AUX_JOB_JOURNAL': os.path.join(workdir, 'jobs.db'),
+    })
+
+
+def fake_env(**settings):
+    """Set FAKE_MTK_* variables for the commands started next"""
+    for key in [k for k in os.environ if k.startswith('FAKE_MTK_')]:
+        del os.environ[key]
+    os.environ.update({f'FAKE_MTK_{k.upper()}': str(v) for k, v in settings.items()})
+
+
+def bench_stream(size: str) -> dict:
+    """Lines/s through MTKExecutor for an unthrottled read with tiny progress steps"""
+    from plugins.mtk_tool import executor, MTK_CMD
+
+    fake_env(rate=0, chunk='4K', partitions=f'userdata:{size}')
+    target = os.path.join(os.environ['KN3AUX_BACKUP_ROOT'], 'stream.img')
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+
+    started = time.perf_counter()
+    executor.execute(MTK_CMD + ['r', 'userdata', target], stream_id='bench_stream').join()
+    elapsed = time.perf_counter() - started
+    output = executor.get_stream('bench_stream')
+    os.remove(target)
+    return {
+        'stream_lines': output.end,
+        'stream_returncode': output.returncode,
+        'stream_lines_per_s': round(output.end / elapsed, 1)
+    }
+
+
+class _Viewer:
+    """SSE client recording how long each timestamped line took to arrive"""
+
+    def __init__(self, port: int, stream_id: str):
+        self.sock = socket.create_connection(('127.0.0.1', port))
+        self.sock.sendall(
+            f'GET /api/mtk/stream/{stream_id} HTTP/1.1\r\nHost: localhost\r\n'
+            'Accept: text/event-stream\r\nConnection: close\r\n\r\n'.encode()
+        )
+        self.sock.setblocking(False)
+        self.buffer = b''
+        self.latencies = []
+        self.complete = False
+
+    def feed(self, data: bytes):
+        received = time.time()
+        self.buffer += data
+        *events, self.buffer = self.buffer.split(b'\n\n')
+        for event in events:
+            for field in event.split(b'\n'):
+                if not field.startswith(b'data: '):
+                    continue
+                payload = json.loads(field[6:])
+                if payload.get('complete'):
+                    self.complete = True
+                match = TIMESTAMP.search(payload.get('output', ''))
+                if match:
+                    self.latencies.append((received - float(match.group(1))) * 1000)
+
+
+def bench_fanout(viewers: int, seconds: float) -> dict:
+    """Line latency from the fake tool's print to every SSE viewer"""
+    import serve
+    from plugins.mtk_tool import executor, MTK_CMD
+
+    # About 100 progress lines per second
+    fake_env(rate='6400K', chunk='64K', partitions=f'boot:{int(6.25 * seconds)}M', timestamps=1)
+    target = os.path.join(os.environ['KN3AUX_BACKUP_ROOT'], 'fanout.img')
+
+    server = serve.Server(serve.create_app(), '127.0.0.1', 0, 'threaded', access_log=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    executor.execute(MTK_CMD + ['r', 'boot', target], stream_id='bench_fanout')
+
+    selector = selectors.DefaultSelector()
+    clients = [_Viewer(server.port, 'bench_fanout') for _ in range(viewers)]
+    for client in clients:
+        selector.register(client.sock, selectors.EVENT_READ, client)
+    deadline = time.monotonic() + seconds + 30
+    while selector.get_map() and time.monotonic() < deadline:
+        for key, _ in selector.select(1.0):
+            try:
+                data = key.data.sock.recv(65536)
+            except BlockingIOError:
+                continue
+            if data:
+                key.data.feed(data)
+            else:
+                selector.unregister(key.data.sock)
+                key.data.sock.close()
+    server.stop()
+    os.remove(target)
+
+    latencies = sorted(l for c in clients for l in c.latencies)
+    if not latencies:
+        return {'fanout_error': 'no timestamped lines received'}
+    return {
+        'fanout_viewers': viewers,
+        'fanout_lines_delivered': len(latencies),
+        'fanout_all_complete': all(c.complete for c in clients),
+        'fanout_latency_p50_ms': round(statistics.median(latencies), 3),
+        'fanout_latency_p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3)
+    }
+
+
+def _per_line_us(write, line: str, lines: int, rounds: int = 3) -> float:
+    """Best of rounds, so one noisy round doesn't trip the gate"""
+    best = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(lines):
+            write(line)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best / lines * 1e6
+
+
+def bench_logging(lines: int) -> dict:
+    """Per-line cost of the two writers every output line goes through"""
+    from core.job_journal import journal, JobLog
+    from plugins.mtk_tool import executor
+
+    line = 'Progress: |' + '█' * 25 + '-' * 25 + '| 50.0% Read (0x8000/0x10000, ) 48.21 MB/s\r'
+    job_log = JobLog(journal, journal.create(['bench'], stream_id='bench_logging'))
+    job_log_us = _per_line_us(job_log.write, line, lines)
+    job_log.close()
+
+    saved = executor.log_file
+    executor.log_file = os.path.join(os.path.dirname(journal.db_path), 'ops.log')
+    ops_log_us = _per_line_us(lambda l: executor._log(f"OUTPUT: {l.strip()}"), line, lines)
+    executor.log_file = saved
+
+    return {
+        'job_log_us_per_line': round(job_log_us, 3),
+        'ops_log_us_per_line': round(ops_log_us, 3)
+    }
+
+
+def bench_backup(size: str) -> dict:
+    """Full backup pipeline: rl dump, sparse conversion, catalog hashing"""
+    from plugins.mtk_tool import MTK_CMD, MTK_PATH
+    from plugins.mtk_tool.backup_catalog import catalog
+    from plugins.mtk_tool.backup_files import new_backup_dir
+    from plugins.mtk_tool.mtk_runner import mtk_runner
+    from plugins.mtk_tool.sparse_image import sparsify_directory
+
+    fake_env(rate=0, chunk='1M', partitions=f'boot:{size},super:{size},userdata:{size}')
+    output_dir = new_backup_dir()
+    os.makedirs(output_dir)
+
+    phases = {}
+    started = time.perf_counter()
+    result = mtk_runner.run(MTK_CMD + ['rl', output_dir], cwd=MTK_PATH, capture=False)
+    phases['dump'] = time.perf_counter() - started
+    raw_bytes = sum(e.stat().st_size for e in os.scandir(output_dir))
+
+    mark = time.perf_counter()
+    sparsify_directory(output_dir)
+    phases['sparsify'] = time.perf_counter() - mark
+
+    mark = time.perf_counter()
+    catalog.record_backup(output_dir, source='benchmark')
+    phases['catalog'] = time.perf_counter() - mark
+    total = time.perf_counter() - started
+    shutil.rmtree(output_dir)
+
+    mb = raw_bytes / (1024 * 1024)
+    report = {'backup_ok': result.ok, 'backup_raw_mb': round(mb, 1)}
+    for phase, seconds in phases.items():
+        report[f'{phase}_mb_per_s'] = round(mb / seconds, 1)
+    report['backup_mb_per_s'] = round(mb / total, 1)
+    return report
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Metrics that got worse than baseline by more than tolerance"""
+    regressions = []
+    for name, direction in METRICS.items():
+        if name not in report or name not in baseline or not baseline[name]:
+            continue
+        change = (report[name] - baseline[name]) / baseline[name]
+        worse = -change if direction == 'higher' else change
+        if worse > tolerance:
+            regressions.append({
+                'metric': name,
+                'baseline': baseline[name],
+                'current': report[name],
+                'worse_by': f'{worse:.0%}'
+            })
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the MTK plugin with the fake mtk tool')
+    parser.add_argument('--only', choices=['stream', 'fanout', 'logging', 'backup'], action='append',
+                        help='run only these benchmarks (repeatable)')
+    parser.add_argument('--size', default='32M', help='image size for stream and backup runs')
+    parser.add_argument('--viewers', type=int, default=20)
+    parser.add_argument('--seconds', type=float, default=3.0, help='fan-out job duration')
+    parser.add_argument('--log-lines', type=int, default=20000)
+    parser.add_argument('--save', help='write the report as a baseline file')
+    parser.add_argument('--baseline', help='fail if a metric regressed against this file')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed relative regression before failing (default 0.25)')
+    args = parser.parse_args(argv)
+    selected = args.only or ['stream', 'fanout', 'logging', 'backup']
+
+    workdir = tempfile.mkdtemp(prefix='kn3aux-bench-')
+    isolate(workdir)
+    report = {}
+    try:
+        if 'stream' in selected:
+            report.update(bench_stream(args.size))
+        if 'fanout' in selected:
+            report.update(bench_fanout(args.viewers, args.seconds))
+        if 'logging' in selected:
+            report.update(bench_logging(args.log_lines))
+        if 'backup' in selected:
+            report.update(bench_backup(args.size))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print(json.dumps({'regressions': regressions}, indent=2), file=sys.stderr)
+            return 1
+        print(f'No regressions beyond {args.tolerance:.0%}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Stream Load Test
+Many viewers following one MTK operation stream on a single backend process
+
+Starts the backend in-process, runs a job that prints lines for a few
+seconds, and attaches --viewers SSE clients to its stream. Every viewer must
+receive every line. The clients share one selector loop, so the reported
+OS thread count is the server's own.
+
+    python3 backend/benchmarks/stream_load.py --viewers 50
+    python3 backend/benchmarks/stream_load.py --viewers 50 --mode threaded
+"""
+
+import argparse
+import json
+import os
+import selectors
+import socket
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import serve  # noqa: E402  (stdlib only until prepare_mode runs)
+
+STREAM_ID = 'load_test'
+
+JOB_SCRIPT = '''
+import sys, time
+lines, duration = int(sys.argv[1]), float(sys.argv[2])
+for i in range(lines):
+    print(f"line {i}", flush=True)
+    time.sleep(duration / lines)
+'''
+
+
+def os_thread_count() -> int:
+    """Kernel threads in this process; gevent's threading counts greenlets"""
+    try:
+        return len(os.listdir('/proc/self/task'))
+    except OSError:
+        return threading.active_count()
+
+
+class Viewer:
+    """One SSE client connection, read incrementally"""
+
+    def __init__(self, port: int):
+        self.sock = socket.create_connection(('127.0.0.1', port))
+        self.sock.sendall(
+            f'GET /api/mtk/stream/{STREAM_ID} HTTP/1.1\r\n'
+            'Host: localhost\r\nAccept: text/event-stream\r\nConnection: close\r\n\r\n'.encode()
+        )
+        self.sock.setblocking(False)
+        self.buffer = b''
+        self.lines = 0
+        self.complete = False
+        self.first_byte = None
+
+    def feed(self, data: bytes):
+        if self.first_byte is None:
+            self.first_byte = time.monotonic()
+        self.buffer += data
+        *events, self.buffer = self.buffer.split(b'\n\n')
+        for event in events:
+            for field in event.split(b'\n'):
+                # Chunked framing lines never start with "data: "
+                if field.startswith(b'data: '):
+                    payload = json.loads(field[6:])
+                    if payload.get('complete'):
+                        self.complete = True
+                    elif 'output' in payload:
+                        self.lines += 1
+
+
+def run(viewers: int, lines: int, duration: float, mode: str) -> dict:
+    from plugins.mtk_tool import executor
+
+    app = serve.create_app()
+    server = serve.Server(app, '127.0.0.1', 0, mode, access_log=False)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    time.sleep(0.2)
+    baseline_threads = os_thread_count()
+
+    executor.execute(
+        [sys.executable, '-c', JOB_SCRIPT, str(lines), str(duration)],
+        stream_id=STREAM_ID
+    )
+
+    started = time.monotonic()
+    selector = selectors.DefaultSelector()
+    clients = [Viewer(server.port) for _ in range(viewers)]
+    for client in clients:
+        selector.register(client.sock, selectors.EVENT_READ, client)
+
+    peak_threads = baseline_threads
+    deadline = started + duration + 30
+    while selector.get_map() and time.monotonic() < deadline:
+        for key, _ in selector.select(1.0):
+            client = key.data
+            try:
+                data = client.sock.recv(65536)
+            except BlockingIOError:
+                continue
+            if data:
+                client.feed(data)
+            else:
+                selector.unregister(client.sock)
+                client.sock.close()
+        peak_threads = max(peak_threads, os_thread_count())
+
+    elapsed = time.monotonic() - started
+    server.stop()
+
+    received = [c.lines for c in clients]
+    return {
+        'mode': mode,
+        'viewers': viewers,
+        'lines_expected': lines,
+        'lines_received_min': min(received),
+        'lines_received_max': max(received),
+        'all_complete': all(c.complete for c in clients),
+        'elapsed_s': round(elapsed, 2),
+        'first_byte_ms_max': round(max(
+            (c.first_byte - started) * 1000 for c in clients if c.first_byte
+        ), 1) if any(c.first_byte for c in clients) else None,
+        'baseline_os_threads': baseline_threads,
+        'peak_os_threads': peak_threads
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load test MTK output streaming')
+    parser.add_argument('--viewers', type=int, default=50)
+    parser.add_argument('--lines', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=3.0, help='job run time in seconds')
+    parser.add_argument('--mode', choices=['auto', 'gevent', 'threaded'], default='auto')
+    args = parser.parse_args(argv)
+
+    mode = serve.resolve_mode(args.mode)
+    serve.prepare_mode(mode)
+
+    report = run(args.viewers, args.lines, args.duration, mode)
+    print(json.dumps(report, indent=2))
+
+    ok = report['all_complete'] and report['lines_received_min'] == args.lines
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
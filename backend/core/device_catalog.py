@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Device Catalog
+Static tool, script and bypass tables, read from device_catalog.json on first use
+"""
+
+import json
+import os
+import threading
+from typing import Any, Dict
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'device_catalog.json')
+
+_catalog = None
+_lock = threading.Lock()
+
+
+def load_catalog() -> Dict[str, Any]:
+    """
+    Parse the catalog once and keep it for the life of the process.
+
+    The returned tables are shared between callers; treat them as read-only.
+    """
+    global _catalog
+    if _catalog is None:
+        with _lock:
+            if _catalog is None:
+                with open(CATALOG_PATH, encoding='utf-8') as f:
+                    _catalog = json.load(f)
+    return _catalog
+
+
+def catalog_section(name: str) -> Any:
+    """Get one top-level table, e.g. 'recommended_tools'"""
+    return load_catalog()[name]
@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE AI IDE - Brand-Specific Device Enhancements
+Imported on first use by device_intelligence; tables live in device_catalog.json
+"""
+
+from typing import Dict, List
+
+try:
+    from .device_catalog import catalog_section
+except ImportError:
+    # Run from backend/core as a script
+    from device_catalog import catalog_section
+
+
+class SamsungEnhancements:
+    """Samsung-specific enhancements and tools"""
+    
+    def __init__(self, device_info: Dict):
+        self.device_info = device_info
+        self.model = device_info.get('model', '')
+        
+    def get_samsung_specific_tools(self) -> List[Dict]:
+        """Get Samsung-specific tools based on model"""
+        tools = []
+        
+        # Check if Galaxy S/Note/A series
+        if any(x in self.model.upper() for x in ['SM-G', 'SM-N', 'SM-A', 'SM-S']):
+            tools.extend([
+                {
+                    'name': 'SamFw FRP Tool',
+                    'description': 'Remove FRP without box',
+                    'command': 'samfw_frp.py',
+                    'requirements': ['python3', 'adb']
+                },
+                {
+                    'name': 'SamKey',
+                    'description': 'Samsung service tool',
+                    'command': 'samkey.exe',
+                    'requirements': ['windows', 'usb_drivers']
+                },
+                {
+                    'name': 'Odin3',
+                    'description': 'Flash firmware/recovery',
+                    'command': 'odin.exe',
+                    'requirements': ['windows', 'samsung_usb_drivers']
+                },
+                {
+                    'name': 'Knox Remover',
+                    'description': 'Disable Knox security',
+                    'command': 'knox_disabler.sh',
+                    'requirements': ['root', 'adb']
+                }
+            ])
+        
+        # Check for older models (Android 5-7)
+        android_version = self.device_info.get('android_version', '0')
+        if float(android_version.split('.')[0]) <= 7:
+            tools.append({
+                'name': 'Old Samsung FRP Bypass',
+                'description': 'FRP bypass for Android 5-7',
+                'command': 'samsung_old_frp.sh',
+                'requirements': ['adb']
+            })
+        
+        return tools
+    
+    def get_download_mode_commands(self) -> Dict:
+        """Get commands to enter Download Mode"""
+        return {
+            'method1': 'adb reboot download',
+            'method2': 'Power + Home + Volume Down (old models)',
+            'method3': 'Power + Bixby + Volume Down (new models)',
+            'method4': 'adb shell reboot download'
+        }
+    
+    def get_recovery_mode_commands(self) -> Dict:
+        """Get commands to enter Recovery Mode"""
+        return {
+            'method1': 'adb reboot recovery',
+            'method2': 'Power + Home + Volume Up (old models)',
+            'method3': 'Power + Bixby + Volume Up (new models)',
+            'method4': 'adb shell recovery --wipe_data'
+        }
+
+
+class MotorolaEnhancements:
+    """Motorola-specific enhancements"""
+    
+    def __init__(self, device_info: Dict):
+        self.device_info = device_info
+        
+    def get_unlock_code_website(self) -> str:
+        """Get Motorola bootloader unlock website"""
+        return "https://motorola-global-portal.custhelp.com/app/standalone/bootloader/unlock-your-device-a"
+    
+    def get_rescue_assistant_url(self) -> str:
+        """Get Motorola Rescue and Smart Assistant URL"""
+        return "https://www.motorola.com/us/smart-assistant"
+    
+    def get_fastboot_commands(self) -> List[str]:
+        """Get Motorola-specific fastboot commands"""
+        return [
+            'fastboot oem get_unlock_data',
+            'fastboot oem unlock <CODE>',
+            'fastboot flash recovery twrp.img',
+            'fastboot boot twrp.img',
+            'fastboot flash boot boot.img',
+            'fastboot reboot'
+        ]
+
+
+class PixelEnhancements:
+    """Google Pixel-specific enhancements"""
+    
+    def __init__(self, device_info: Dict):
+        self.device_info = device_info
+        self.codename = device_info.get('codename', '')
+        
+    def get_factory_image_url(self) -> str:
+        """Get factory image download URL"""
+        base_url = "https://developers.google.com/android/images"
+        return f"{base_url}#{self.codename}"
+    
+    def get_flash_all_script(self) -> str:
+        """Get flash-all script content"""
+        return """#!/bin/bash
+# Pixel Flash All Script
+fastboot flashing unlock
+fastboot flash bootloader bootloader.img
+fastboot reboot-bootloader
+fastboot flash radio radio.img
+fastboot reboot-bootloader
+fastboot -w
+fastboot update image-*.zip
+fastboot flashing lock
+"""
+
+
+class XiaomiEnhancements:
+    """Xiaomi-specific enhancements"""
+    
+    def __init__(self, device_info: Dict):
+        self.device_info = device_info
+        
+    def get_edl_mode_commands(self) -> Dict:
+        """Get EDL (Emergency Download Mode) commands"""
+        return {
+            'method1': 'adb reboot edl',
+            'method2': 'adb shell reboot edl',
+            'method3': 'Power + Volume Up (while connecting USB)',
+            'method4': 'Test point method (requires disassembly)'
+        }
+    
+    def get_mi_unlock_info(self) -> Dict:
+        """Get Mi Unlock tool information"""
+        return {
+            'website': 'https://en.miui.com/unlock/',
+            'requirements': [
+                'Mi Account (logged in for 7+ days)',
+                'Unlock permission from Xiaomi',
+                'Windows PC',
+                'Mi Unlock Tool'
+            ],
+            'steps': [
+                'Enable OEM unlocking in Developer Options',
+                'Boot to Fastboot mode',
+                'Run Mi Unlock Tool',
+                'Login with Mi Account',
+                'Click Unlock',
+                'Wait 7-15 days for permission',
+                'Unlock again after waiting period'
+            ]
+        }
+
+
+class CarrierBypassEnhancements:
+    """Advanced carrier bypass features - ENHANCED v4.1.0"""
+
+    def __init__(self, device_info: Dict):
+        self.device_info = device_info
+        self.brand = device_info.get('brand', '').lower()
+
+    def get_carrier_specific_bypass(self, carrier: str) -> Dict:
+        """Get carrier-specific bypass methods - ENHANCED"""
+        bypasses = catalog_section('carrier_bypass')
+        return bypasses.get(carrier.lower(), bypasses['generic'])
+
+    def get_all_carrier_bypass_scripts(self) -> List[Dict]:
+        """Get all available carrier bypass scripts - ENHANCED"""
+        return catalog_section('carrier_bypass_scripts')
+
+
+class FRPEnhancements:
+    """Advanced FRP removal features"""
+    
+    def __init__(self, device_info: Dict):
+        self.device_info = device_info
+        self.brand = device_info.get('brand', '').lower()
+        self.android_version = device_info.get('android_version', '0')
+        
+    def get_frp_bypass_method(self) -> Dict:
+        """Get best FRP bypass method based on device"""
+        
+        # Samsung methods
+        if 'samsung' in self.brand:
+            if float(self.android_version.split('.')[0]) <= 7:
+                return {
+                    'method': 'Samsung Android 5-7 FRP Bypass',
+                    'steps': [
+                        'Boot to recovery',
+                        'Wipe data/factory reset',
+                        'Reboot and skip setup',
+                        'Use Samsung account bypass'
+                    ],
+                    'success_rate': '95%'
+                }
+            elif float(self.android_version.split('.')[0]) <= 9:
+                return {
+                    'method': 'Samsung Android 8-9 FRP Bypass',
+                    'steps': [
+                        'Use TalkBack method',
+                        'Draw L pattern',
+                        'Open YouTube',
+                        'Open settings via TalkBack',
+                        'Reset device'
+                    ],
+                    'success_rate': '85%'
+                }
+            else:
+                return {
+                    'method': 'Samsung Android 10+ FRP Bypass',
+                    'steps': [
+                        'Use SamFw FRP Tool',
+                        'Enable ADB mode',
+                        'Remove FRP',
+                        'Reboot device'
+                    ],
+                    'success_rate': '90%'
+                }
+        
+        # Motorola methods
+        elif 'motorola' in self.brand:
+            return {
+                'method': 'Motorola FRP Bypass',
+                'steps': [
+                    'Boot to recovery',
+                    'Enable ADB',
+                    'Run FRP removal script',
+                    'Reboot'
+                ],
+                'success_rate': '80%'
+            }
+        
+        # Generic methods
+        else:
+            return {
+                'method': 'Generic FRP Bypass',
+                'steps': [
+                    'Boot to recovery',
+                    'Wipe data',
+                    'Use ADB commands to remove FRP',
+                    'Reboot'
+                ],
+                'success_rate': '70%'
+            }
+    
+    def get_frp_removal_scripts(self) -> List[Dict]:
+        """Get FRP removal scripts"""
+        return catalog_section('frp_removal_scripts')
+
+
+class RubberDuckyAutomation:
+    """Rubber Ducky automation for broken screens"""
+    
+    def __init__(self, device_info: Dict):
+        self.device_info = device_info
+        
+    def get_ducky_script(self, action: str) -> str:
+        """Get Rubber Ducky script for specific action"""
+        scripts = catalog_section('ducky_scripts')
+        return scripts.get(action, scripts['enable_adb'])
+    
+    def get_automation_sequence(self) -> List[Dict]:
+        """Get full automation sequence for broken screen"""
+        return [
+            {
+                'step': 1,
+                'action': 'Connect device via USB',
+                'ducky_script': None,
+                'manual': True
+            },
+            {
+                'step': 2,
+                'action': 'Enable ADB (if not enabled)',
+                'ducky_script': self.get_ducky_script('enable_adb'),
+                'manual': False
+            },
+            {
+                'step': 3,
+                'action': 'Boot to recovery',
+                'ducky_script': self.get_ducky_script('boot_recovery'),
+                'manual': False
+            },
+            {
+                'step': 4,
+                'action': 'Execute FRP bypass',
+                'ducky_script': self.get_ducky_script('frp_bypass'),
+                'manual': False
+            },
+            {
+                'step': 5,
+                'action': 'Reboot and verify',
+                'ducky_script': None,
+                'manual': True
+            }
+        ]
@@ -5,11 +5,24 @@ By: Krisshatta Esclovon ©2026 All Rights Reserved
 Version: 4.0.0 - Ultimate Device Intelligence
 """
 
-import subprocess
+import hashlib
+import importlib
 import json
 import os
+import re
+import threading
+import time
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+try:
+    from .device_catalog import catalog_section
+except ImportError:
+    # Run from backend/core as a script
+    from device_catalog import catalog_section
+
+if TYPE_CHECKING:
+    from .device_parsers import HardwareSnapshot
 
 class DeviceIntelligence:
     """
@@ -33,9 +46,15 @@ class DeviceIntelligence:
         self.chipset = ""
         self.android_version = ""
         self.security_patch = ""
+        self.command_errors = []
+        # Typed hardware records from the last detection, parsed once
+        self.hardware = _core('device_parsers').HardwareSnapshot()
+        self._parsed = {}
 
     def detect_device(self) -> Dict:
         """Complete device detection with all properties - ENHANCED"""
+        self.command_errors = []
+        self._parsed = {}
         self.device_info = {
             # Basic Info
             'brand': self._get_prop('ro.product.brand'),
@@ -80,6 +99,8 @@ class DeviceIntelligence:
         self.device_info['storage_info'] = self._get_storage_info()
         self.device_info['battery_info'] = self._get_battery_info()
         self.device_info['cpu_info'] = self._get_cpu_info()
+        self.hardware = _core('device_parsers').HardwareSnapshot(taken_at=time.time(),
+                                                                 **self._parsed)
         
         # Detect special states
         self.device_info['rooted'] = self._check_root()
@@ -95,133 +116,71 @@ class DeviceIntelligence:
         self.android_version = self.device_info.get('android_version') or 'Unknown'
         self.security_patch = self.device_info.get('security_patch') or 'Unknown'
         
+        # Timeouts and a missing adb/fastboot, as opposed to "no device"
+        if self.command_errors:
+            self.device_info['command_errors'] = list(self.command_errors)
+        
         return self.device_info
     
+    def _run(self, args: List[str], timeout: float = 5, **kwargs) -> Optional[str]:
+        """Run a host command; its output on success, None otherwise"""
+        result = _core('process_runner').runner.run(args, timeout=timeout, **kwargs)
+        if result.failed_to_run:
+            self.command_errors.append(f"{' '.join(args)}: {result.describe()}")
+        return result.text if result.ok else None
+
     def _get_prop(self, prop: str) -> Optional[str]:
         """Get system property via ADB"""
-        try:
-            output = subprocess.check_output(
-                ['adb', 'shell', 'getprop', prop],
-                text=True,
-                timeout=5
-            ).strip()
-            return output if output else None
-        except:
-            return None
+        output = self._run(['adb', 'shell', 'getprop', prop])
+        return (output.strip() or None) if output else None
 
     def _get_ram_info(self) -> Dict:
         """Get RAM information - ENHANCED"""
-        try:
-            output = subprocess.check_output(
-                ['adb', 'shell', 'cat', '/proc/meminfo'],
-                text=True,
-                timeout=5
-            )
-            mem_info = {}
-            for line in output.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    mem_info[key.strip()] = value.strip()
-            return {
-                'total': mem_info.get('MemTotal', 'Unknown'),
-                'free': mem_info.get('MemFree', 'Unknown'),
-                'available': mem_info.get('MemAvailable', 'Unknown'),
-                'buffers': mem_info.get('Buffers', 'Unknown'),
-                'cached': mem_info.get('Cached', 'Unknown')
-            }
-        except:
+        output = self._run(['adb', 'shell', 'cat', '/proc/meminfo'])
+        if output is None:
             return {'error': 'Unable to read RAM info'}
+        self._parsed['memory'] = _core('device_parsers').parse_meminfo(output)
+        return self._parsed['memory'].legacy()
 
     def _get_storage_info(self) -> Dict:
         """Get storage information - ENHANCED"""
-        try:
-            output = subprocess.check_output(
-                ['adb', 'shell', 'df', '/data'],
-                text=True,
-                timeout=5
-            )
-            lines = output.strip().split('\n')
-            if len(lines) > 1:
-                parts = lines[1].split()
-                if len(parts) >= 5:
-                    return {
-                        'total': parts[1],
-                        'used': parts[2],
-                        'free': parts[3],
-                        'usage_percent': parts[4]
-                    }
-            return {'error': 'Unable to parse storage info'}
-        except:
+        output = self._run(['adb', 'shell', 'df', '/data'])
+        if output is None:
             return {'error': 'Unable to read storage info'}
+        storage = _core('device_parsers').parse_df(output)
+        if storage is None:
+            return {'error': 'Unable to parse storage info'}
+        self._parsed['storage'] = storage
+        return storage.legacy()
 
     def _get_battery_info(self) -> Dict:
         """Get battery information - ENHANCED"""
-        try:
-            output = subprocess.check_output(
-                ['adb', 'shell', 'dumpsys', 'battery'],
-                text=True,
-                timeout=5
-            )
-            battery_info = {}
-            for line in output.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    battery_info[key.strip()] = value.strip()
-            return {
-                'level': battery_info.get('level', 'Unknown'),
-                'status': battery_info.get('status', 'Unknown'),
-                'health': battery_info.get('health', 'Unknown'),
-                'plugged': battery_info.get('plugged', 'Unknown'),
-                'temperature': battery_info.get('temperature', 'Unknown'),
-                'voltage': battery_info.get('voltage', 'Unknown')
-            }
-        except:
+        output = self._run(['adb', 'shell', 'dumpsys', 'battery'])
+        if output is None:
             return {'error': 'Unable to read battery info'}
+        self._parsed['battery'] = _core('device_parsers').parse_battery(output)
+        return self._parsed['battery'].legacy()
 
     def _get_cpu_info(self) -> Dict:
         """Get CPU information - ENHANCED"""
-        try:
-            output = subprocess.check_output(
-                ['adb', 'shell', 'cat', '/proc/cpuinfo'],
-                text=True,
-                timeout=5
-            )
-            cpu_info = {}
-            for line in output.split('\n'):
-                if ':' in line:
-                    key, value = line.split(':', 1)
-                    cpu_info[key.strip()] = value.strip()
-            return {
-                'processor_count': output.count('processor'),
-                'hardware': cpu_info.get('Hardware', 'Unknown'),
-                'revision': cpu_info.get('Revision', 'Unknown')
-            }
-        except:
+        output = self._run(['adb', 'shell', 'cat', '/proc/cpuinfo'])
+        if output is None:
             return {'error': 'Unable to read CPU info'}
+        self._parsed['cpu'] = _core('device_parsers').parse_cpuinfo(output)
+        return self._parsed['cpu'].legacy()
 
     def _check_root(self) -> bool:
         """Check if device is rooted"""
-        try:
-            output = subprocess.check_output(
-                ['adb', 'shell', 'which', 'su'],
-                text=True
-            ).strip()
-            return bool(output and 'su' in output)
-        except:
-            return False
+        output = (self._run(['adb', 'shell', 'which', 'su']) or '').strip()
+        return bool(output and 'su' in output)
     
     def _check_bootloader(self) -> bool:
         """Check bootloader unlock status"""
-        # Try fastboot first
-        try:
-            output = subprocess.check_output(
-                ['fastboot', 'getvar', 'unlocked'],
-                text=True,
-                stderr=subprocess.STDOUT
-            )
-            return 'yes' in output.lower()
-        except:
-            pass
+        # Try fastboot first; getvar waits forever without a device, so list first
+        if (self._run(['fastboot', 'devices']) or '').strip():
+            output = self._run(['fastboot', 'getvar', 'unlocked'], merge_stderr=True)
+            if output is not None:
+                return 'yes' in output.lower()
         
         # Check via ADB properties
         state = self._get_prop('ro.boot.verifiedbootstate')
@@ -248,14 +207,8 @@ class DeviceIntelligence:
     
     def _check_frp(self) -> bool:
         """Check FRP (Factory Reset Protection) status"""
-        try:
-            output = subprocess.check_output(
-                ['adb', 'shell', 'ls', '/data/system/users/0/'],
-                text=True
-            )
-            return 'frp' in output or 'accounts.db' in output
-        except:
-            return False
+        output = self._run(['adb', 'shell', 'ls', '/data/system/users/0/'])
+        return output is not None and ('frp' in output or 'accounts.db' in output)
     
     def _check_oem_unlock(self) -> bool:
         """Check if OEM unlocking is enabled in developer options"""
@@ -284,878 +237,70 @@ class DeviceIntelligence:
     
     def get_recommended_tools(self) -> List[Dict]:
         """Get recommended tools based on device - ENHANCED v4.1.0"""
-        category = self.get_device_category()
-
-        tools = {
-            'samsung_galaxy': [
-                {'name': 'Odin Flash Tool', 'priority': 'high', 'description': 'Flash firmware, recovery, root'},
-                {'name': 'Samsung FRP Bypass', 'priority': 'high', 'description': 'Remove FRP lock'},
-                {'name': 'Knox Disabler', 'priority': 'medium', 'description': 'Disable Knox security'},
-                {'name': 'Carrier Unlock', 'priority': 'high', 'description': 'Remove carrier restrictions'},
-                {'name': 'IMEI Repair', 'priority': 'medium', 'description': 'Repair IMEI if corrupted'},
-                {'name': 'SamFw FRP Tool', 'priority': 'high', 'description': 'Professional FRP removal'},
-                {'name': 'Samsung Characteristic Changer', 'priority': 'medium', 'description': 'Change device characteristics'},
-            ],
-            'motorola': [
-                {'name': 'Bootloader Unlock', 'priority': 'high', 'description': 'Official Motorola unlock'},
-                {'name': 'Rescue & Smart Assistant', 'priority': 'high', 'description': 'Official flashing tool'},
-                {'name': 'TWRP Recovery', 'priority': 'high', 'description': 'Custom recovery'},
-                {'name': 'FRP Bypass', 'priority': 'medium', 'description': 'Remove FRP'},
-                {'name': 'Motorola One Vision Tool', 'priority': 'medium', 'description': 'Device-specific utilities'},
-            ],
-            'pixel': [
-                {'name': 'Factory Images', 'priority': 'high', 'description': 'Flash stock firmware'},
-                {'name': 'Bootloader Unlock', 'priority': 'high', 'description': 'Official unlock'},
-                {'name': 'Magisk Root', 'priority': 'high', 'description': 'Systemless root'},
-                {'name': 'Custom ROMs', 'priority': 'medium', 'description': 'Install custom ROMs'},
-                {'name': 'Pixel Flasher', 'priority': 'medium', 'description': 'Automated flashing tool'},
-                {'name': 'Pixel Tool', 'priority': 'low', 'description': 'Pixel-specific utilities'},
-            ],
-            'oneplus': [
-                {'name': 'MSM Download Tool', 'priority': 'high', 'description': 'Unbrick tool'},
-                {'name': 'Oxygen Updater', 'priority': 'medium', 'description': 'Update firmware'},
-                {'name': 'TWRP Recovery', 'priority': 'high', 'description': 'Custom recovery'},
-                {'name': 'OnePlus Unlock Tool', 'priority': 'high', 'description': 'Bootloader unlock'},
-                {'name': 'Hydrogen/OS Custom ROMs', 'priority': 'medium', 'description': 'Custom ROM installation'},
-            ],
-            'xiaomi': [
-                {'name': 'Mi Unlock Tool', 'priority': 'high', 'description': 'Official bootloader unlock'},
-                {'name': 'Mi Flash Tool', 'priority': 'high', 'description': 'Flash firmware'},
-                {'name': 'EDL Mode', 'priority': 'medium', 'description': 'Emergency download mode'},
-                {'name': 'Xiaomi ADB/Fastboot Tools', 'priority': 'medium', 'description': 'Debloat and utilities'},
-                {'name': 'Mi Account Bypass', 'priority': 'medium', 'description': 'Remove Mi account lock'},
-            ],
-            'huawei': [
-                {'name': 'Huawei Multi-Tool', 'priority': 'high', 'description': 'All-in-one Huawei tool'},
-                {'name': 'DC-Unlocker', 'priority': 'high', 'description': 'Bootloader unlock code'},
-                {'name': 'Huawei Firmware Finder', 'priority': 'medium', 'description': 'Find and flash firmware'},
-                {'name': 'FRP Bypass Huawei', 'priority': 'medium', 'description': 'Remove FRP lock'},
-                {'name': 'Huawei ID Bypass', 'priority': 'medium', 'description': 'Bypass Huawei ID'},
-            ],
-            'lg': [
-                {'name': 'LG UP', 'priority': 'high', 'description': 'Official LG flashing tool'},
-                {'name': 'LG Bridge', 'priority': 'medium', 'description': 'Backup and update'},
-                {'name': 'TWRP Recovery', 'priority': 'high', 'description': 'Custom recovery'},
-                {'name': 'LG Flash Tool', 'priority': 'medium', 'description': 'KDZ flashing'},
-                {'name': 'Bootloader Unlock', 'priority': 'medium', 'description': 'Official unlock'},
-            ],
-            'sony': [
-                {'name': 'Flashtool', 'priority': 'high', 'description': 'Flash firmware and kernels'},
-                {'name': 'Newflasher', 'priority': 'high', 'description': 'Command-line flashing'},
-                {'name': 'Xperia Companion', 'priority': 'medium', 'description': 'Official Sony tool'},
-                {'name': 'Bootloader Unlock', 'priority': 'medium', 'description': 'Official unlock code'},
-                {'name': 'XperiFirm', 'priority': 'low', 'description': 'Firmware downloader'},
-            ],
-            'realme': [
-                {'name': 'Realme Unlock Tool', 'priority': 'high', 'description': 'Bootloader unlock'},
-                {'name': 'MSM Download Tool', 'priority': 'high', 'description': 'Unbrick tool'},
-                {'name': 'Realme Flash Tool', 'priority': 'medium', 'description': 'Flash firmware'},
-                {'name': 'Deep Testing', 'priority': 'medium', 'description': 'Unlock bootloader via app'},
-            ],
-            'oppo': [
-                {'name': 'Oppo Unlock Tool', 'priority': 'high', 'description': 'Bootloader unlock'},
-                {'name': 'MSM Download Tool', 'priority': 'high', 'description': 'Unbrick tool'},
-                {'name': 'Oppo Flash Tool', 'priority': 'medium', 'description': 'Flash firmware'},
-                {'name': 'ColorOS Custom ROMs', 'priority': 'medium', 'description': 'Custom ROM installation'},
-            ],
-            'generic': [
-                {'name': 'Generic FRP Bypass', 'priority': 'medium', 'description': 'FRP removal'},
-                {'name': 'Generic Root', 'priority': 'medium', 'description': 'Root methods'},
-                {'name': 'ADB Commands', 'priority': 'low', 'description': 'Basic ADB control'},
-                {'name': 'TWRP Recovery', 'priority': 'high', 'description': 'Custom recovery for most devices'},
-            ]
-        }
-
-        return tools.get(category, tools['generic'])
+        tools = catalog_section('recommended_tools')
+        return tools.get(self.get_device_category(), tools['generic'])
     
     def get_device_specific_scripts(self) -> List[str]:
         """Get device-specific script recommendations"""
-        category = self.get_device_category()
-        
-        scripts = {
-            'samsung_galaxy': [
-                'samsung_frp_bypass.sh',
-                'samsung_knox_disabler.sh',
-                'samsung_carrier_unlock.sh',
-                'odin_flash_auto.sh',
-            ],
-            'motorola': [
-                'motorola_bootloader_unlock.sh',
-                'motorola_frp_bypass.sh',
-                'motorola_stock_flash.sh',
-            ],
-            'pixel': [
-                'pixel_factory_flash.sh',
-                'pixel_bootloader_unlock.sh',
-                'pixel_magisk_root.sh',
-            ],
-            'xiaomi': [
-                'xiaomi_unlock_bootloader.sh',
-                'xiaomi_edl_flash.sh',
-                'xiaomi_frp_bypass.sh',
-            ],
-        }
-        
-        return scripts.get(category, ['generic_adb_commands.sh'])
-
-
-class SamsungEnhancements:
-    """Samsung-specific enhancements and tools"""
-    
-    def __init__(self, device_info: Dict):
-        self.device_info = device_info
-        self.model = device_info.get('model', '')
-        
-    def get_samsung_specific_tools(self) -> List[Dict]:
-        """Get Samsung-specific tools based on model"""
-        tools = []
-        
-        # Check if Galaxy S/Note/A series
-        if any(x in self.model.upper() for x in ['SM-G', 'SM-N', 'SM-A', 'SM-S']):
-            tools.extend([
-                {
-                    'name': 'SamFw FRP Tool',
-                    'description': 'Remove FRP without box',
-                    'command': 'samfw_frp.py',
-                    'requirements': ['python3', 'adb']
-                },
-                {
-                    'name': 'SamKey',
-                    'description': 'Samsung service tool',
-                    'command': 'samkey.exe',
-                    'requirements': ['windows', 'usb_drivers']
-                },
-                {
-                    'name': 'Odin3',
-                    'description': 'Flash firmware/recovery',
-                    'command': 'odin.exe',
-                    'requirements': ['windows', 'samsung_usb_drivers']
-                },
-                {
-                    'name': 'Knox Remover',
-                    'description': 'Disable Knox security',
-                    'command': 'knox_disabler.sh',
-                    'requirements': ['root', 'adb']
-                }
-            ])
-        
-        # Check for older models (Android 5-7)
-        android_version = self.device_info.get('android_version', '0')
-        if float(android_version.split('.')[0]) <= 7:
-            tools.append({
-                'name': 'Old Samsung FRP Bypass',
-                'description': 'FRP bypass for Android 5-7',
-                'command': 'samsung_old_frp.sh',
-                'requirements': ['adb']
-            })
-        
-        return tools
-    
-    def get_download_mode_commands(self) -> Dict:
-        """Get commands to enter Download Mode"""
-        return {
-            'method1': 'adb reboot download',
-            'method2': 'Power + Home + Volume Down (old models)',
-            'method3': 'Power + Bixby + Volume Down (new models)',
-            'method4': 'adb shell reboot download'
-        }
-    
-    def get_recovery_mode_commands(self) -> Dict:
-        """Get commands to enter Recovery Mode"""
-        return {
-            'method1': 'adb reboot recovery',
-            'method2': 'Power + Home + Volume Up (old models)',
-            'method3': 'Power + Bixby + Volume Up (new models)',
-            'method4': 'adb shell recovery --wipe_data'
-        }
+        scripts = catalog_section('device_scripts')
+        return scripts.get(self.get_device_category(), scripts['generic'])
 
 
-class MotorolaEnhancements:
-    """Motorola-specific enhancements"""
-    
-    def __init__(self, device_info: Dict):
-        self.device_info = device_info
-        
-    def get_unlock_code_website(self) -> str:
-        """Get Motorola bootloader unlock website"""
-        return "https://motorola-global-portal.custhelp.com/app/standalone/bootloader/unlock-your-device-a"
-    
-    def get_rescue_assistant_url(self) -> str:
-        """Get Motorola Rescue and Smart Assistant URL"""
-        return "https://www.motorola.com/us/smart-assistant"
-    
-    def get_fastboot_commands(self) -> List[str]:
-        """Get Motorola-specific fastboot commands"""
-        return [
-            'fastboot oem get_unlock_data',
-            'fastboot oem unlock <CODE>',
-            'fastboot flash recovery twrp.img',
-            'fastboot boot twrp.img',
-            'fastboot flash boot boot.img',
-            'fastboot reboot'
-        ]
+# Brand helpers live in device_enhancements and are imported on first use
+_ENHANCEMENT_CLASSES = {
+    'SamsungEnhancements', 'MotorolaEnhancements', 'PixelEnhancements',
+    'XiaomiEnhancements', 'CarrierBypassEnhancements', 'FRPEnhancements',
+    'RubberDuckyAutomation'
+}
 
 
-class PixelEnhancements:
-    """Google Pixel-specific enhancements"""
-    
-    def __init__(self, device_info: Dict):
-        self.device_info = device_info
-        self.codename = device_info.get('codename', '')
-        
-    def get_factory_image_url(self) -> str:
-        """Get factory image download URL"""
-        base_url = "https://developers.google.com/android/images"
-        return f"{base_url}#{self.codename}"
-    
-    def get_flash_all_script(self) -> str:
-        """Get flash-all script content"""
-        return """#!/bin/bash
-# Pixel Flash All Script
-fastboot flashing unlock
-fastboot flash bootloader bootloader.img
-fastboot reboot-bootloader
-fastboot flash radio radio.img
-fastboot reboot-bootloader
-fastboot -w
-fastboot update image-*.zip
-fastboot flashing lock
-"""
+def _core(module: str):
+    """
+    Import a sibling core module on first use. Parsers, the report and the
+    process runner pull in subprocess, uuid and gzip, which importing this
+    module shouldn't pay for.
+    """
+    if __package__:
+        return importlib.import_module('.' + module, __package__)
+    return importlib.import_module(module)
 
 
-class XiaomiEnhancements:
-    """Xiaomi-specific enhancements"""
-    
-    def __init__(self, device_info: Dict):
-        self.device_info = device_info
-        
-    def get_edl_mode_commands(self) -> Dict:
-        """Get EDL (Emergency Download Mode) commands"""
-        return {
-            'method1': 'adb reboot edl',
-            'method2': 'adb shell reboot edl',
-            'method3': 'Power + Volume Up (while connecting USB)',
-            'method4': 'Test point method (requires disassembly)'
-        }
-    
-    def get_mi_unlock_info(self) -> Dict:
-        """Get Mi Unlock tool information"""
-        return {
-            'website': 'https://en.miui.com/unlock/',
-            'requirements': [
-                'Mi Account (logged in for 7+ days)',
-                'Unlock permission from Xiaomi',
-                'Windows PC',
-                'Mi Unlock Tool'
-            ],
-            'steps': [
-                'Enable OEM unlocking in Developer Options',
-                'Boot to Fastboot mode',
-                'Run Mi Unlock Tool',
-                'Login with Mi Account',
-                'Click Unlock',
-                'Wait 7-15 days for permission',
-                'Unlock again after waiting period'
-            ]
-        }
+def _enhancements():
+    """Import the brand helper module"""
+    return _core('device_enhancements')
 
 
-class CarrierBypassEnhancements:
-    """Advanced carrier bypass features - ENHANCED v4.1.0"""
+def __getattr__(name):
+    # Keeps `from device_intelligence import SamsungEnhancements` working
+    if name in _ENHANCEMENT_CLASSES:
+        return getattr(_enhancements(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    def __init__(self, device_info: Dict):
-        self.device_info = device_info
-        self.brand = device_info.get('brand', '').lower()
 
-    def get_carrier_specific_bypass(self, carrier: str) -> Dict:
-        """Get carrier-specific bypass methods - ENHANCED"""
+# Seconds a detected profile is served before adb is queried again
+PROFILE_TTL = float(os.environ.get('KN3AUX_PROFILE_TTL', '5'))
 
-        bypasses = {
-            'att': {
-                'name': 'AT&T Carrier Bypass',
-                'methods': [
-                    {
-                        'name': 'SIM Spoof Method',
-                        'description': 'Spoof AT&T SIM parameters',
-                        'script': 'att_sim_spoof.js',
-                        'requirements': ['frida', 'root'],
-                        'success_rate': '85%'
-                    },
-                    {
-                        'name': 'Service Menu Method',
-                        'description': 'Use hidden service menu',
-                        'dial_code': '*#0*#',
-                        'requirements': ['dialer_access'],
-                        'success_rate': '70%'
-                    },
-                    {
-                        'name': 'NV Data Patch',
-                        'description': 'Patch NV data to remove lock',
-                        'script': 'att_nv_patch.sh',
-                        'requirements': ['root', 'qcn_tools'],
-                        'success_rate': '90%'
-                    },
-                    {
-                        'name': 'Direct Unlock Code',
-                        'description': 'Request official unlock from AT&T',
-                        'url': 'https://www.att.com/support/device-unlock/',
-                        'requirements': ['device_paid_off', '6_months_service'],
-                        'success_rate': '100%'
-                    }
-                ]
-            },
-            'tmobile': {
-                'name': 'T-Mobile Carrier Bypass',
-                'methods': [
-                    {
-                        'name': 'Device Unlock App',
-                        'description': 'Official T-Mobile unlock app',
-                        'package': 'com.tmobile.services.unlock',
-                        'requirements': ['play_store'],
-                        'success_rate': '95%'
-                    },
-                    {
-                        'name': 'Policy Manager Bypass',
-                        'description': 'Bypass device policy checks',
-                        'script': 'tmobile_policy_bypass.js',
-                        'requirements': ['frida'],
-                        'success_rate': '80%'
-                    },
-                    {
-                        'name': 'Meta Unlock',
-                        'description': 'T-Mobile Meta device unlock',
-                        'script': 'tmobile_meta_unlock.py',
-                        'requirements': ['python', 'adb'],
-                        'success_rate': '75%'
-                    }
-                ]
-            },
-            'verizon': {
-                'name': 'Verizon Carrier Bypass',
-                'methods': [
-                    {
-                        'name': 'SIM Unlock Code',
-                        'description': 'Request official unlock code',
-                        'requirements': ['device_paid_off', 'account_holder'],
-                        'success_rate': '100%'
-                    },
-                    {
-                        'name': 'LTE Unlock',
-                        'description': 'Unlock LTE bands only',
-                        'script': 'verizon_lte_unlock.sh',
-                        'requirements': ['root'],
-                        'success_rate': '60%'
-                    },
-                    {
-                        'name': 'UW Unlock',
-                        'description': 'Ultra Wideband unlock bypass',
-                        'script': 'verizon_uw_unlock.js',
-                        'requirements': ['frida'],
-                        'success_rate': '65%'
-                    }
-                ]
-            },
-            'sprint': {
-                'name': 'Sprint Carrier Bypass',
-                'methods': [
-                    {
-                        'name': 'SPC Code Bypass',
-                        'description': 'Bypass SPC lock',
-                        'script': 'sprint_spc_bypass.py',
-                        'requirements': ['python', 'adb'],
-                        'success_rate': '75%'
-                    },
-                    {
-                        'name': 'MSL Code Unlock',
-                        'description': 'Get and use MSL code',
-                        'requirements': ['msl_code'],
-                        'success_rate': '90%'
-                    },
-                    {
-                        'name': 'Carrier Services Bypass',
-                        'description': 'Hook carrier services verification',
-                        'script': 'sprint_carrier_bypass.js',
-                        'requirements': ['frida'],
-                        'success_rate': '70%'
-                    }
-                ]
-            },
-            'boost': {
-                'name': 'Boost Mobile Carrier Bypass',
-                'methods': [
-                    {
-                        'name': 'SIM Change Bypass',
-                        'description': 'Bypass SIM change verification',
-                        'script': 'boost_sim_bypass.js',
-                        'requirements': ['frida'],
-                        'success_rate': '80%'
-                    },
-                    {
-                        'name': 'Master Subsidy Lock',
-                        'description': 'Remove master subsidy lock',
-                        'script': 'boost_msl_unlock.py',
-                        'requirements': ['python', 'adb'],
-                        'success_rate': '75%'
-                    },
-                    {
-                        'name': 'Device Unlock Request',
-                        'description': 'Official Boost unlock request',
-                        'url': 'https://www.boostmobile.com/deviceunlock/',
-                        'requirements': ['50_days_service'],
-                        'success_rate': '100%'
-                    }
-                ]
-            },
-            'cricket': {
-                'name': 'Cricket Wireless Carrier Bypass',
-                'methods': [
-                    {
-                        'name': 'Device Unlock Code',
-                        'description': 'Request official unlock code',
-                        'url': 'https://www.cricketwireless.com/support/device-unlock',
-                        'requirements': ['6_months_service'],
-                        'success_rate': '100%'
-                    },
-                    {
-                        'name': 'Cricket Policy Bypass',
-                        'description': 'Bypass Cricket policy manager',
-                        'script': 'cricket_policy_bypass.js',
-                        'requirements': ['frida'],
-                        'success_rate': '70%'
-                    }
-                ]
-            },
-            'metro': {
-                'name': 'Metro by T-Mobile Bypass',
-                'methods': [
-                    {
-                        'name': 'Device Unlock App',
-                        'description': 'Use T-Mobile unlock app',
-                        'package': 'com.tmobile.services.unlock',
-                        'requirements': ['180_days_service'],
-                        'success_rate': '95%'
-                    },
-                    {
-                        'name': 'Metro Policy Hook',
-                        'description': 'Hook Metro policy verification',
-                        'script': 'metro_policy_hook.js',
-                        'requirements': ['frida'],
-                        'success_rate': '75%'
-                    }
-                ]
-            },
-            'us_cellular': {
-                'name': 'US Cellular Carrier Bypass',
-                'methods': [
-                    {
-                        'name': 'Unlock Code Request',
-                        'description': 'Official US Cellular unlock',
-                        'url': 'https://www.uscellular.com/support/device-unlock',
-                        'requirements': ['device_paid_off'],
-                        'success_rate': '100%'
-                    },
-                    {
-                        'name': 'PRL Update Bypass',
-                        'description': 'Bypass PRL update requirement',
-                        'script': 'uscc_prl_bypass.js',
-                        'requirements': ['frida'],
-                        'success_rate': '65%'
-                    }
-                ]
-            },
-            'international': {
-                'name': 'International Carrier Bypass',
-                'methods': [
-                    {
-                        'name': 'Generic SIM Unlock',
-                        'description': 'Universal SIM unlock script',
-                        'script': 'generic_sim_unlock.js',
-                        'requirements': ['frida'],
-                        'success_rate': '60%'
-                    },
-                    {
-                        'name': 'Region Code Changer',
-                        'description': 'Change device region code',
-                        'script': 'region_code_changer.py',
-                        'requirements': ['python', 'adb'],
-                        'success_rate': '55%'
-                    }
-                ]
-            }
-        }
 
-        return bypasses.get(carrier.lower(), {
-            'name': 'Generic Carrier Bypass',
-            'methods': [
-                {
-                    'name': 'Universal SIM Bypass',
-                    'script': 'universal_sim_bypass.js',
-                    'requirements': ['frida'],
-                    'success_rate': '70%'
-                }
-            ]
-        })
+# Most rows one GET /api/device/report returns
+REPORT_MAX_ROWS = 100000
 
-    def get_all_carrier_bypass_scripts(self) -> List[Dict]:
-        """Get all available carrier bypass scripts - ENHANCED"""
-        return [
-            {
-                'id': 'sim_bypass_v1',
-                'name': 'SIM Check Bypass',
-                'author': 'R0b0t4ng3nt',
-                'description': 'Bypasses SIM card presence verification',
-                'command': 'frida -l sim_bypass.js -f YOUR_BINARY',
-                'tags': ['sim', 'carrier', 'telephony'],
-                'category': 'Bypass',
-                'success_rate': '85%'
-            },
-            {
-                'id': 'carrier_lock_bypass_v1',
-                'name': 'Carrier Lock Bypass',
-                'author': 'KN3AUX-CODE',
-                'description': 'Bypass carrier verification and network lock checks',
-                'command': 'frida -l carrier_bypass.js -f YOUR_BINARY',
-                'tags': ['carrier', 'network-lock', 'telephony'],
-                'category': 'Bypass',
-                'success_rate': '80%'
-            },
-            {
-                'id': 'imei_spoof_v1',
-                'name': 'IMEI Spoof',
-                'author': 'KN3AUX-CODE',
-                'description': 'Spoof device IMEI',
-                'command': 'frida -l imei_spoof.js -f com.android.phone',
-                'tags': ['imei', 'spoof', 'telephony'],
-                'category': 'Bypass',
-                'success_rate': '75%'
-            },
-            {
-                'id': 'att_unlock_v1',
-                'name': 'AT&T Unlock',
-                'author': 'KN3AUX-CODE',
-                'description': 'AT&T specific carrier unlock',
-                'command': 'frida -l att_unlock.js -f com.android.phone',
-                'tags': ['att', 'carrier', 'unlock'],
-                'category': 'Carrier',
-                'success_rate': '85%'
-            },
-            {
-                'id': 'tmobile_unlock_v1',
-                'name': 'T-Mobile Unlock',
-                'author': 'KN3AUX-CODE',
-                'description': 'T-Mobile specific carrier unlock',
-                'command': 'frida -l tmobile_unlock.js -f com.tmobile.services.unlock',
-                'tags': ['tmobile', 'carrier', 'unlock'],
-                'category': 'Carrier',
-                'success_rate': '90%'
-            },
-            {
-                'id': 'verizon_lte_unlock_v1',
-                'name': 'Verizon LTE Unlock',
-                'author': 'KN3AUX-CODE',
-                'description': 'Unlock Verizon LTE bands',
-                'command': 'frida -l verizon_lte_unlock.js -f com.android.phone',
-                'tags': ['verizon', 'lte', 'unlock'],
-                'category': 'Carrier',
-                'success_rate': '60%'
-            },
-            {
-                'id': 'sprint_msl_unlock_v1',
-                'name': 'Sprint MSL Unlock',
-                'author': 'KN3AUX-CODE',
-                'description': 'Sprint MSL code unlock',
-                'command': 'frida -l sprint_msl_unlock.js -f com.android.phone',
-                'tags': ['sprint', 'msl', 'unlock'],
-                'category': 'Carrier',
-                'success_rate': '75%'
-            },
-            {
-                'id': 'boost_sim_bypass_v1',
-                'name': 'Boost Mobile SIM Bypass',
-                'author': 'KN3AUX-CODE',
-                'description': 'Bypass Boost Mobile SIM verification',
-                'command': 'frida -l boost_sim_bypass.js -f com.android.phone',
-                'tags': ['boost', 'sim', 'bypass'],
-                'category': 'Carrier',
-                'success_rate': '80%'
-            },
-            {
-                'id': 'cricket_unlock_v1',
-                'name': 'Cricket Wireless Unlock',
-                'author': 'KN3AUX-CODE',
-                'description': 'Cricket Wireless carrier unlock',
-                'command': 'frida -l cricket_unlock.js -f com.android.phone',
-                'tags': ['cricket', 'unlock', 'carrier'],
-                'category': 'Carrier',
-                'success_rate': '70%'
-            },
-            {
-                'id': 'metro_unlock_v1',
-                'name': 'Metro by T-Mobile Unlock',
-                'author': 'KN3AUX-CODE',
-                'description': 'Metro by T-Mobile carrier unlock',
-                'command': 'frida -l metro_unlock.js -f com.android.phone',
-                'tags': ['metro', 'tmobile', 'unlock'],
-                'category': 'Carrier',
-                'success_rate': '85%'
-            },
-            {
-                'id': 'uscc_unlock_v1',
-                'name': 'US Cellular Unlock',
-                'author': 'KN3AUX-CODE',
-                'description': 'US Cellular carrier unlock',
-                'command': 'frida -l uscc_unlock.js -f com.android.phone',
-                'tags': ['uscellular', 'unlock', 'carrier'],
-                'category': 'Carrier',
-                'success_rate': '75%'
-            },
-            {
-                'id': 'generic_sim_unlock_v1',
-                'name': 'Generic SIM Unlock',
-                'author': 'KN3AUX-CODE',
-                'description': 'Generic SIM unlock for international carriers',
-                'command': 'frida -l generic_sim_unlock.js -f com.android.phone',
-                'tags': ['generic', 'sim', 'international'],
-                'category': 'Carrier',
-                'success_rate': '65%'
-            },
-            {
-                'id': 'network_type_spoof_v1',
-                'name': 'Network Type Spoofer',
-                'author': 'KN3AUX-CODE',
-                'description': 'Spoof network type to bypass restrictions',
-                'command': 'frida -l network_type_spoof.js -f com.android.phone',
-                'tags': ['network', 'spoof', '5g'],
-                'category': 'Bypass',
-                'success_rate': '70%'
-            },
-            {
-                'id': 'carrier_config_bypass_v1',
-                'name': 'Carrier Config Bypass',
-                'author': 'KN3AUX-CODE',
-                'description': 'Bypass carrier configuration checks',
-                'command': 'frida -l carrier_config_bypass.js -f com.android.carrierconfig',
-                'tags': ['carrier', 'config', 'bypass'],
-                'category': 'Bypass',
-                'success_rate': '75%'
-            }
-        ]
+# "battery_temperature_c>=40", "brand in samsung,google"
+REPORT_FILTER = re.compile(r'^\s*(\w+)\s*(==|!=|<=|>=|<|>|\s+in\s+)\s*(.*?)\s*$')
 
 
-class FRPEnhancements:
-    """Advanced FRP removal features"""
-    
-    def __init__(self, device_info: Dict):
-        self.device_info = device_info
-        self.brand = device_info.get('brand', '').lower()
-        self.android_version = device_info.get('android_version', '0')
-        
-    def get_frp_bypass_method(self) -> Dict:
-        """Get best FRP bypass method based on device"""
-        
-        # Samsung methods
-        if 'samsung' in self.brand:
-            if float(self.android_version.split('.')[0]) <= 7:
-                return {
-                    'method': 'Samsung Android 5-7 FRP Bypass',
-                    'steps': [
-                        'Boot to recovery',
-                        'Wipe data/factory reset',
-                        'Reboot and skip setup',
-                        'Use Samsung account bypass'
-                    ],
-                    'success_rate': '95%'
-                }
-            elif float(self.android_version.split('.')[0]) <= 9:
-                return {
-                    'method': 'Samsung Android 8-9 FRP Bypass',
-                    'steps': [
-                        'Use TalkBack method',
-                        'Draw L pattern',
-                        'Open YouTube',
-                        'Open settings via TalkBack',
-                        'Reset device'
-                    ],
-                    'success_rate': '85%'
-                }
-            else:
-                return {
-                    'method': 'Samsung Android 10+ FRP Bypass',
-                    'steps': [
-                        'Use SamFw FRP Tool',
-                        'Enable ADB mode',
-                        'Remove FRP',
-                        'Reboot device'
-                    ],
-                    'success_rate': '90%'
-                }
-        
-        # Motorola methods
-        elif 'motorola' in self.brand:
-            return {
-                'method': 'Motorola FRP Bypass',
-                'steps': [
-                    'Boot to recovery',
-                    'Enable ADB',
-                    'Run FRP removal script',
-                    'Reboot'
-                ],
-                'success_rate': '80%'
-            }
-        
-        # Generic methods
-        else:
-            return {
-                'method': 'Generic FRP Bypass',
-                'steps': [
-                    'Boot to recovery',
-                    'Wipe data',
-                    'Use ADB commands to remove FRP',
-                    'Reboot'
-                ],
-                'success_rate': '70%'
-            }
-    
-    def get_frp_removal_scripts(self) -> List[Dict]:
-        """Get FRP removal scripts"""
-        return [
-            {
-                'name': 'FRP Bypass ADB',
-                'script': 'frp_bypass_adb.sh',
-                'requirements': ['adb', 'recovery_mode'],
-                'description': 'Remove FRP using ADB commands in recovery'
-            },
-            {
-                'name': 'FRP Bypass Frida',
-                'script': 'frp_bypass_frida.js',
-                'requirements': ['frida', 'root'],
-                'description': 'Hook AccountManager to bypass FRP'
-            },
-            {
-                'name': 'FRP Reset Prop',
-                'script': 'frp_reset_prop.sh',
-                'requirements': ['root', 'adb'],
-                'description': 'Reset FRP properties'
-            },
-            {
-                'name': 'Samsung FRP Tool',
-                'script': 'samfw_frp.py',
-                'requirements': ['python', 'adb'],
-                'description': 'SamFw FRP removal tool for Samsung'
-            }
-        ]
+def parse_report_filter(text: str) -> Tuple[str, str, object]:
+    """(column, op, value) from a ?where= expression"""
+    match = REPORT_FILTER.match(text)
+    if not match:
+        raise ValueError(f'Invalid filter: {text}')
+    column, op, value = match.groups()
+    op = op.strip()
+    return column, op, value.split(',') if op == 'in' else value
 
 
-class RubberDuckyAutomation:
-    """Rubber Ducky automation for broken screens"""
-    
-    def __init__(self, device_info: Dict):
-        self.device_info = device_info
-        
-    def get_ducky_script(self, action: str) -> str:
-        """Get Rubber Ducky script for specific action"""
-        
-        scripts = {
-            'enable_adb': """
-REM Enable ADB on broken screen device
-DELAY 2000
-GUI r
-DELAY 500
-STRING cmd
-ENTER
-DELAY 1000
-STRING adb devices
-ENTER
-DELAY 2000
-STRING adb shell input tap 500 500
-ENTER
-REM Continue with ADB commands
-""",
-            
-            'boot_recovery': """
-REM Boot to recovery mode
-DELAY 2000
-GUI r
-DELAY 500
-STRING cmd
-ENTER
-DELAY 1000
-STRING adb reboot recovery
-ENTER
-DELAY 5000
-""",
-            
-            'boot_fastboot': """
-REM Boot to fastboot mode
-DELAY 2000
-GUI r
-DELAY 500
-STRING cmd
-ENTER
-DELAY 1000
-STRING adb reboot bootloader
-ENTER
-DELAY 5000
-""",
-            
-            'frp_bypass': """
-REM FRP Bypass Automation
-DELAY 2000
-GUI r
-DELAY 500
-STRING cmd
-ENTER
-DELAY 1000
-STRING adb reboot recovery
-ENTER
-DELAY 5000
-STRING adb shell
-ENTER
-DELAY 1000
-STRING rm -rf /data/system/users/0/frp
-ENTER
-DELAY 500
-STRING reboot
-ENTER
-"""
-        }
-        
-        return scripts.get(action, scripts['enable_adb'])
-    
-    def get_automation_sequence(self) -> List[Dict]:
-        """Get full automation sequence for broken screen"""
-        return [
-            {
-                'step': 1,
-                'action': 'Connect device via USB',
-                'ducky_script': None,
-                'manual': True
-            },
-            {
-                'step': 2,
-                'action': 'Enable ADB (if not enabled)',
-                'ducky_script': self.get_ducky_script('enable_adb'),
-                'manual': False
-            },
-            {
-                'step': 3,
-                'action': 'Boot to recovery',
-                'ducky_script': self.get_ducky_script('boot_recovery'),
-                'manual': False
-            },
-            {
-                'step': 4,
-                'action': 'Execute FRP bypass',
-                'ducky_script': self.get_ducky_script('frp_bypass'),
-                'manual': False
-            },
-            {
-                'step': 5,
-                'action': 'Reboot and verify',
-                'ducky_script': None,
-                'manual': True
-            }
-        ]
+def serialize_profile(device_info: Dict) -> str:
+    """Canonical JSON for a profile; equal profiles give identical text"""
+    return json.dumps(device_info, sort_keys=True, separators=(',', ':'), default=str)
 
 
 # Main integration class
@@ -1165,11 +310,46 @@ class KN3AUXDeviceIntegrator:
     def __init__(self):
         self.detector = DeviceIntelligence()
         self.device_info = {}
+        self.profile_json = None
+        self.profile_hash = None
+        self.hardware = _core('device_parsers').HardwareSnapshot()
+        self._detected_at = None
+        # Reentrant so snapshot() can hold it across profile()
+        self._lock = threading.RLock()
         
     def initialize(self) -> Dict:
         """Initialize and detect device"""
-        self.device_info = self.detector.detect_device()
-        return self.device_info
+        return self.profile(max_age=0)[0]
+    
+    def profile(self, max_age: float = PROFILE_TTL) -> Tuple[Dict, str, str]:
+        """
+        (device_info, json, hash) of the detected profile.
+
+        Detection runs only when the cached profile is older than max_age;
+        concurrent callers wait for one detection instead of each running
+        adb. The JSON is serialised once per detection and its hash serves
+        as the ETag.
+        """
+        with self._lock:
+            stale = (self._detected_at is None
+                     or time.monotonic() - self._detected_at >= max_age)
+            if stale:
+                self.device_info = self.detector.detect_device()
+                self.hardware = self.detector.hardware
+                self.profile_json = serialize_profile(self.device_info)
+                self.profile_hash = hashlib.sha1(self.profile_json.encode()).hexdigest()[:20]
+                self._detected_at = time.monotonic()
+            return self.device_info, self.profile_json, self.profile_hash
+
+    def snapshot(self, max_age: float = PROFILE_TTL) -> Tuple[Dict, 'HardwareSnapshot']:
+        """
+        (device_info, hardware) from the same detection.
+
+        Reports and samplers read the typed records here rather than
+        parsing device_info's strings again.
+        """
+        with self._lock:
+            return self.profile(max_age)[0], self.hardware
     
     def get_enhanced_features(self) -> Dict:
         """Get all enhanced features for detected device"""
@@ -1190,13 +370,13 @@ class KN3AUXDeviceIntegrator:
         
         # Add brand-specific enhancements
         if 'samsung' in self.brand:
-            samsung = SamsungEnhancements(self.device_info)
+            samsung = _enhancements().SamsungEnhancements(self.device_info)
             features['samsung_tools'] = samsung.get_samsung_specific_tools()
             features['download_mode'] = samsung.get_download_mode_commands()
             features['recovery_mode'] = samsung.get_recovery_mode_commands()
         
         elif 'motorola' in self.brand:
-            motorola = MotorolaEnhancements(self.device_info)
+            motorola = _enhancements().MotorolaEnhancements(self.device_info)
             features['motorola_unlock'] = {
                 'website': motorola.get_unlock_code_website(),
                 'rescue_assistant': motorola.get_rescue_assistant_url(),
@@ -1204,28 +384,28 @@ class KN3AUXDeviceIntegrator:
             }
         
         elif 'pixel' in self.brand:
-            pixel = PixelEnhancements(self.device_info)
+            pixel = _enhancements().PixelEnhancements(self.device_info)
             features['pixel_factory'] = {
                 'images_url': pixel.get_factory_image_url(),
                 'flash_script': pixel.get_flash_all_script()
             }
         
         elif 'xiaomi' in self.brand:
-            xiaomi = XiaomiEnhancements(self.device_info)
+            xiaomi = _enhancements().XiaomiEnhancements(self.device_info)
             features['xiaomi_edl'] = xiaomi.get_edl_mode_commands()
             features['xiaomi_unlock'] = xiaomi.get_mi_unlock_info()
         
         # Add carrier bypass
-        carrier = CarrierBypassEnhancements(self.device_info)
+        carrier = _enhancements().CarrierBypassEnhancements(self.device_info)
         features['carrier_bypass_scripts'] = carrier.get_all_carrier_bypass_scripts()
         
         # Add FRP removal
-        frp = FRPEnhancements(self.device_info)
+        frp = _enhancements().FRPEnhancements(self.device_info)
         features['frp_methods'] = frp.get_frp_bypass_method()
         features['frp_scripts'] = frp.get_frp_removal_scripts()
         
         # Add Rubber Ducky automation
-        ducky = RubberDuckyAutomation(self.device_info)
+        ducky = _enhancements().RubberDuckyAutomation(self.device_info)
         features['automation_sequence'] = ducky.get_automation_sequence()
         
         return features
@@ -1244,56 +424,136 @@ def create_device_routes(app):
     """Create Flask routes for device integration"""
     from flask import jsonify, request
     
-    integrator = KN3AUXDeviceIntegrator()
+    integrator = None
+    integrator_lock = threading.Lock()
+
+    def get_integrator() -> KN3AUXDeviceIntegrator:
+        """Build the integrator on the first device request"""
+        nonlocal integrator
+        with integrator_lock:
+            if integrator is None:
+                integrator = KN3AUXDeviceIntegrator()
+            return integrator
     
     @app.route('/api/device/detect', methods=['GET'])
     def detect_device():
-        """Detect connected device"""
-        device_info = integrator.initialize()
-        return jsonify(device_info)
+        """
+        Detect connected device.
+
+        ?fields=brand,model returns only those top-level keys; ?refresh=1
+        skips the profile cache. Responses carry an ETag so an unchanged
+        profile answers If-None-Match polls with an empty 304.
+        """
+        max_age = 0 if request.args.get('refresh') == '1' else PROFILE_TTL
+        device_info, payload, digest = get_integrator().profile(max_age)
+        
+        fields = request.args.get('fields')
+        names = sorted({f.strip() for f in fields.split(',') if f.strip()}) if fields else None
+        etag = digest
+        if names:
+            etag += '-' + hashlib.sha1(','.join(names).encode()).hexdigest()[:8]
+        
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            if names:
+                payload = serialize_profile({k: device_info[k] for k in names if k in device_info})
+            response = app.response_class(payload, mimetype='application/json')
+        response.set_etag(etag)
+        # Cache, but revalidate on every use
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    
+    @app.route('/api/device/report', methods=['POST'])
+    def record_report():
+        """Append the detected device to the hardware report"""
+        data = request.get_json(silent=True) or {}
+        max_age = 0 if data.get('refresh') else PROFILE_TTL
+        device_info, hardware = get_integrator().snapshot(max_age)
+        # Without a device every field but the lock flags is null
+        if not device_info.get('serial') or hardware.empty:
+            return jsonify({'error': 'No device detected'}), 404
+        report = _core('hardware_report')
+        record = report.device_record(device_info, hardware, source=data.get('source'))
+        report.get_report().append(record)
+        return jsonify({'recorded': record})
+    
+    @app.route('/api/device/report', methods=['GET'])
+    def scan_report():
+        """
+        Rows of the hardware report.
+
+        ?columns=serial,battery_health picks columns; each ?where= adds a
+        filter such as battery_temperature_c>=40 or brand in samsung,xiaomi.
+        """
+        columns = request.args.get('columns')
+        columns = [c.strip() for c in columns.split(',') if c.strip()] if columns else None
+        limit = min(max(request.args.get('limit', 1000, type=int), 1), REPORT_MAX_ROWS)
+        try:
+            filters = [parse_report_filter(w) for w in request.args.getlist('where')]
+            rows = []
+            for row in _core('hardware_report').get_report().scan(columns, filters):
+                if len(rows) == limit:
+                    return jsonify({'rows': rows, 'truncated': True})
+                rows.append(row)
+        except KeyError as e:
+            return jsonify({'error': e.args[0]}), 400
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({'rows': rows, 'truncated': False})
+    
+    @app.route('/api/device/report/stats', methods=['GET'])
+    def report_stats():
+        """Format and size of the hardware report"""
+        return jsonify(_core('hardware_report').get_report().stats())
+    
+    @app.route('/api/device/report/compact', methods=['POST'])
+    def compact_report():
+        """Merge the report's part files"""
+        return jsonify(_core('hardware_report').get_report().compact())
     
     @app.route('/api/device/features', methods=['GET'])
     def get_features():
         """Get enhanced features for device"""
-        features = integrator.get_enhanced_features()
+        features = get_integrator().get_enhanced_features()
         return jsonify(features)
     
     @app.route('/api/device/carrier-bypass', methods=['GET'])
     def get_carrier_bypass():
         """Get carrier bypass scripts"""
         carrier = request.args.get('carrier', 'generic')
-        bypass = CarrierBypassEnhancements(integrator.device_info)
+        bypass = _enhancements().CarrierBypassEnhancements(get_integrator().device_info)
         return jsonify(bypass.get_carrier_specific_bypass(carrier))
     
     @app.route('/api/device/frp-removal', methods=['GET'])
     def get_frp_removal():
         """Get FRP removal methods"""
-        frp = FRPEnhancements(integrator.device_info)
+        frp = _enhancements().FRPEnhancements(get_integrator().device_info)
         return jsonify(frp.get_frp_bypass_method())
     
     @app.route('/api/device/rubber-ducky', methods=['GET'])
     def get_rubber_ducky():
         """Get Rubber Ducky automation script"""
         action = request.args.get('action', 'enable_adb')
-        ducky = RubberDuckyAutomation(integrator.device_info)
+        ducky = _enhancements().RubberDuckyAutomation(get_integrator().device_info)
         return jsonify({'script': ducky.get_ducky_script(action)})
     
     @app.route('/api/device/brand-tools', methods=['GET'])
     def get_brand_tools():
         """Get brand-specific tools"""
-        brand = request.args.get('brand', integrator.brand)
+        brand = request.args.get('brand', get_integrator().brand)
         
         if brand == 'samsung':
-            samsung = SamsungEnhancements(integrator.device_info)
+            samsung = _enhancements().SamsungEnhancements(get_integrator().device_info)
             return jsonify(samsung.get_samsung_specific_tools())
         elif brand == 'motorola':
-            motorola = MotorolaEnhancements(integrator.device_info)
+            motorola = _enhancements().MotorolaEnhancements(get_integrator().device_info)
             return jsonify(motorola.get_fastboot_commands())
         elif brand == 'pixel':
-            pixel = PixelEnhancements(integrator.device_info)
+            pixel = _enhancements().PixelEnhancements(get_integrator().device_info)
             return jsonify({'factory_url': pixel.get_factory_image_url()})
         elif brand == 'xiaomi':
-            xiaomi = XiaomiEnhancements(integrator.device_info)
+            xiaomi = _enhancements().XiaomiEnhancements(get_integrator().device_info)
             return jsonify(xiaomi.get_mi_unlock_info())
         
         return jsonify({'error': 'Brand not supported'})
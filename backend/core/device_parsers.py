@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Device Output Parsers
+Typed records for /proc/meminfo, /proc/cpuinfo, dumpsys battery and df
+
+Each parser takes the raw text once and returns an immutable record of
+numbers, so every consumer of a detection reads the same values instead of
+splitting the text again. legacy() gives the string dicts detect_device has
+always returned.
+"""
+
+import re
+from typing import Dict, NamedTuple, Optional
+
+# "MemTotal:        3848504 kB"
+_MEMINFO_LINE = re.compile(r'^(\w+(?:\(\w+\))?):\s+(\d+)', re.M)
+# "  level: 85" / "Hardware\t: MT6765"
+_KEY_VALUE = re.compile(r'^[ \t]*([^:\n]+?)[ \t]*:[ \t]*(.*?)[ \t]*\r?$', re.M)
+# One per logical CPU; "model name : ... processor" must not count
+_PROCESSOR = re.compile(r'^processor\s*:', re.M)
+# "11.5G", "4096", "5.1M" as printed by toolbox and toybox df
+_SIZE = re.compile(r'^(\d+(?:\.\d+)?)([KMGT]?)$', re.I)
+_SIZE_UNITS = {'': 1, 'K': 1, 'M': 1024, 'G': 1024 ** 2, 'T': 1024 ** 3}
+
+# android.os.BatteryManager constants
+BATTERY_STATUS = {1: 'unknown', 2: 'charging', 3: 'discharging', 4: 'not_charging', 5: 'full'}
+BATTERY_HEALTH = {1: 'unknown', 2: 'good', 3: 'overheat', 4: 'dead', 5: 'over_voltage',
+                  6: 'unspecified_failure', 7: 'cold'}
+# dumpsys battery "<source> powered: true" lines, in BatteryManager plug flag order
+_POWER_SOURCES = (('AC powered', 'ac'), ('USB powered', 'usb'),
+                  ('Wireless powered', 'wireless'), ('Dock powered', 'dock'))
+
+
+def _int(text: Optional[str]) -> Optional[int]:
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _unknown(value) -> str:
+    return 'Unknown' if value is None else str(value)
+
+
+def _kb(value: Optional[int]) -> str:
+    return 'Unknown' if value is None else f'{value} kB'
+
+
+class MemInfo(NamedTuple):
+    """/proc/meminfo, in kB"""
+    total_kb: Optional[int] = None
+    free_kb: Optional[int] = None
+    available_kb: Optional[int] = None
+    buffers_kb: Optional[int] = None
+    cached_kb: Optional[int] = None
+    swap_total_kb: Optional[int] = None
+    swap_free_kb: Optional[int] = None
+
+    @property
+    def used_percent(self) -> Optional[float]:
+        if not self.total_kb or self.available_kb is None:
+            return None
+        return round(100.0 * (self.total_kb - self.available_kb) / self.total_kb, 1)
+
+    def legacy(self) -> Dict:
+        return {
+            'total': _kb(self.total_kb),
+            'free': _kb(self.free_kb),
+            'available': _kb(self.available_kb),
+            'buffers': _kb(self.buffers_kb),
+            'cached': _kb(self.cached_kb)
+        }
+
+
+class BatteryInfo(NamedTuple):
+    """dumpsys battery; temperature in °C, voltage in mV"""
+    level: Optional[int] = None
+    scale: Optional[int] = None
+    status: Optional[int] = None
+    health: Optional[int] = None
+    plugged: Optional[str] = None
+    present: Optional[bool] = None
+    temperature_c: Optional[float] = None
+    voltage_mv: Optional[int] = None
+    technology: Optional[str] = None
+
+    @property
+    def status_name(self) -> Optional[str]:
+        return BATTERY_STATUS.get(self.status)
+
+    @property
+    def health_name(self) -> Optional[str]:
+        return BATTERY_HEALTH.get(self.health)
+
+    @property
+    def percent(self) -> Optional[float]:
+        if self.level is None:
+            return None
+        return round(100.0 * self.level / (self.scale or 100), 1)
+
+    def legacy(self) -> Dict:
+        return {
+            'level': _unknown(self.level),
+            'status': _unknown(self.status),
+            'health': _unknown(self.health),
+            'plugged': _unknown(self.plugged),
+            # dumpsys reports tenths of a degree
+            'temperature': _unknown(None if self.temperature_c is None
+                                    else round(self.temperature_c * 10)),
+            'voltage': _unknown(self.voltage_mv)
+        }
+
+
+class CpuInfo(NamedTuple):
+    """/proc/cpuinfo"""
+    processor_count: int = 0
+    hardware: Optional[str] = None
+    revision: Optional[str] = None
+    model_name: Optional[str] = None
+    features: Optional[str] = None
+
+    def legacy(self) -> Dict:
+        return {
+            'processor_count': self.processor_count,
+            'hardware': _unknown(self.hardware),
+            'revision': _unknown(self.revision)
+        }
+
+
+class StorageInfo(NamedTuple):
+    """One df row, sizes in kB"""
+    filesystem: str
+    total_kb: Optional[int]
+    used_kb: Optional[int]
+    free_kb: Optional[int]
+    usage_percent: Optional[float]
+    # Columns exactly as printed, for legacy()
+    raw: tuple = ()
+
+    def legacy(self) -> Dict:
+        return dict(zip(('total', 'used', 'free', 'usage_percent'), self.raw))
+
+
+class HardwareSnapshot(NamedTuple):
+    """Parsed hardware state from one detection; None where a read failed"""
+    memory: Optional[MemInfo] = None
+    storage: Optional[StorageInfo] = None
+    battery: Optional[BatteryInfo] = None
+    cpu: Optional[CpuInfo] = None
+    taken_at: float = 0.0
+
+    @property
+    def empty(self) -> bool:
+        """No read produced a usable value"""
+        return not any((
+            self.memory and self.memory.total_kb,
+            self.storage and self.storage.total_kb,
+            self.battery and self.battery.level is not None,
+            self.cpu and self.cpu.processor_count,
+        ))
+
+
+def parse_meminfo(text: str) -> MemInfo:
+    values = {key: int(value) for key, value in _MEMINFO_LINE.findall(text)}
+    return MemInfo(
+        total_kb=values.get('MemTotal'),
+        free_kb=values.get('MemFree'),
+        available_kb=values.get('MemAvailable'),
+        buffers_kb=values.get('Buffers'),
+        cached_kb=values.get('Cached'),
+        swap_total_kb=values.get('SwapTotal'),
+        swap_free_kb=values.get('SwapFree')
+    )
+
+
+def parse_battery(text: str) -> BatteryInfo:
+    values = dict(_KEY_VALUE.findall(text))
+    plugged = values.get('plugged')
+    if plugged is None:
+        plugged = next((name for key, name in _POWER_SOURCES
+                        if values.get(key) == 'true'), 'none' if 'AC powered' in values else None)
+    temperature = _int(values.get('temperature'))
+    present = values.get('present')
+    return BatteryInfo(
+        level=_int(values.get('level')),
+        scale=_int(values.get('scale')),
+        status=_int(values.get('status')),
+        health=_int(values.get('health')),
+        plugged=plugged,
+        present=None if present is None else present == 'true',
+        temperature_c=None if temperature is None else temperature / 10,
+        voltage_mv=_int(values.get('voltage')),
+        technology=values.get('technology') or None
+    )
+
+
+def parse_cpuinfo(text: str) -> CpuInfo:
+    # Later duplicates (per-core blocks) win, as with the old line loop
+    values = dict(_KEY_VALUE.findall(text))
+    return CpuInfo(
+        processor_count=len(_PROCESSOR.findall(text)),
+        hardware=values.get('Hardware') or None,
+        revision=values.get('Revision') or None,
+        model_name=values.get('model name') or values.get('Processor') or None,
+        features=values.get('Features') or None
+    )
+
+
+def parse_size_kb(text: str) -> Optional[int]:
+    """df size column in kB; plain numbers are 1K blocks"""
+    match = _SIZE.match(text)
+    if not match:
+        return None
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2).upper()])
+
+
+def parse_df(text: str) -> Optional[StorageInfo]:
+    """First filesystem row of df output, or None when there is none"""
+    lines = text.strip().split('\n')[1:]
+    parts = lines[0].split() if lines else []
+    if len(parts) == 1:
+        # Long device names wrap onto their own line in some df builds
+        parts += lines[1].split() if len(lines) > 1 else []
+    if len(parts) < 5:
+        return None
+    total, used, free = (parse_size_kb(p) for p in parts[1:4])
+    if parts[4].endswith('%'):
+        percent = _int(parts[4][:-1])
+        percent = None if percent is None else float(percent)
+    elif total and used is not None:
+        # toolbox df has no Use% column; its fifth column is Blksize
+        percent = round(100.0 * used / total, 1)
+    else:
+        percent = None
+    return StorageInfo(parts[0], total, used, free, percent, tuple(parts[1:5]))
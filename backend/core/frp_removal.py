@@ -5,16 +5,22 @@ Device-specific FRP bypass methods
 By: Krisshatta Esclovon ©2026 All Rights Reserved
 """
 
-import subprocess
 import os
 from typing import Dict, List, Optional
 from pathlib import Path
 
+try:
+    from .process_runner import runner
+except ImportError:
+    # Run from backend/core as a script
+    from process_runner import runner
+
 class FRPRemovalTool:
     """FRP (Factory Reset Protection) removal for various Android brands"""
     
     def __init__(self, serial: Optional[str] = None):
         self.serial = serial
+        self.command_errors = []
         self.device_brand = self._detect_brand()
         
     def _adb(self, command: str) -> str:
@@ -23,11 +29,11 @@ class FRPRemovalTool:
         if self.serial:
             cmd += ['-s', self.serial]
         cmd += command.split()
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-            return result.stdout.strip()
-        except:
-            return ""
+        result = runner.run(cmd, timeout=10)
+        if result.failed_to_run:
+            # Keep timeouts and a missing adb visible instead of reading as ""
+            self.command_errors.append(f"adb {command}: {result.describe()}")
+        return result.text.strip()
     
     def _detect_brand(self) -> str:
         """Detect device brand"""
@@ -59,12 +65,15 @@ class FRPRemovalTool:
         output = self._adb('shell ls /data/system/users/0/')
         frp_locked = 'frp' in output or 'accounts.db' in output
         
-        return {
+        status = {
             'frp_locked': frp_locked,
             'device_brand': self.device_brand,
             'android_version': self._adb('shell getprop ro.build.version.release'),
             'security_patch': self._adb('shell getprop ro.build.version.security_patch')
         }
+        if self.command_errors:
+            status['command_errors'] = list(self.command_errors)
+        return status
     
     def method_generic_adb(self) -> Dict:
         """Generic ADB FRP removal (requires root)"""
@@ -318,7 +327,10 @@ ui_print("KN3AUX-CODE FRP Removal");
         
         # Create ZIP
         zip_path = f'{output_dir}/frp-removal.zip'
-        subprocess.run(['zip', '-r', zip_path, 'update-binary', 'META-INF'], cwd=output_dir)
+        result = runner.run(['zip', '-r', zip_path, 'update-binary', 'META-INF'],
+                            cwd=output_dir, timeout=60)
+        if not result.ok:
+            raise RuntimeError(f"zip failed: {result.describe()}: {result.tail_text.strip()}")
         
         return zip_path
 
@@ -0,0 +1,499 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Hardware Report
+Columnar fleet log of detected devices: hardware, battery health and storage
+
+Every record is one flat row of COLUMNS. Rows are buffered and written in
+batches to part files in the report directory, as Parquet row groups when
+pyarrow is installed and gzip CSV otherwise. scan() streams rows back with
+column projection and filters; on Parquet those are pushed down to the
+reader, so row groups whose statistics rule out a filter are never decoded.
+
+A part file is only readable once closed, so close() and the flush timer
+roll the open part over; scan() adds rows still in the buffer from memory.
+compact() rewrites many small parts into one.
+"""
+
+import csv
+import gzip
+import importlib.util
+import operator
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+try:
+    from .device_parsers import BatteryInfo, CpuInfo, HardwareSnapshot, MemInfo
+except ImportError:
+    # Run from backend/core as a script
+    from device_parsers import BatteryInfo, CpuInfo, HardwareSnapshot, MemInfo
+
+REPORT_DIR = os.path.expanduser(
+    os.environ.get('KN3AUX_REPORT_DIR', '~/.kn3aux-core/hardware_reports')
+)
+REPORT_FORMAT = os.environ.get('KN3AUX_REPORT_FORMAT', 'auto')
+
+# Rows buffered before a batch is written
+BATCH_SIZE = 1000
+# Seconds a buffered row may wait for its batch to fill before a background
+# timer writes it and closes the part
+FLUSH_INTERVAL = 30.0
+# Rows per part file before a new one is started
+ROWS_PER_PART = 500000
+
+COLUMNS: Tuple[Tuple[str, str], ...] = (
+    ('recorded_at', 'float'),
+    ('source', 'str'),
+    ('serial', 'str'),
+    ('brand', 'str'),
+    ('manufacturer', 'str'),
+    ('model', 'str'),
+    ('device', 'str'),
+    ('chipset', 'str'),
+    ('hardware', 'str'),
+    ('cpu_abi', 'str'),
+    ('android_version', 'str'),
+    ('sdk_version', 'int'),
+    ('security_patch', 'str'),
+    ('build_id', 'str'),
+    ('fingerprint', 'str'),
+    ('rooted', 'bool'),
+    ('bootloader_unlocked', 'bool'),
+    ('carrier_locked', 'bool'),
+    ('frp_locked', 'bool'),
+    ('oem_unlock_enabled', 'bool'),
+    ('cpu_count', 'int'),
+    ('cpu_hardware', 'str'),
+    ('mem_total_kb', 'int'),
+    ('mem_available_kb', 'int'),
+    ('swap_total_kb', 'int'),
+    ('storage_total_kb', 'int'),
+    ('storage_used_kb', 'int'),
+    ('storage_free_kb', 'int'),
+    ('storage_usage_percent', 'float'),
+    ('battery_level', 'int'),
+    ('battery_status', 'str'),
+    ('battery_health', 'str'),
+    ('battery_plugged', 'str'),
+    ('battery_temperature_c', 'float'),
+    ('battery_voltage_mv', 'int'),
+    ('battery_technology', 'str'),
+)
+COLUMN_TYPES = dict(COLUMNS)
+COLUMN_NAMES = [name for name, _ in COLUMNS]
+
+# Comparison operators accepted in filters, besides 'in'; these work on
+# plain values and pyarrow expressions alike
+_COMPARE = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge,
+}
+OPERATORS = tuple(_COMPARE) + ('in',)
+
+# Rows per batch when compact() rewrites parts
+COMPACT_BATCH = 50000
+
+_PARSERS = {
+    'str': str,
+    'int': int,
+    'float': float,
+    'bool': lambda text: text.lower() in ('1', 'true', 'yes'),
+}
+
+_EXTENSIONS = {'parquet': '.parquet', 'csv': '.csv.gz'}
+# part-<YYYYmmdd-HHMMSS>-<pid>-<sequence><extension>
+_PART_NAME = re.compile(r'^part-(\d{8}-\d{6})-(\d+)-(\d+)\.')
+
+
+def parquet_available() -> bool:
+    """Whether pyarrow can write Parquet"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def resolve_format(fmt: str = 'auto') -> str:
+    """Pick 'parquet' or 'csv'"""
+    if fmt == 'auto':
+        return 'parquet' if parquet_available() else 'csv'
+    if fmt == 'parquet' and not parquet_available():
+        raise RuntimeError('pyarrow is not installed (pip install pyarrow)')
+    if fmt not in _EXTENSIONS:
+        raise ValueError(f'Unknown report format: {fmt}')
+    return fmt
+
+
+def coerce(column: str, value):
+    """value as the column's type; '' and None are null"""
+    if column not in COLUMN_TYPES:
+        raise KeyError(f'Unknown column: {column}')
+    if value is None or value == '':
+        return None
+    kind = COLUMN_TYPES[column]
+    if kind == 'bool' and not isinstance(value, str):
+        return bool(value)
+    return _PARSERS[kind](value)
+
+
+def device_record(device_info: Dict, hardware: HardwareSnapshot,
+                  source: str = None, recorded_at: float = None) -> Dict:
+    """One report row from a detection and its parsed hardware records"""
+    memory = hardware.memory or MemInfo()
+    battery = hardware.battery or BatteryInfo()
+    cpu = hardware.cpu or CpuInfo()
+    storage = hardware.storage
+    record = {name: device_info.get(name) for name in (
+        'serial', 'brand', 'manufacturer', 'model', 'device', 'chipset', 'hardware',
+        'cpu_abi', 'android_version', 'security_patch', 'build_id', 'fingerprint',
+        'rooted', 'bootloader_unlocked', 'carrier_locked', 'frp_locked', 'oem_unlock_enabled'
+    )}
+    record.update({
+        'recorded_at': recorded_at or hardware.taken_at or time.time(),
+        'source': source,
+        'sdk_version': device_info.get('sdk_version'),
+        'cpu_count': cpu.processor_count or None,
+        'cpu_hardware': cpu.hardware,
+        'mem_total_kb': memory.total_kb,
+        'mem_available_kb': memory.available_kb,
+        'swap_total_kb': memory.swap_total_kb,
+        'storage_total_kb': storage and storage.total_kb,
+        'storage_used_kb': storage and storage.used_kb,
+        'storage_free_kb': storage and storage.free_kb,
+        'storage_usage_percent': storage and storage.usage_percent,
+        'battery_level': battery.level,
+        'battery_status': battery.status_name,
+        'battery_health': battery.health_name,
+        'battery_plugged': battery.plugged,
+        'battery_temperature_c': battery.temperature_c,
+        'battery_voltage_mv': battery.voltage_mv,
+        'battery_technology': battery.technology,
+    })
+    return normalize(record)
+
+
+def normalize(record: Dict) -> Dict:
+    """record with exactly COLUMNS, each value of its column type or None"""
+    row = {}
+    for name in COLUMN_NAMES:
+        try:
+            row[name] = coerce(name, record.get(name))
+        except (TypeError, ValueError):
+            row[name] = None
+    return row
+
+
+def _matches(row: Dict, filters: Sequence[Tuple[str, str, object]]) -> bool:
+    """Filter semantics of pyarrow: a null never matches"""
+    for column, op, value in filters:
+        actual = row[column]
+        if actual is None:
+            return False
+        if op == 'in':
+            if actual not in value:
+                return False
+        elif not _COMPARE[op](actual, value):
+            return False
+    return True
+
+
+def _check_filters(filters) -> List[Tuple[str, str, object]]:
+    checked = []
+    for column, op, value in filters or ():
+        if op not in OPERATORS:
+            raise ValueError(f'Unknown operator: {op}')
+        if op == 'in':
+            value = [coerce(column, v) for v in value]
+        else:
+            value = coerce(column, value)
+        checked.append((column, op, value))
+    return checked
+
+
+class _ParquetPart:
+    """Open Parquet part; each write is one row group"""
+
+    def __init__(self, path: str):
+        import pyarrow.parquet as pq
+        self.path = path
+        self.writer = pq.ParquetWriter(path, arrow_schema(), compression='zstd')
+
+    def write(self, rows: List[Dict]):
+        import pyarrow as pa
+        self.writer.write_table(pa.Table.from_pylist(rows, schema=arrow_schema()))
+
+    def close(self):
+        self.writer.close()
+
+
+class _CsvPart:
+    """Open gzip CSV part; each write is one gzip member"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = gzip.open(path, 'wt', newline='', compresslevel=6)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMN_NAMES)
+
+    def write(self, rows: List[Dict]):
+        self.writer.writerows(
+            ['' if row[name] is None else int(row[name]) if isinstance(row[name], bool)
+             else row[name] for name in COLUMN_NAMES]
+            for row in rows
+        )
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def arrow_schema():
+    """pyarrow schema of COLUMNS"""
+    import pyarrow as pa
+    types = {'str': pa.string(), 'int': pa.int64(), 'float': pa.float64(), 'bool': pa.bool_()}
+    return pa.schema([(name, types[kind]) for name, kind in COLUMNS])
+
+
+def _scan_csv(path: str, columns: List[str], filters) -> Iterator[Dict]:
+    # Filter columns are converted for every row, the rest only for matches
+    filter_columns = {column for column, _, _ in filters}
+    with gzip.open(path, 'rt', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        index = {name: i for i, name in enumerate(header)}
+        for values in reader:
+            row = {}
+            for name in filter_columns:
+                i = index.get(name)
+                row[name] = coerce(name, values[i]) if i is not None else None
+            if filters and not _matches(row, filters):
+                continue
+            for name in columns:
+                if name not in row:
+                    i = index.get(name)
+                    row[name] = coerce(name, values[i]) if i is not None else None
+            yield {name: row[name] for name in columns}
+
+
+def _scan_parquet(paths: List[str], columns: List[str], filters,
+                  batch_size: int) -> Iterator[Dict]:
+    import pyarrow.dataset as ds
+    expression = None
+    for column, op, value in filters:
+        field = ds.field(column)
+        term = field.isin(value) if op == 'in' else _COMPARE[op](field, value)
+        expression = term if expression is None else expression & term
+    dataset = ds.dataset(paths, schema=arrow_schema(), format='parquet')
+    for batch in dataset.to_batches(columns=columns, filter=expression, batch_size=batch_size):
+        yield from batch.to_pylist()
+
+
+def _scan_parts(paths: List[str], columns: List[str], filters,
+                batch_size: int) -> Iterator[Dict]:
+    parquet = [p for p in paths if p.endswith('.parquet')]
+    if parquet:
+        if not parquet_available():
+            raise RuntimeError('pyarrow is not installed (pip install pyarrow)')
+        yield from _scan_parquet(parquet, columns, filters, batch_size)
+    for path in paths:
+        if path.endswith('.csv.gz'):
+            yield from _scan_csv(path, columns, filters)
+
+
+class HardwareReport:
+    """
+    Append-only report over a directory of part files.
+
+    append() is cheap: rows are buffered and written BATCH_SIZE at a time.
+    A timer writes and closes the part once rows have waited flush_interval
+    seconds for it, so a slow trickle still reaches disk and other readers.
+    Safe to share between threads.
+    """
+
+    def __init__(self, directory: str = REPORT_DIR, fmt: str = REPORT_FORMAT,
+                 batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL,
+                 rows_per_part: int = ROWS_PER_PART):
+        self.directory = directory
+        self.format = resolve_format(fmt)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_per_part = rows_per_part
+        self._buffer: List[Dict] = []
+        # When the oldest row not yet in a closed part arrived
+        self._unclosed_since = None
+        self._part = None
+        self._part_rows = 0
+        self._sequence = 0
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, record: Dict):
+        """Buffer one row; writes a batch once enough rows are waiting"""
+        self.extend([record])
+
+    def extend(self, records):
+        """Buffer many rows, writing full batches as they fill"""
+        with self._lock:
+            for record in records:
+                self._buffer.append(normalize(record))
+                if self._unclosed_since is None:
+                    self._unclosed_since = time.monotonic()
+                if len(self._buffer) >= self.batch_size:
+                    self._write_batch()
+            if self._unclosed_since is not None and self._timer is None:
+                self._schedule_flush(self.flush_interval)
+
+    def _schedule_flush(self, delay: float):
+        if delay == float('inf'):
+            return
+        self._timer = threading.Timer(delay, self._timed_flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _timed_flush(self):
+        """Write and close the part once its oldest row is flush_interval old"""
+        with self._lock:
+            self._timer = None
+            if self._unclosed_since is None:
+                # Nothing arrived since the part was last closed
+                return
+            remaining = self._unclosed_since + self.flush_interval - time.monotonic()
+            if remaining > 0:
+                # The rows this timer was started for were closed already
+                self._schedule_flush(remaining)
+                return
+            try:
+                self._write_batch()
+                self._close_part()
+            except OSError as e:
+                print(f"Hardware report flush failed: {e}")
+
+    def flush(self):
+        """Write buffered rows and close the open part so scans see them"""
+        with self._lock:
+            self._write_batch()
+            self._close_part()
+
+    def close(self):
+        self.flush()
+
+    def _write_batch(self):
+        if not self._buffer:
+            return
+        if self._part is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._sequence += 1
+            name = (f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-"
+                    f"{self._sequence}{_EXTENSIONS[self.format]}")
+            # Hidden while open; an unclosed part has no footer
+            path = os.path.join(self.directory, '.' + name)
+            self._part = _ParquetPart(path) if self.format == 'parquet' else _CsvPart(path)
+            self._part_rows = 0
+        self._part.write(self._buffer)
+        self._part_rows += len(self._buffer)
+        self._buffer = []
+        if self._part_rows >= self.rows_per_part:
+            self._close_part()
+
+    def _close_part(self):
+        if self._part is None:
+            return
+        self._unclosed_since = None
+        self._part.close()
+        directory, name = os.path.split(self._part.path)
+        os.replace(self._part.path, os.path.join(directory, name[1:]))
+        self._part = None
+
+    def parts(self) -> List[str]:
+        """Closed part files, oldest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        parts = []
+        for name in names:
+            match = _PART_NAME.match(name)
+            if match and name.endswith(tuple(_EXTENSIONS.values())):
+                stamp, pid, sequence = match.groups()
+                parts.append(((stamp, int(pid), int(sequence)), name))
+        return [os.path.join(self.directory, name) for _, name in sorted(parts)]
+
+    def scan(self, columns: Sequence[str] = None, filters=None,
+             batch_size: int = 10000) -> Iterator[Dict]:
+        """
+        Stream rows as dicts of the requested columns.
+
+        filters is a list of (column, op, value) that must all hold, op one
+        of OPERATORS; 'in' takes a list. Closed parts are read first, then
+        rows still in the buffer. Batches already written to the open part
+        show up once it is closed, at most flush_interval later.
+        """
+        columns = list(columns or COLUMN_NAMES)
+        for name in columns:
+            if name not in COLUMN_TYPES:
+                raise KeyError(f'Unknown column: {name}')
+        filters = _check_filters(filters)
+        with self._lock:
+            paths = self.parts()
+            buffered = list(self._buffer)
+        yield from _scan_parts(paths, columns, filters, batch_size)
+        for row in buffered:
+            if not filters or _matches(row, filters):
+                yield {name: row[name] for name in columns}
+
+    def compact(self) -> Dict:
+        """Rewrite all parts into as few parts of the current format as possible"""
+        with self._lock:
+            self._write_batch()
+            self._close_part()
+            old = self.parts()
+            if len(old) < 2:
+                return {'parts_before': len(old), 'parts_after': len(old)}
+            rows = 0
+            for row in _scan_parts(old, COLUMN_NAMES, [], COMPACT_BATCH):
+                self._buffer.append(row)
+                rows += 1
+                if len(self._buffer) >= COMPACT_BATCH:
+                    self._write_batch()
+            self._write_batch()
+            self._close_part()
+            for path in old:
+                os.remove(path)
+            return {'parts_before': len(old), 'parts_after': len(self.parts()), 'rows': rows}
+
+    def stats(self) -> Dict:
+        """Format, part files and rows waiting to be written"""
+        with self._lock:
+            parts = self.parts()
+            return {
+                'directory': self.directory,
+                'format': self.format,
+                'parts': len(parts),
+                'bytes': sum(os.path.getsize(p) for p in parts),
+                'buffered_rows': len(self._buffer),
+                'open_part_rows': self._part_rows if self._part else 0,
+            }
+
+
+# Shared report, created on first use
+_report = None
+_report_lock = threading.Lock()
+
+
+def get_report() -> HardwareReport:
+    """The backend's hardware report"""
+    global _report
+    with _report_lock:
+        if _report is None:
+            _report = HardwareReport()
+            import atexit
+            atexit.register(_report.close)
+        return _report
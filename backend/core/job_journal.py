@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Job Journal
+Durable record of long-running device jobs that survives backend restarts
+"""
+
+import json
+import os
+import signal
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+JOURNAL_PATH = os.path.expanduser(
+    os.environ.get('KN3AUX_JOB_JOURNAL', '~/.kn3aux-core/jobs.db')
+)
+
+# Jobs still queued or running when their backend went away
+ACTIVE_STATES = ('queued', 'running')
+
+# Seconds between output offset updates for a running job
+PROGRESS_INTERVAL = 1.0
+
+# Seconds an orphan gets to exit after SIGTERM before SIGKILL
+ORPHAN_GRACE = 5.0
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stream_id TEXT,
+    command TEXT NOT NULL,
+    cwd TEXT,
+    timeout REAL,
+    state TEXT NOT NULL,
+    owner_pid INTEGER,
+    owner_start TEXT,
+    pid INTEGER,
+    pid_start TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    returncode INTEGER,
+    error TEXT,
+    output_lines INTEGER NOT NULL DEFAULT 0,
+    output_bytes INTEGER NOT NULL DEFAULT 0,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_stream ON jobs(stream_id, id);
+
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    at REAL NOT NULL,
+    state TEXT NOT NULL,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, id);
+'''
+
+
+def process_start_time(pid: int) -> Optional[str]:
+    """
+    Kernel start time of a process, None if it isn't running (or a zombie).
+
+    Together with the pid this identifies one process: a recycled pid has a
+    different start time. Outside Linux only liveness can be checked.
+    """
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            stat = f.read()
+        # Fields after the command name, which may contain spaces: state is
+        # field 3 and start time field 22
+        fields = stat.rsplit(')', 1)[1].split()
+        return None if fields[0] == 'Z' else fields[19]
+    except FileNotFoundError:
+        return None
+    except (OSError, IndexError):
+        pass
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except PermissionError:
+        pass
+    return ''
+
+
+def same_process(pid: Optional[int], start: Optional[str]) -> bool:
+    """Whether pid is still the process that was recorded with start"""
+    if not pid:
+        return False
+    current = process_start_time(pid)
+    if current is None:
+        return False
+    return not start or not current or current == start
+
+
+class JobJournal:
+    """
+    SQLite (WAL) journal of jobs: spec, state changes, output offsets, results.
+
+    Job output goes to a log file per job next to the database; the journal
+    tracks how many lines and bytes have been written so a client can fetch
+    it after the in-memory stream is gone. Each job records the backend
+    process that owns it, so reconcile() only touches jobs whose owner died.
+    """
+
+    def __init__(self, db_path: str = JOURNAL_PATH, log_dir: str = None):
+        self.db_path = db_path
+        self.log_dir = log_dir or os.path.join(os.path.dirname(db_path), 'jobs')
+        self.owner_pid = os.getpid()
+        self.owner_start = process_start_time(self.owner_pid)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            os.makedirs(self.log_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def log_path(self, job_id: int) -> str:
+        return os.path.join(self.log_dir, f'{job_id}.log')
+
+    def _transition(self, db: sqlite3.Connection, job_id: int, state: str,
+                    detail: str = None, **fields):
+        now = time.time()
+        columns = ['state = ?'] + [f'{k} = ?' for k in fields]
+        db.execute(f'UPDATE jobs SET {", ".join(columns)} WHERE id = ?',
+                   [state, *fields.values(), job_id])
+        db.execute('INSERT INTO job_events (job_id, at, state, detail) VALUES (?, ?, ?, ?)',
+                   (job_id, now, state, detail))
+
+    def create(self, command: List[str], stream_id: str = None, cwd: str = None,
+               timeout: float = None) -> int:
+        """Record a new queued job and return its id"""
+        with self._lock:
+            db = self._db()
+            with db:
+                cur = db.execute(
+                    'INSERT INTO jobs (stream_id, command, cwd, timeout, state, owner_pid, '
+                    'owner_start, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (stream_id, json.dumps([str(a) for a in command]), cwd, timeout,
+                     'queued', self.owner_pid, self.owner_start, time.time())
+                )
+                db.execute('INSERT INTO job_events (job_id, at, state) VALUES (?, ?, ?)',
+                           (cur.lastrowid, time.time(), 'queued'))
+        return cur.lastrowid
+
+    def started(self, job_id: int, command: List[str] = None):
+        """The job is running; command replaces the spec if prepare() changed it"""
+        fields = {'started_at': time.time()}
+        if command is not None:
+            fields['command'] = json.dumps([str(a) for a in command])
+        with self._lock:
+            db = self._db()
+            with db:
+                self._transition(db, job_id, 'running', **fields)
+
+    def attach_process(self, job_id: int, pid: int):
+        """Record the child process running the job, for reconcile()"""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute('UPDATE jobs SET pid = ?, pid_start = ? WHERE id = ?',
+                           (pid, process_start_time(pid), job_id))
+
+    def progress(self, job_id: int, lines: int, nbytes: int):
+        """Record how much output has been written to the job's log"""
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute('UPDATE jobs SET output_lines = ?, output_bytes = ? WHERE id = ?',
+                           (lines, nbytes, job_id))
+
+    def finish(self, job_id: int, state: str, returncode: int = None, error: str = None,
+               result: Dict = None, lines: int = None, nbytes: int = None):
+        """Record the job's final state: succeeded, failed, timed_out or error"""
+        fields = {'finished_at': time.time(), 'returncode': returncode, 'error': error}
+        if result is not None:
+            fields['result'] = json.dumps(result)
+        if lines is not None:
+            fields['output_lines'] = lines
+            fields['output_bytes'] = nbytes
+        detail = error or (None if returncode is None else f'exit code {returncode}')
+        with self._lock:
+            db = self._db()
+            with db:
+                self._transition(db, job_id, state, detail, **fields)
+
+    def reconcile(self, kill_orphans: bool = True) -> Dict:
+        """
+        Settle jobs left active by a backend process that no longer exists.
+
+        A job whose command is still running is an orphan: nobody reads its
+        output and its result would never be recorded. It is terminated when
+        kill_orphans is set and marked 'orphaned'. Jobs whose command already
+        exited are marked 'interrupted'. Run once at startup.
+        """
+        with self._lock:
+            rows = self._db().execute(
+                f'SELECT id, owner_pid, owner_start, pid, pid_start FROM jobs '
+                f'WHERE state IN ({", ".join("?" * len(ACTIVE_STATES))})', ACTIVE_STATES
+            ).fetchall()
+
+        report = {'interrupted': [], 'orphaned': [], 'terminated': []}
+        for row in rows:
+            if same_process(row['owner_pid'], row['owner_start']):
+                continue  # Owned by a live backend process (possibly this one)
+
+            if same_process(row['pid'], row['pid_start']):
+                detail = f"pid {row['pid']} still running"
+                if kill_orphans and terminate(row['pid']):
+                    detail = f"terminated orphaned pid {row['pid']}"
+                    report['terminated'].append(row['id'])
+                state = 'orphaned'
+            else:
+                state, detail = 'interrupted', 'backend stopped before the job finished'
+
+            # Offsets lag the log by up to PROGRESS_INTERVAL; take them from the file
+            lines, nbytes = self._log_extent(row['id'])
+            with self._lock:
+                db = self._db()
+                with db:
+                    self._transition(db, row['id'], state, detail, finished_at=time.time(),
+                                     output_lines=lines, output_bytes=nbytes)
+            report[state].append(row['id'])
+        return report
+
+    def _log_extent(self, job_id: int):
+        lines = nbytes = 0
+        try:
+            with open(self.log_path(job_id), 'rb') as f:
+                for block in iter(lambda: f.read(1024 * 1024), b''):
+                    lines += block.count(b'\n')
+                    nbytes += len(block)
+        except FileNotFoundError:
+            pass
+        return lines, nbytes
+
+    def get(self, job_id: int) -> Optional[Dict]:
+        """One job with its state history"""
+        with self._lock:
+            db = self._db()
+            row = db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None:
+                return None
+            events = db.execute(
+                'SELECT at, state, detail FROM job_events WHERE job_id = ? ORDER BY id',
+                (job_id,)
+            ).fetchall()
+        job = self._job_dict(row)
+        job['events'] = [
+            {'at': _iso(e['at']), 'state': e['state'], 'detail': e['detail']} for e in events
+        ]
+        return job
+
+    def list(self, state: str = None, stream_id: str = None, before: int = None,
+             limit: int = 50) -> Dict:
+        """
+        Jobs newest first, one page at a time.
+
+        Pages are keyed on the job id: pass the returned next_before to get
+        the following page. Each page is an index range scan, however deep.
+        """
+        where, params = [], []
+        if state:
+            where.append('state = ?')
+            params.append(state)
+        if stream_id:
+            where.append('stream_id = ?')
+            params.append(stream_id)
+        if before is not None:
+            where.append('id < ?')
+            params.append(before)
+        clause = ('WHERE ' + ' AND '.join(where)) if where else ''
+        with self._lock:
+            rows = self._db().execute(
+                f'SELECT * FROM jobs {clause} ORDER BY id DESC LIMIT ?', params + [limit + 1]
+            ).fetchall()
+        jobs = [self._job_dict(r) for r in rows[:limit]]
+        return {
+            'jobs': jobs,
+            'next_before': jobs[-1]['id'] if len(rows) > limit else None
+        }
+
+    def read_output(self, job_id: int, offset: int = 0, size: int = 65536) -> Optional[Dict]:
+        """A slice of the job's output log, None if the job has no log"""
+        try:
+            with open(self.log_path(job_id), 'rb') as f:
+                f.seek(offset)
+                data = f.read(size)
+                end = f.seek(0, os.SEEK_END)
+        except FileNotFoundError:
+            return None
+        return {
+            'offset': offset,
+            'next_offset': offset + len(data),
+            'size': end,
+            'data': data.decode('utf-8', errors='replace')
+        }
+
+    def prune(self, keep: int = 5000) -> int:
+        """Forget all but the newest keep finished jobs, with their logs"""
+        with self._lock:
+            db = self._db()
+            ids = [r[0] for r in db.execute(
+                f'SELECT id FROM jobs WHERE state NOT IN ({", ".join("?" * len(ACTIVE_STATES))}) '
+                'ORDER BY id DESC LIMIT -1 OFFSET ?', (*ACTIVE_STATES, keep)
+            )]
+            if ids:
+                with db:
+                    db.executemany('DELETE FROM jobs WHERE id = ?', [(i,) for i in ids])
+        for job_id in ids:
+            try:
+                os.remove(self.log_path(job_id))
+            except FileNotFoundError:
+                pass
+        return len(ids)
+
+    @staticmethod
+    def _job_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job['command'] = json.loads(job['command'])
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        for key in ('created_at', 'started_at', 'finished_at'):
+            job[key] = _iso(job[key])
+        for key in ('owner_start', 'pid_start'):
+            job.pop(key)
+        return job
+
+
+class JobLog:
+    """
+    Output log of one job, with offsets reported to the journal.
+
+    Lines are appended to the job's log file as they arrive; the journal is
+    updated at most every PROGRESS_INTERVAL seconds so chatty commands don't
+    turn into a database write per line.
+    """
+
+    def __init__(self, journal: JobJournal, job_id: int):
+        self.journal = journal
+        self.job_id = job_id
+        self.lines = 0
+        self.bytes = 0
+        self._file = open(journal.log_path(job_id), 'ab')
+        self._reported = time.monotonic()
+        self._lock = threading.Lock()
+
+    def write(self, line: str):
+        data = line.encode('utf-8', errors='replace')
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(data)
+            self._file.flush()
+            self.lines += 1
+            self.bytes += len(data)
+            report = time.monotonic() - self._reported >= PROGRESS_INTERVAL
+            if report:
+                self._reported = time.monotonic()
+        if report:
+            self.journal.progress(self.job_id, self.lines, self.bytes)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def terminate(pid: int, grace: float = ORPHAN_GRACE) -> bool:
+    """SIGTERM pid, then SIGKILL if it hasn't exited after grace seconds"""
+    start = process_start_time(pid)
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+
+    deadline = time.monotonic() + grace
+    while time.monotonic() < deadline:
+        if not same_process(pid, start):
+            return True
+        time.sleep(0.1)
+    try:
+        os.kill(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    return True
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+
+# Shared journal for the MTK executor
+journal = JobJournal()
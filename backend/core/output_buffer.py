@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Output Buffer
+Append-only job output shared by any number of stream viewers
+"""
+
+import threading
+import time
+from collections import deque
+from itertools import islice
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+class OutputBuffer:
+    """
+    Lines produced by one job, read independently by each viewer.
+
+    Viewers keep their own cursor (the index of the next line) instead of
+    taking lines off a shared queue, so every viewer sees the whole output and
+    a reconnecting viewer resumes where it stopped. Only the last max_lines
+    are kept; a viewer that falls further behind skips ahead.
+    """
+
+    def __init__(self, stream_id: str, max_lines: int = 10000, job_id: int = None):
+        self.stream_id = stream_id
+        self.job_id = job_id
+        self._lines = deque(maxlen=max_lines)
+        self._base = 0
+        self._cond = threading.Condition()
+        self.closed = False
+        self.returncode = None
+        self.started_at = datetime.now().isoformat()
+        self.finished_at = None
+
+    @property
+    def end(self) -> int:
+        """Cursor just past the newest line"""
+        return self._base + len(self._lines)
+
+    def append(self, line: str):
+        with self._cond:
+            if len(self._lines) == self._lines.maxlen:
+                self._base += 1
+            self._lines.append(line)
+            self._cond.notify_all()
+
+    def close(self, returncode: Optional[int] = None):
+        """Mark the job finished; viewers drain what is left and stop"""
+        with self._cond:
+            self.closed = True
+            self.returncode = returncode
+            self.finished_at = datetime.now().isoformat()
+            self._cond.notify_all()
+
+    def read(self, cursor: int, timeout: float = None) -> Tuple[List[str], int, bool]:
+        """
+        Wait up to timeout for lines at or after cursor.
+
+        Returns (lines, next_cursor, finished). finished is True once the job
+        is closed and the viewer has read everything.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while cursor >= self.end and not self.closed:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return [], cursor, False
+                self._cond.wait(remaining)
+
+            start = max(cursor, self._base)
+            lines = list(islice(self._lines, start - self._base, None))
+            cursor = self.end
+            return lines, cursor, self.closed
+
+    def status(self) -> Dict:
+        return {
+            'stream_id': self.stream_id,
+            'job_id': self.job_id,
+            'running': not self.closed,
+            'lines': self.end,
+            'returncode': self.returncode,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Process Runner
+One way to run external commands, with structured results and pluggable backends
+
+Every subprocess the backend starts (adb, fastboot, mtk, git, lsusb, zip) goes
+through ProcessRunner.run, which returns a RunResult instead of raising or
+returning None. Backends decide how a command actually runs:
+
+    ProcessBackend     a fresh child process per command
+    PooledShellBackend reuses one `adb shell` session per device for
+                       `adb [-s SERIAL] shell ...` commands
+    FakeBackend        canned responses, for tests and benchmarks
+"""
+
+import atexit
+import codecs
+import os
+import select
+import selectors
+import subprocess
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+# Bytes of combined output kept on every result, even when not capturing
+DEFAULT_TAIL_BYTES = 4096
+READ_CHUNK = 65536
+
+ADB_POOL_ENABLED = os.environ.get('KN3AUX_ADB_POOL', '1') != '0'
+
+
+class RunResult:
+    """Outcome of one command"""
+
+    def __init__(self, args: List[str], returncode: Optional[int] = None,
+                 duration: float = 0.0, timed_out: bool = False,
+                 stdout: bytes = b'', stderr: bytes = b'', tail: bytes = b'',
+                 error: str = None, backend: str = None):
+        self.args = list(args)
+        self.returncode = returncode
+        self.duration = duration
+        self.timed_out = timed_out
+        self.stdout = stdout
+        self.stderr = stderr
+        self.tail = tail
+        self.error = error
+        self.backend = backend
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out and self.error is None
+
+    @property
+    def failed_to_run(self) -> bool:
+        """True for timeouts and spawn errors, as opposed to a non-zero exit"""
+        return self.timed_out or self.error is not None
+
+    @property
+    def text(self) -> str:
+        """stdout decoded with universal newlines, like subprocess text mode"""
+        return _decode(self.stdout)
+
+    @property
+    def stderr_text(self) -> str:
+        return _decode(self.stderr)
+
+    @property
+    def tail_text(self) -> str:
+        return _decode(self.tail)
+
+    def describe(self) -> str:
+        """Short reason string for logs"""
+        if self.timed_out:
+            return f'timed out after {self.duration:.1f}s'
+        if self.error:
+            return self.error
+        return f'exit code {self.returncode}'
+
+    def to_dict(self) -> Dict:
+        return {
+            'args': self.args,
+            'returncode': self.returncode,
+            'duration_ms': round(self.duration * 1000, 3),
+            'timed_out': self.timed_out,
+            'error': self.error,
+            'backend': self.backend,
+            'tail': self.tail_text
+        }
+
+    def __repr__(self):
+        return f'<RunResult {" ".join(self.args)!r} {self.describe()}>'
+
+
+class LineDecoder:
+    """
+    Turns a stream of byte chunks into decoded lines for on_line callbacks.
+
+    \\r counts as a line end so progress bars show up as they redraw.
+    """
+
+    def __init__(self, on_line: Callable[[str], None]):
+        self.on_line = on_line
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._buffer = ''
+
+    def __call__(self, chunk: bytes):
+        self._buffer += self._decoder.decode(chunk)
+        lines = self._buffer.splitlines(keepends=True)
+        if lines and not lines[-1].endswith(('\n', '\r')):
+            self._buffer = lines.pop()
+        else:
+            self._buffer = ''
+        for line in lines:
+            self.on_line(line)
+
+    def flush(self):
+        self._buffer += self._decoder.decode(b'', final=True)
+        if self._buffer:
+            self.on_line(self._buffer)
+            self._buffer = ''
+
+
+class _Collector:
+    """Accumulates output for one run and feeds the streaming callback"""
+
+    def __init__(self, capture: bool, on_output: Callable[[bytes], None], tail_bytes: int,
+                 on_start: Callable[[int], None] = None):
+        self.capture = capture
+        self.on_output = on_output
+        self.on_start = on_start
+        self.tail_bytes = tail_bytes
+        self.stdout = []
+        self.stderr = []
+        self.tail = bytearray()
+
+    def started(self, pid: int):
+        """Called by backends that start a dedicated child process"""
+        if self.on_start:
+            self.on_start(pid)
+
+    def add(self, chunk: bytes, stream: str = 'stdout'):
+        if self.capture:
+            (self.stdout if stream == 'stdout' else self.stderr).append(chunk)
+        self.tail += chunk
+        if len(self.tail) > self.tail_bytes:
+            del self.tail[:-self.tail_bytes]
+        if self.on_output and stream == 'stdout':
+            self.on_output(chunk)
+
+    def result(self, args, backend: str, started: float, **kwargs) -> RunResult:
+        return RunResult(
+            args,
+            duration=time.monotonic() - started,
+            stdout=b''.join(self.stdout),
+            stderr=b''.join(self.stderr),
+            tail=bytes(self.tail),
+            backend=backend,
+            **kwargs
+        )
+
+
+class ProcessBackend:
+    """Runs each command as its own child process"""
+
+    name = 'process'
+
+    def run(self, args: List[str], timeout: float = None, cwd: str = None,
+            env: Dict = None, collector: _Collector = None,
+            merge_stderr: bool = False) -> RunResult:
+        started = time.monotonic()
+        try:
+            proc = subprocess.Popen(
+                args,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT if merge_stderr else subprocess.PIPE,
+                cwd=cwd,
+                env=env
+            )
+        except OSError as e:
+            return collector.result(args, self.name, started, error=f'{type(e).__name__}: {e}')
+
+        collector.started(proc.pid)
+        timed_out = _pump(proc, collector, None if timeout is None else started + timeout)
+        if timed_out:
+            proc.kill()
+        returncode = proc.wait()
+        return collector.result(
+            args, self.name, started,
+            returncode=None if timed_out else returncode,
+            timed_out=timed_out
+        )
+
+
+def _pump(proc: subprocess.Popen, collector: _Collector, deadline: Optional[float]) -> bool:
+    """Read the child's pipes until EOF; returns True if the deadline passed"""
+    selector = selectors.DefaultSelector()
+    selector.register(proc.stdout, selectors.EVENT_READ, 'stdout')
+    if proc.stderr:
+        selector.register(proc.stderr, selectors.EVENT_READ, 'stderr')
+
+    try:
+        while selector.get_map():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return True
+            for key, _ in selector.select(remaining):
+                chunk = os.read(key.fd, READ_CHUNK)
+                if not chunk:
+                    selector.unregister(key.fileobj)
+                    key.fileobj.close()
+                    continue
+                collector.add(chunk, key.data)
+        return False
+    finally:
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+        selector.close()
+
+
+class _ShellSession:
+    """One long-lived `adb shell` process running commands back to back"""
+
+    def __init__(self, prefix: List[str]):
+        self.prefix = prefix
+        self.token = uuid.uuid4().hex
+        self.marker = f'__KN3AUX_DONE_{self.token}'.encode()
+        self.err_marker = f'__KN3AUX_ERR_{self.token}'.encode()
+        self.lock = threading.Lock()
+        self.process = subprocess.Popen(
+            prefix,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        self._pending = {'stdout': b'', 'stderr': b''}
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def close(self):
+        if self.alive:
+            self.process.kill()
+        self.process.wait()
+        for pipe in (self.process.stdin, self.process.stdout, self.process.stderr):
+            pipe.close()
+
+    def _take(self, stream: str, marker: bytes, collector: _Collector):
+        """
+        Pass output before marker to the collector; returns the text after
+        the marker up to its newline, or None while it hasn't arrived.
+        """
+        pending = self._pending[stream]
+        end = pending.find(marker)
+        if end < 0:
+            # Everything but a possible partial marker is command output
+            safe = max(0, len(pending) - len(marker))
+            if safe:
+                collector.add(pending[:safe], stream)
+                self._pending[stream] = pending[safe:]
+            return None
+        newline = pending.find(b'\n', end)
+        if newline < 0:
+            return None
+        if end:
+            collector.add(pending[:end], stream)
+        self._pending[stream] = pending[newline + 1:]
+        return pending[end + len(marker):newline]
+
+    def run(self, args: List[str], command: str, timeout: Optional[float],
+            collector: _Collector, backend: str, merge_stderr: bool = False) -> RunResult:
+        """Run one command; the session is closed if it times out or dies"""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        # The subshell keeps cd/export/exit from reaching later commands, and
+        # stdin is detached so it can't swallow the commands queued after it.
+        # Each stream ends with its own marker, printed in two halves so a
+        # pty echoing our input never matches it.
+        line = (f'( {command}\n) </dev/null{" 2>&1" if merge_stderr else ""}; '
+                f"printf '%s%s %d\\n' __KN3AUX_DONE_ {self.token} $?; "
+                f"printf '%s%s\\n' __KN3AUX_ERR_ {self.token} >&2\n")
+        try:
+            self.process.stdin.write(line.encode())
+            self.process.stdin.flush()
+        except OSError as e:
+            self.close()
+            return collector.result(args, backend, started, error=f'adb shell session lost: {e}')
+
+        fds = {self.process.stdout.fileno(): 'stdout', self.process.stderr.fileno(): 'stderr'}
+        status = None
+        err_done = False
+        while True:
+            if status is None:
+                status = self._take('stdout', self.marker, collector)
+            if status is not None and not err_done:
+                # Without adb's shell protocol stderr arrives on stdout
+                err_done = (self._take('stderr', self.err_marker, collector) is not None
+                            or self._take('stdout', self.err_marker, collector) is not None)
+            if status is not None and err_done:
+                break
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                self.close()
+                return collector.result(args, backend, started, timed_out=True)
+            ready, _, _ = select.select(list(fds), [], [], remaining)
+            for fd in ready:
+                chunk = os.read(fd, READ_CHUNK)
+                if not chunk:
+                    self.close()
+                    return collector.result(args, backend, started,
+                                            error='adb shell session ended')
+                self._pending[fds[fd]] += chunk
+
+        try:
+            returncode = int(status.strip())
+        except ValueError:
+            returncode = None
+        return collector.result(args, backend, started, returncode=returncode)
+
+
+class PooledShellBackend:
+    """
+    Sends `adb [-s SERIAL] shell <command>` through a persistent shell per device.
+
+    Saves the adb client start and shell setup on every call, which dominates
+    short commands like getprop. Each command runs in its own subshell, so
+    state doesn't carry over, and stderr stays separate unless merge_stderr
+    is set. Anything else, or any command with cwd/env, goes to fallback.
+    """
+
+    name = 'pooled-shell'
+
+    def __init__(self, fallback=None, adb: str = 'adb'):
+        self.fallback = fallback or ProcessBackend()
+        self.adb = adb
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.sessions_started = 0
+
+    def _split(self, args: List[str]):
+        """Return (session prefix, shell command) or None if not poolable"""
+        if not args or os.path.basename(args[0]) != self.adb:
+            return None
+        rest = list(args[1:])
+        prefix = [args[0]]
+        if len(rest) >= 2 and rest[0] == '-s':
+            prefix += rest[:2]
+            rest = rest[2:]
+        if len(rest) < 2 or rest[0] != 'shell' or rest[1].startswith('-'):
+            return None
+        # adb joins the remaining arguments with spaces for the device shell
+        return prefix + ['shell'], ' '.join(rest[1:])
+
+    def _session(self, prefix: List[str]) -> Optional[_ShellSession]:
+        key = tuple(prefix)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None or not session.alive:
+                try:
+                    session = _ShellSession(prefix)
+                except OSError:
+                    return None
+                self._sessions[key] = session
+                self.sessions_started += 1
+            return session
+
+    def run(self, args: List[str], timeout: float = None, cwd: str = None,
+            env: Dict = None, collector: _Collector = None,
+            merge_stderr: bool = False) -> RunResult:
+        split = None if cwd or env else self._split(args)
+        session = split and self._session(split[0])
+        if not session:
+            return self.fallback.run(args, timeout=timeout, cwd=cwd, env=env,
+                                     collector=collector, merge_stderr=merge_stderr)
+        with session.lock:
+            return session.run(args, split[1], timeout, collector, self.name, merge_stderr)
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = list(self._sessions.values()), {}
+        for session in sessions:
+            session.close()
+
+
+class FakeBackend:
+    """
+    Answers commands from a table of canned responses; records every call.
+
+    Responses match on an argument prefix, longest first. Unmatched commands
+    fail as if the executable were missing.
+    """
+
+    name = 'fake'
+
+    def __init__(self):
+        self.responses = []
+        self.calls = []
+
+    def add(self, prefix: List[str], stdout: bytes = b'', returncode: int = 0,
+            stderr: bytes = b'', delay: float = 0.0):
+        """Register a response; str output is encoded as UTF-8"""
+        if isinstance(stdout, str):
+            stdout = stdout.encode()
+        if isinstance(stderr, str):
+            stderr = stderr.encode()
+        self.responses.append((list(prefix), stdout, returncode, stderr, delay))
+        self.responses.sort(key=lambda r: len(r[0]), reverse=True)
+
+    def run(self, args: List[str], timeout: float = None, cwd: str = None,
+            env: Dict = None, collector: _Collector = None,
+            merge_stderr: bool = False) -> RunResult:
+        started = time.monotonic()
+        self.calls.append(list(args))
+        for prefix, stdout, returncode, stderr, delay in self.responses:
+            if list(args[:len(prefix)]) != prefix:
+                continue
+            if timeout is not None and delay > timeout:
+                time.sleep(timeout)
+                return collector.result(args, self.name, started, timed_out=True)
+            time.sleep(delay)
+            for line in stdout.splitlines(keepends=True):
+                collector.add(line)
+            if stderr:
+                collector.add(stderr, 'stdout' if merge_stderr else 'stderr')
+            return collector.result(args, self.name, started, returncode=returncode)
+        return collector.result(
+            args, self.name, started,
+            error=f'FileNotFoundError: no fake response for {args[0] if args else "?"}'
+        )
+
+
+class ProcessRunner:
+    """Runs commands through a backend and returns RunResult objects"""
+
+    def __init__(self, backend=None):
+        self.backend = backend or ProcessBackend()
+
+    def run(self, args: List[str], timeout: float = None, cwd: str = None,
+            env: Dict = None, on_output: Callable[[bytes], None] = None,
+            on_line: Callable[[str], None] = None, capture: bool = True,
+            merge_stderr: bool = False, tail_bytes: int = DEFAULT_TAIL_BYTES,
+            on_start: Callable[[int], None] = None) -> RunResult:
+        """
+        Run a command to completion.
+
+        on_output receives raw stdout chunks as they arrive; on_line receives
+        decoded lines. With capture=False only the output tail is kept, for
+        long-running commands whose output is already streamed elsewhere.
+        on_start(pid) is called when the command gets its own child process
+        (not for pooled or warm-worker runs). Timeouts kill the command and
+        set timed_out; a command that can't be started sets error. Neither
+        raises.
+        """
+        decoder = LineDecoder(on_line) if on_line else None
+
+        def stream(chunk: bytes):
+            if on_output:
+                on_output(chunk)
+            if decoder:
+                decoder(chunk)
+
+        collector = _Collector(capture, stream if (on_output or decoder) else None, tail_bytes,
+                               on_start)
+        try:
+            return self.backend.run(
+                [str(a) for a in args], timeout=timeout, cwd=cwd, env=env,
+                collector=collector, merge_stderr=merge_stderr
+            )
+        finally:
+            if decoder:
+                decoder.flush()
+
+    def output(self, args: List[str], timeout: float = None, **kwargs) -> Optional[str]:
+        """Stripped stdout of a successful command, None otherwise"""
+        result = self.run(args, timeout=timeout, **kwargs)
+        if not result.ok:
+            return None
+        return result.text.strip() or None
+
+    def close(self):
+        close = getattr(self.backend, 'close', None)
+        if close:
+            close()
+
+
+def _decode(data: bytes) -> str:
+    text = data.decode('utf-8', errors='replace')
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+# Shared runner: adb shell commands reuse a session per device
+runner = ProcessRunner(PooledShellBackend() if ADB_POOL_ENABLED else ProcessBackend())
+atexit.register(runner.close)
@@ -5,28 +5,38 @@ MediaTek device unlock, flash, and exploit toolkit
 """
 
 from flask import Blueprint, jsonify, request, Response
-import subprocess
 import json
 import os
 import threading
-from queue import Queue
+from queue import Empty
 from datetime import datetime
 
+from .sparse_image import prepare_for_write, sparsify_directory
+from .usb_scanner import scanner, MTK_VENDOR_ID
+from .hotplug import watcher, format_sse
+from .result_cache import result_cache, mtk_args
+from .device_detector import get_device_key, detect_mtk_device
+from .mtk_runner import mtk_runner, MTK_PATH, MTK_CMD
+from .backup_files import BACKUP_ROOT, list_backups, resolve_backup_path, serve_file, new_backup_dir
+from .backup_catalog import catalog
+from core.output_buffer import OutputBuffer
+from core.job_journal import journal, JobLog
+
 bp = Blueprint('mtk_tool', __name__, url_prefix='/api/mtk')
 
-# MTK tool path
-MTK_PATH = os.path.join(
-    os.path.dirname(__file__),
-    'mtk-unlock-tool-version-2.0'
-)
-MTK_CMD = ['python3', os.path.join(MTK_PATH, 'mtk')]
+# Seconds between keep-alive comments on idle event streams
+SSE_KEEPALIVE = 15
 
 class MTKExecutor:
     """Execute MTK commands with live output streaming"""
     
+    # Finished streams kept around for late or reconnecting viewers
+    MAX_STREAMS = 32
+    
     def __init__(self):
-        self.output_queue = Queue()
-        self.process = None
+        self.streams = {}
+        self._job_logs = {}
+        self._lock = threading.Lock()
         self.log_file = os.path.expanduser('~/.kn3aux-core/logs/mtk_operations.log')
         os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
     
@@ -36,44 +46,134 @@ class MTKExecutor:
         with open(self.log_file, 'a') as f:
             f.write(f"[{timestamp}] {message}\n")
     
-    def execute(self, command: list, timeout: int = 300):
-        """Execute MTK command and stream output"""
+    def execute(self, command: list, timeout: float = None,
+                prepare=None, on_complete=None, stream_id: str = 'default'):
+        """
+        Execute MTK command and stream output to viewers of stream_id.
+
+        prepare() runs in the worker thread before the command starts and may
+        return a replacement command; on_complete(returncode) runs after it
+        exits (returncode is None if the command never ran or timed out).
+        timeout is unlimited by default since dumps and flashes can take hours.
+        Every run is recorded in the job journal with its full output.
+        """
         self._log(f"Executing: {' '.join(command)}")
+        device_key = get_device_key()
+        result_cache.note_command(mtk_args(command), device_key)
+        job_id = journal.create(command, stream_id=stream_id, cwd=MTK_PATH, timeout=timeout)
+        output = self._open_stream(stream_id, job_id)
+        job_log = JobLog(journal, job_id)
+        with self._lock:
+            self._job_logs[stream_id] = job_log
+        
+        def emit(line):
+            if line.strip():
+                output.append(line)
+                job_log.write(line)
+                self._log(f"OUTPUT: {line.strip()}")
+        
+        def report_error(message):
+            error_msg = f"Error: {message}"
+            output.append(error_msg)
+            job_log.write(error_msg + '\n')
+            self._log(f"ERROR: {error_msg}")
         
         def run():
+            nonlocal command
+            returncode = None
+            result = None
+            state, error = 'error', None
             try:
-                self.process = subprocess.Popen(
-                    command,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    cwd=MTK_PATH
-                )
-                
-                for line in iter(self.process.stdout.readline, ''):
-                    if line.strip():
-                        self.output_queue.put(line)
-                        self._log(f"OUTPUT: {line.strip()}")
+                if prepare:
+                    command = prepare() or command
+                journal.started(job_id, command if prepare else None)
                 
-                self.process.wait()
-                self._log(f"Completed with returncode: {self.process.returncode}")
-                self.output_queue.put(None)
+                # Output is streamed, so only the tail is kept in memory
+                result = mtk_runner.run(
+                    command, timeout=timeout, cwd=MTK_PATH,
+                    on_line=emit, capture=False, merge_stderr=True,
+                    on_start=lambda pid: journal.attach_process(job_id, pid)
+                )
+                returncode = result.returncode
+                if result.timed_out:
+                    state, error = 'timed_out', result.describe()
+                elif result.error:
+                    error = result.error
+                else:
+                    state = 'succeeded' if returncode == 0 else 'failed'
+                if result.failed_to_run:
+                    report_error(result.describe())
+                self._log(f"Completed with returncode: {returncode}")
             except Exception as e:
-                error_msg = f"Error: {str(e)}"
-                self.output_queue.put(error_msg)
-                self._log(f"ERROR: {error_msg}")
-                self.output_queue.put(None)
+                state, error = 'error', str(e)
+                report_error(str(e))
+            
+            if on_complete:
+                try:
+                    on_complete(returncode)
+                except Exception as e:
+                    state, error = 'error', str(e)
+                    report_error(str(e))
+            
+            with self._lock:
+                if self._job_logs.get(stream_id) is job_log:
+                    del self._job_logs[stream_id]
+            job_log.close()
+            journal.finish(
+                job_id, state, returncode=returncode, error=error,
+                result=result.to_dict() if result else None,
+                lines=job_log.lines, nbytes=job_log.bytes
+            )
+            # Reads cached while a write or erase was running are stale now
+            result_cache.note_command(mtk_args(command), device_key)
+            output.close(returncode)
         
         thread = threading.Thread(target=run, daemon=True)
         thread.start()
         return thread
     
-    def get_output(self):
-        """Get next line of output"""
-        try:
-            return self.output_queue.get(timeout=1)
-        except:
-            return None
+    def _open_stream(self, stream_id: str, job_id: int = None) -> OutputBuffer:
+        """Start a fresh buffer for stream_id, replacing the previous run's"""
+        output = OutputBuffer(stream_id, job_id=job_id)
+        with self._lock:
+            self.streams.pop(stream_id, None)
+            self.streams[stream_id] = output
+            finished = [k for k, v in self.streams.items() if v.closed]
+            for key in finished[:max(0, len(self.streams) - self.MAX_STREAMS)]:
+                del self.streams[key]
+        return output
+    
+    def get_stream(self, stream_id: str):
+        """Output buffer of the latest run for stream_id, None if unknown"""
+        with self._lock:
+            return self.streams.get(stream_id)
+    
+    def post(self, stream_id: str, line: str):
+        """Add a status line to a running stream"""
+        output = self.get_stream(stream_id)
+        if output:
+            output.append(line)
+        with self._lock:
+            job_log = self._job_logs.get(stream_id)
+        if job_log:
+            job_log.write(line)
+
+
+def run_mtk(command: list, timeout: float = None):
+    """
+    Run an MTK command to completion and return its RunResult.
+
+    Raises RuntimeError if the command could not run or timed out, so routes
+    report it through their usual error response. State-changing commands
+    invalidate the device's cached reads before and after they run.
+    """
+    device_key = get_device_key()
+    result_cache.note_command(mtk_args(command), device_key)
+    result = mtk_runner.run(command, timeout=timeout, cwd=MTK_PATH)
+    result_cache.note_command(mtk_args(command), device_key)
+    if result.failed_to_run:
+        raise RuntimeError(f"{' '.join(mtk_args(command))}: {result.describe()}")
+    return result
 
 executor = MTKExecutor()
 
@@ -105,17 +205,13 @@ def get_status():
 def detect_device():
     """Detect connected MTK device"""
     try:
-        result = subprocess.run(
-            ['lsusb'],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        
-        mtk_devices = []
-        for line in result.stdout.split('\n'):
-            if '0e8d' in line.lower():
-                mtk_devices.append(line.strip())
+        force = request.args.get('refresh') == '1'
+        if watcher.running and not force:
+            # The hotplug table is kept current by uevents; no bus scan needed
+            found = [d for d in watcher.snapshot() if d['vendor_id'] == MTK_VENDOR_ID]
+        else:
+            found = scanner.find(MTK_VENDOR_ID, force=force)
+        mtk_devices = [d['raw_info'] for d in found]
         
         if mtk_devices:
             return jsonify({
@@ -135,6 +231,46 @@ def detect_device():
             'error': str(e)
         }), 500
 
+@bp.route('/devices', methods=['GET'])
+def list_devices():
+    """List attached USB devices from the hotplug table"""
+    watcher.start()
+    devices = watcher.snapshot()
+    if request.args.get('vendor'):
+        devices = [d for d in devices if d['vendor_id'] == request.args['vendor'].lower()]
+    return jsonify({
+        'devices': devices,
+        'count': len(devices),
+        'watch_mode': watcher.mode
+    })
+
+@bp.route('/devices/events')
+def device_events():
+    """Stream USB attach/detach events"""
+    watcher.start()
+    events = watcher.subscribe()
+    
+    def generate():
+        try:
+            yield format_sse({'event': 'snapshot', 'devices': watcher.snapshot()})
+            while True:
+                try:
+                    yield format_sse(events.get(timeout=SSE_KEEPALIVE))
+                except Empty:
+                    # Keep-alive comment so proxies don't close idle streams
+                    yield ': keep-alive\n\n'
+        finally:
+            watcher.unsubscribe(events)
+    
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
 @bp.route('/unlock-bootloader', methods=['POST'])
 def unlock_bootloader():
     """Unlock bootloader"""
@@ -148,19 +284,19 @@ def unlock_bootloader():
         # Erase partitions
         for part in partitions:
             cmd = MTK_CMD + ['e', part]
-            result = subprocess.run(cmd, cwd=MTK_PATH, capture_output=True, text=True)
+            result = run_mtk(cmd)
             results.append({
                 'partition': part,
                 'success': result.returncode == 0,
-                'output': result.stdout
+                'output': result.text
             })
         
         # Unlock/Lock SECCFG
         action = 'lock' if lock else 'unlock'
         cmd = MTK_CMD + ['da', 'seccfg', action]
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=MTK_PATH)
+        result = run_mtk(cmd)
         
-        seccfg_success = result.returncode == 0 or 'successfully' in result.stdout.lower()
+        seccfg_success = result.returncode == 0 or 'successfully' in result.text.lower()
         
         all_success = all(r['success'] for r in results) and seccfg_success
         
@@ -173,7 +309,7 @@ def unlock_bootloader():
             'seccfg': {
                 'action': action,
                 'success': seccfg_success,
-                'output': result.stdout
+                'output': result.text
             }
         })
     except Exception as e:
@@ -194,7 +330,7 @@ def read_partition():
             return jsonify({'error': 'Partition and output required'}), 400
         
         cmd = MTK_CMD + ['r', partition, output_file]
-        executor.execute(cmd)
+        executor.execute(cmd, stream_id='read_partition')
         
         return jsonify({
             'success': True,
@@ -217,8 +353,23 @@ def write_partition():
         if not partition or not input_file:
             return jsonify({'error': 'Partition and input file required'}), 400
         
+        # Sparse vendor images are expanded in the worker thread before flashing
+        expanded = {}
+        
+        def prepare():
+            raw_file, is_temp = prepare_for_write(input_file)
+            if is_temp:
+                expanded['path'] = raw_file
+                executor.post('write_partition', f'Expanded sparse image to {raw_file}\n')
+            return MTK_CMD + ['w', partition, raw_file]
+        
+        def cleanup(returncode):
+            if expanded.get('path') and os.path.exists(expanded['path']):
+                os.remove(expanded['path'])
+        
         cmd = MTK_CMD + ['w', partition, input_file]
-        executor.execute(cmd)
+        executor.execute(cmd, prepare=prepare, on_complete=cleanup,
+                         stream_id='write_partition')
         
         return jsonify({
             'success': True,
@@ -235,17 +386,33 @@ def dump_all():
     """Dump all partitions to directory"""
     try:
         data = request.json or {}
-        output_dir = data.get('output_dir', os.path.expanduser('~/kn3aux_backups/mtk_dump'))
+        output_dir = os.path.expanduser(data.get('output_dir') or new_backup_dir())
+        sparse = bool(data.get('sparse', False))
         
         os.makedirs(output_dir, exist_ok=True)
+        device = detect_mtk_device()
+        
+        def finish(returncode):
+            if returncode != 0:
+                return
+            if sparse:
+                converted = sparsify_directory(output_dir)
+                executor.post(
+                    'dump_all', f'Stored {len(converted)} partition(s) as sparse images\n'
+                )
+            executor.post('dump_all', 'Indexing backup in catalog\n')
+            entry = catalog.record_backup(output_dir, device, source='dump_all')
+            executor.post('dump_all', f"Catalogued as backup #{entry['id']}\n")
         
         cmd = MTK_CMD + ['rl', output_dir]
-        executor.execute(cmd, timeout=3600)
+        executor.execute(cmd, on_complete=finish, stream_id='dump_all')
         
         return jsonify({
             'success': True,
             'message': f'Dumping all partitions to {output_dir}',
+            'backup_path': output_dir,
             'stream_id': 'dump_all',
+            'sparse': sparse,
             'estimated_time': '10-30 minutes depending on flash size'
         })
     except Exception as e:
@@ -259,7 +426,7 @@ def root_with_magisk():
     try:
         # Step 1: Dump boot and vbmeta
         cmd = MTK_CMD + ['r', 'boot,vbmeta', 'boot.img,vbmeta.img']
-        result = subprocess.run(cmd, cwd=MTK_PATH, capture_output=True, text=True)
+        result = run_mtk(cmd)
         
         success = result.returncode == 0 or os.path.exists('boot.img')
         
@@ -280,7 +447,7 @@ def root_with_magisk():
             return jsonify({
                 'success': False,
                 'message': 'Failed to dump boot images',
-                'output': result.stdout
+                'output': result.text
             })
     except Exception as e:
         return jsonify({
@@ -289,14 +456,35 @@ def root_with_magisk():
 
 @bp.route('/stream/<stream_id>')
 def stream_output(stream_id):
-    """Stream live output from MTK operations"""
+    """
+    Stream live output from MTK operations.
+    
+    Any number of viewers can follow the same operation; each reads the
+    shared buffer from its own cursor. Event ids are cursors, so a browser
+    reconnecting with Last-Event-ID resumes where it left off.
+    """
+    output = executor.get_stream(stream_id)
+    try:
+        cursor = int(request.headers.get('Last-Event-ID') or request.args.get('cursor') or 0)
+    except ValueError:
+        cursor = 0
+    
     def generate():
+        nonlocal cursor
+        if output is None:
+            yield f"data: {json.dumps({'complete': True, 'error': 'No such stream'})}\n\n"
+            return
         while True:
-            output = executor.get_output()
-            if output is None:
-                yield f"data: {json.dumps({'complete': True})}\n\n"
+            lines, cursor, finished = output.read(cursor, timeout=SSE_KEEPALIVE)
+            first_id = cursor - len(lines) + 1
+            for offset, line in enumerate(lines):
+                yield f"id: {first_id + offset}\ndata: {json.dumps({'output': line})}\n\n"
+            if finished:
+                yield f"data: {json.dumps({'complete': True, 'returncode': output.returncode})}\n\n"
                 break
-            yield f"data: {json.dumps({'output': output})}\n\n"
+            if not lines:
+                # Idle but still running; keep proxies from closing the stream
+                yield ': keep-alive\n\n'
     
     return Response(
         generate(),
@@ -307,17 +495,181 @@ def stream_output(stream_id):
         }
     )
 
+@bp.route('/stream/<stream_id>/status', methods=['GET'])
+def stream_status(stream_id):
+    """Poll an operation's progress without holding a stream open"""
+    output = executor.get_stream(stream_id)
+    if output is None:
+        return jsonify({'error': 'No such stream'}), 404
+    return jsonify(output.status())
+
+@bp.route('/jobs', methods=['GET'])
+def list_jobs():
+    """Job history, newest first; pass next_before back as ?before= for the next page"""
+    try:
+        return jsonify(journal.list(
+            state=request.args.get('state'),
+            stream_id=request.args.get('stream_id'),
+            before=request.args.get('before', type=int),
+            limit=min(request.args.get('limit', 50, type=int), 500)
+        ))
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@bp.route('/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """One job with its spec, state history and result"""
+    job = journal.get(job_id)
+    if job is None:
+        return jsonify({'error': 'No such job'}), 404
+    return jsonify(job)
+
+@bp.route('/jobs/<int:job_id>/output', methods=['GET'])
+def get_job_output(job_id):
+    """Read a job's recorded output from a byte offset, also after a restart"""
+    output = journal.read_output(
+        job_id,
+        offset=max(request.args.get('offset', 0, type=int), 0),
+        size=min(max(request.args.get('size', 65536, type=int), 1), 1024 * 1024)
+    )
+    if output is None:
+        return jsonify({'error': 'No output recorded for this job'}), 404
+    return jsonify(output)
+
+@bp.route('/backups', methods=['GET'])
+def get_backups():
+    """List backup images available for download"""
+    try:
+        return jsonify({'root': BACKUP_ROOT, 'files': list_backups()})
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@bp.route('/backups/<path:name>', methods=['GET'])
+def download_backup(name):
+    """Download a backup image; supports Range for resumed and segmented downloads"""
+    try:
+        path = resolve_backup_path(name)
+    except FileNotFoundError:
+        return jsonify({'error': 'No such backup'}), 404
+
+    status, headers, body = serve_file(request.environ, path)
+    # Hand the file wrapper to the server untouched so it can use sendfile
+    return Response(body, status=status, headers=headers, direct_passthrough=True)
+
+def _timestamp_arg(name: str):
+    """ISO date query argument as a Unix timestamp"""
+    value = request.args.get(name)
+    return datetime.fromisoformat(value).timestamp() if value else None
+
+@bp.route('/catalog', methods=['GET'])
+def query_catalog():
+    """Search catalogued backups by device, chipset, date, partition or hash"""
+    try:
+        return jsonify(catalog.query(
+            device_id=request.args.get('device_id'),
+            chipset=request.args.get('chipset'),
+            since=_timestamp_arg('since'),
+            until=_timestamp_arg('until'),
+            partition=request.args.get('partition'),
+            sha256=request.args.get('sha256'),
+            limit=min(request.args.get('limit', 50, type=int), 500),
+            offset=request.args.get('offset', 0, type=int)
+        ))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@bp.route('/catalog/devices', methods=['GET'])
+def catalog_devices():
+    """Devices that have backups, newest first"""
+    try:
+        return jsonify({'devices': catalog.devices()})
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@bp.route('/catalog/<int:backup_id>', methods=['GET'])
+def catalog_entry(backup_id):
+    """One catalogued backup with its partitions, sizes and hashes"""
+    backup = catalog.get(backup_id)
+    if backup is None:
+        return jsonify({'error': 'No such backup'}), 404
+    return jsonify(backup)
+
+@bp.route('/catalog/<int:backup_id>/pin', methods=['POST'])
+def pin_backup(backup_id):
+    """Exempt a backup from retention, or release it with {"pinned": false}"""
+    pinned = bool((request.json or {}).get('pinned', True))
+    if not catalog.set_pinned(backup_id, pinned):
+        return jsonify({'error': 'No such backup'}), 404
+    return jsonify({'success': True, 'backup_id': backup_id, 'pinned': pinned})
+
+@bp.route('/catalog/gc', methods=['POST'])
+def collect_backups():
+    """
+    Apply a retention policy to the backup archive.
+
+    Body: keep_last, max_age_days, max_total_bytes, keep_min, dry_run.
+    dry_run defaults to true so nothing is deleted unless asked for.
+    """
+    try:
+        data = request.json or {}
+        policy = {k: data[k] for k in ('keep_last', 'max_age_days', 'max_total_bytes', 'keep_min')
+                  if data.get(k) is not None}
+        return jsonify(catalog.gc(policy, dry_run=bool(data.get('dry_run', True))))
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
+@bp.route('/catalog/sync', methods=['POST'])
+def sync_catalog():
+    """Index backup directories written before the catalog existed"""
+    try:
+        data = request.json or {}
+        return jsonify(catalog.sync(hash_files=bool(data.get('hash', False))))
+    except Exception as e:
+        return jsonify({
+            'error': str(e)
+        }), 500
+
 @bp.route('/print-gpt', methods=['POST'])
 def print_gpt():
     """Print GPT partition table"""
     try:
-        cmd = MTK_CMD + ['printgpt']
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=MTK_PATH)
+        device_key = get_device_key()
+        if (request.args.get('refresh') == '1'
+                or (request.get_json(silent=True) or {}).get('refresh')):
+            result_cache.invalidate(device_key)
+        
+        def read_gpt():
+            # Routed through the warm worker when it is available
+            result = mtk_runner.run(MTK_CMD + ['printgpt'], cwd=MTK_PATH)
+            return {
+                'success': result.ok,
+                'gpt_table': result.text,
+                'error': result.describe() if result.failed_to_run else result.stderr_text,
+                'fetched_at': datetime.now().isoformat()
+            }
+        
+        gpt = result_cache.get_or_compute(
+            device_key, 'printgpt', read_gpt,
+            cacheable=lambda r: r['success']
+        )
         
         return jsonify({
             'success': True,
-            'gpt_table': result.stdout,
-            'error': result.stderr
+            'gpt_table': gpt['gpt_table'],
+            'error': gpt['error'],
+            'fetched_at': gpt['fetched_at']
         })
     except Exception as e:
         return jsonify({
@@ -329,12 +681,12 @@ def bypass_sla():
     """Bypass SLA/DA protection"""
     try:
         cmd = MTK_CMD + ['payload']
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=MTK_PATH)
+        result = run_mtk(cmd)
         
         return jsonify({
             'success': result.returncode == 0,
             'message': 'SLA/DA bypass attempted',
-            'output': result.stdout
+            'output': result.text
         })
     except Exception as e:
         return jsonify({
@@ -346,12 +698,12 @@ def crash_da():
     """Crash DA to enter BROM mode"""
     try:
         cmd = MTK_CMD + ['crash']
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=MTK_PATH)
+        result = run_mtk(cmd)
         
         return jsonify({
             'success': True,
             'message': 'DA crash command sent. Device should reboot to BROM.',
-            'output': result.stdout
+            'output': result.text
         })
     except Exception as e:
         return jsonify({
@@ -366,7 +718,7 @@ def read_preloader():
         output_file = data.get('output', 'preloader.bin')
         
         cmd = MTK_CMD + ['dumppreloader', f'--filename={output_file}']
-        executor.execute(cmd)
+        executor.execute(cmd, stream_id='read_preloader')
         
         return jsonify({
             'success': True,
@@ -387,7 +739,7 @@ def read_brom():
         ptype = data.get('ptype', 'kamakiri')
         
         cmd = MTK_CMD + ['dumpbrom', f'--ptype={ptype}', f'--filename={output_file}']
-        executor.execute(cmd)
+        executor.execute(cmd, stream_id='read_brom')
         
         return jsonify({
             'success': True,
@@ -404,11 +756,11 @@ def generate_keys():
     """Generate and display RPMB keys"""
     try:
         cmd = MTK_CMD + ['da', 'generatekeys']
-        result = subprocess.run(cmd, capture_output=True, text=True, cwd=MTK_PATH)
+        result = run_mtk(cmd)
         
         return jsonify({
             'success': result.returncode == 0,
-            'keys': result.stdout
+            'keys': result.text
         })
     except Exception as e:
         return jsonify({
@@ -439,3 +791,7 @@ def get_logs():
 def init_mtk_tool(app):
     """Register MTK tool plugin with Flask app"""
     app.register_blueprint(bp)
+    # Settle jobs a previous backend process left running
+    journal.reconcile()
+    journal.prune()
+    watcher.start()
@@ -4,14 +4,18 @@ MTK Tool Automation
 Pre-configured workflows for common operations
 """
 
-import subprocess
 import json
 import os
 import time
 from typing import List, Dict, Callable
 
-MTK_PATH = os.path.join(os.path.dirname(__file__), 'mtk-unlock-tool-version-2.0')
-MTK_CMD = ['python3', os.path.join(MTK_PATH, 'mtk')]
+from .sparse_image import prepare_for_write, sparsify_directory
+from .result_cache import result_cache, mtk_args
+from .device_detector import get_device_key, detect_mtk_device
+from .mtk_runner import mtk_runner, MTK_PATH, MTK_CMD
+from .backup_files import new_backup_dir
+from .backup_catalog import catalog
+
 
 class MTKAutomation:
     """Automated MTK workflows"""
@@ -34,34 +38,30 @@ class MTKAutomation:
     def _run(self, command: List[str], timeout: int = 60) -> Dict:
         """Run MTK command"""
         self._log(f"Running: {' '.join(command)}")
+        device_key = get_device_key()
+        result_cache.note_command(mtk_args(command), device_key)
         
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-                cwd=MTK_PATH
-            )
-            
-            success = result.returncode == 0
-            
-            self._log(f"Success: {success}")
-            if result.stdout:
-                self._log(f"Output: {result.stdout[:200]}")
-            
-            return {
-                'success': success,
-                'stdout': result.stdout,
-                'stderr': result.stderr,
-                'returncode': result.returncode
-            }
-        except subprocess.TimeoutExpired:
+        result = mtk_runner.run(command, timeout=timeout, cwd=MTK_PATH)
+        # Reads cached while the command ran may predate its changes
+        result_cache.note_command(mtk_args(command), device_key)
+        if result.timed_out:
             self._log("Command timed out")
             return {'success': False, 'error': 'Timeout'}
-        except Exception as e:
-            self._log(f"Error: {str(e)}")
-            return {'success': False, 'error': str(e)}
+        if result.error:
+            self._log(f"Error: {result.error}")
+            return {'success': False, 'error': result.error}
+        
+        stdout = result.text
+        self._log(f"Success: {result.ok}")
+        if stdout:
+            self._log(f"Output: {stdout[:200]}")
+        
+        return {
+            'success': result.ok,
+            'stdout': stdout,
+            'stderr': result.stderr_text,
+            'returncode': result.returncode
+        }
     
     def unlock_bootloader(self, erase_partitions: List[str] = None) -> Dict:
         """Complete bootloader unlock workflow"""
@@ -134,12 +134,14 @@ class MTKAutomation:
                 'message': 'Failed to lock bootloader'
             }
     
-    def full_backup(self, output_dir: str = None) -> Dict:
-        """Full partition backup"""
+    def full_backup(self, output_dir: str = None, sparse: bool = False) -> Dict:
+        """Full partition backup, optionally stored as sparse images"""
         if output_dir is None:
-            output_dir = os.path.expanduser('~/kn3aux_backups/mtk_dump')
+            output_dir = new_backup_dir()
         
         os.makedirs(output_dir, exist_ok=True)
+        # Identify the device now; it may re-enumerate during the dump
+        device = detect_mtk_device()
         
         self._log(f"Starting full backup to {output_dir}")
         
@@ -149,9 +151,19 @@ class MTKAutomation:
         )
         
         if result['success']:
+            sparse_stats = {}
+            if sparse:
+                self._log("Converting backup to sparse images")
+                sparse_stats = sparsify_directory(output_dir)
+            
+            self._log("Indexing backup in catalog")
+            entry = catalog.record_backup(output_dir, device, source='full_backup')
+            
             return {
                 'success': True,
                 'backup_path': output_dir,
+                'backup_id': entry['id'],
+                'sparse': sparse_stats,
                 'message': f'Backup completed to {output_dir}',
                 'next_steps': [
                     'Verify backup integrity',
@@ -262,7 +274,22 @@ class MTKAutomation:
                 'message': f'Input file not found: {input_file}'
             }
         
-        result = self._run(MTK_CMD + ['w', partition, input_file])
+        # Vendor images often ship sparse; mtk only flashes raw data
+        try:
+            raw_file, is_temp = prepare_for_write(input_file)
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'Failed to expand sparse image: {e}'
+            }
+        if is_temp:
+            self._log(f"Expanded sparse image to {raw_file}")
+        
+        try:
+            result = self._run(MTK_CMD + ['w', partition, raw_file])
+        finally:
+            if is_temp and os.path.exists(raw_file):
+                os.remove(raw_file)
         
         return {
             'success': result['success'],
@@ -287,7 +314,11 @@ class MTKAutomation:
         """Print GPT partition table"""
         self._log("Reading GPT")
         
-        result = self._run(MTK_CMD + ['printgpt'])
+        result = result_cache.get_or_compute(
+            get_device_key(), 'printgpt',
+            lambda: self._run(MTK_CMD + ['printgpt']),
+            cacheable=lambda r: r['success']
+        )
         
         return {
             'success': result['success'],
@@ -378,10 +409,10 @@ def quick_unlock() -> Dict:
     auto = MTKAutomation()
     return auto.unlock_bootloader()
 
-def quick_backup(output_dir: str = None) -> Dict:
+def quick_backup(output_dir: str = None, sparse: bool = False) -> Dict:
     """Quick full backup"""
     auto = MTKAutomation()
-    return auto.full_backup(output_dir)
+    return auto.full_backup(output_dir, sparse=sparse)
 
 def quick_root() -> Dict:
     """Quick Magisk root setup"""
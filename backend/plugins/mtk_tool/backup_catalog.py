@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+MTK Backup Catalog
+SQLite index of partition backups with retention and garbage collection
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from .backup_files import BACKUP_ROOT
+from .sparse_image import SPARSE_SUFFIX, is_sparse_file
+
+CATALOG_PATH = os.path.expanduser(
+    os.environ.get('KN3AUX_BACKUP_CATALOG', '~/.kn3aux-core/backup_catalog.db')
+)
+
+HASH_BLOCK = 1024 * 1024
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS backups (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    device_id TEXT,
+    usb_id TEXT,
+    chipset TEXT,
+    serial TEXT,
+    source TEXT,
+    created_at REAL NOT NULL,
+    total_size INTEGER NOT NULL DEFAULT 0,
+    partition_count INTEGER NOT NULL DEFAULT 0,
+    sparse INTEGER NOT NULL DEFAULT 0,
+    pinned INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_backups_device ON backups(device_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_backups_chipset ON backups(chipset, created_at);
+CREATE INDEX IF NOT EXISTS idx_backups_created ON backups(created_at);
+
+CREATE TABLE IF NOT EXISTS partitions (
+    backup_id INTEGER NOT NULL REFERENCES backups(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    file TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    sha256 TEXT,
+    sparse INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (backup_id, name)
+);
+CREATE INDEX IF NOT EXISTS idx_partitions_name ON partitions(name);
+CREATE INDEX IF NOT EXISTS idx_partitions_sha256 ON partitions(sha256);
+'''
+
+# Used by gc() when no policy is given: never delete, only tidy the index
+DEFAULT_RETENTION = {
+    'keep_last': None,        # newest N backups kept per device
+    'max_age_days': None,     # older backups expire
+    'max_total_bytes': None,  # oldest expired-or-not backups go first past this
+    'keep_min': 1             # newest N per device are never deleted
+}
+
+
+def device_identity(device: Optional[Dict]) -> Dict:
+    """
+    Catalog identity from detect_mtk_device() output.
+
+    The USB bus location is left out on purpose: it changes every time the
+    device re-enumerates, while USB ID, chipset and serial don't.
+    """
+    if not device or not device.get('detected'):
+        return {'device_id': None, 'usb_id': None, 'chipset': None, 'serial': None}
+    serial = device.get('serial') or None
+    usb_id = device.get('usb_id')
+    return {
+        'device_id': f"{usb_id}/{serial}" if serial else usb_id,
+        'usb_id': usb_id,
+        'chipset': device.get('chipset'),
+        'serial': serial
+    }
+
+
+def partition_name(filename: str) -> str:
+    """Partition a backup file holds: boot.img.simg -> boot"""
+    if filename.endswith(SPARSE_SUFFIX):
+        filename = filename[:-len(SPARSE_SUFFIX)]
+    for ext in ('.img', '.bin'):
+        if filename.endswith(ext):
+            return filename[:-len(ext)]
+    return filename
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def scan_backup_dir(path: str, hash_files: bool = True) -> List[Dict]:
+    """Describe every partition file in a backup directory"""
+    partitions = []
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        if not entry.is_file():
+            continue
+        partitions.append({
+            'name': partition_name(entry.name),
+            'file': entry.name,
+            'size': entry.stat().st_size,
+            'sha256': file_sha256(entry.path) if hash_files else None,
+            'sparse': is_sparse_file(entry.path)
+        })
+    return partitions
+
+
+class BackupCatalog:
+    """
+    Index of backup directories, their device and their partition files.
+
+    Lookups by device, chipset, date or partition hash hit an index instead
+    of walking the backup tree. One connection in WAL mode is shared behind a
+    lock; readers don't block on a backup being recorded.
+    """
+
+    def __init__(self, db_path: str = CATALOG_PATH, root: str = BACKUP_ROOT):
+        self.db_path = db_path
+        self.root = os.path.realpath(root)
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.db_path != ':memory:':
+                os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def record_backup(self, path: str, device: Dict = None, source: str = None,
+                      hash_files: bool = True, created_at: float = None) -> Dict:
+        """
+        Index a finished backup directory, replacing any earlier entry for it.
+
+        device is detect_mtk_device() output captured when the backup started.
+        """
+        path = os.path.realpath(path)
+        partitions = scan_backup_dir(path, hash_files=hash_files)
+        identity = device_identity(device)
+        if created_at is None:
+            created_at = time.time()
+
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute('DELETE FROM backups WHERE path = ?', (path,))
+                cur = db.execute(
+                    'INSERT INTO backups (path, device_id, usb_id, chipset, serial, source, '
+                    'created_at, total_size, partition_count, sparse) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (path, identity['device_id'], identity['usb_id'], identity['chipset'],
+                     identity['serial'], source, created_at,
+                     sum(p['size'] for p in partitions), len(partitions),
+                     int(any(p['sparse'] for p in partitions)))
+                )
+                backup_id = cur.lastrowid
+                db.executemany(
+                    'INSERT OR REPLACE INTO partitions '
+                    '(backup_id, name, file, size, sha256, sparse) VALUES (?, ?, ?, ?, ?, ?)',
+                    [(backup_id, p['name'], p['file'], p['size'], p['sha256'], int(p['sparse']))
+                     for p in partitions]
+                )
+
+        return self.get(backup_id)
+
+    def get(self, backup_id: int) -> Optional[Dict]:
+        """One backup with its partitions"""
+        with self._lock:
+            db = self._db()
+            row = db.execute('SELECT * FROM backups WHERE id = ?', (backup_id,)).fetchone()
+            if row is None:
+                return None
+            parts = db.execute(
+                'SELECT name, file, size, sha256, sparse FROM partitions '
+                'WHERE backup_id = ? ORDER BY name', (backup_id,)
+            ).fetchall()
+        backup = self._backup_dict(row)
+        backup['partitions'] = [dict(p, sparse=bool(p['sparse'])) for p in parts]
+        return backup
+
+    def query(self, device_id: str = None, chipset: str = None, since: float = None,
+              until: float = None, partition: str = None, sha256: str = None,
+              limit: int = 50, offset: int = 0) -> Dict:
+        """Backups matching every given filter, newest first"""
+        where, params = [], []
+        if device_id:
+            where.append('b.device_id = ?')
+            params.append(device_id)
+        if chipset:
+            where.append('b.chipset = ?')
+            params.append(chipset)
+        if since is not None:
+            where.append('b.created_at >= ?')
+            params.append(since)
+        if until is not None:
+            where.append('b.created_at < ?')
+            params.append(until)
+        if partition or sha256:
+            sub, sub_params = [], []
+            if partition:
+                sub.append('p.name = ?')
+                sub_params.append(partition)
+            if sha256:
+                sub.append('p.sha256 = ?')
+                sub_params.append(sha256)
+            where.append('b.id IN (SELECT p.backup_id FROM partitions p WHERE '
+                         + ' AND '.join(sub) + ')')
+            params.extend(sub_params)
+
+        clause = ('WHERE ' + ' AND '.join(where)) if where else ''
+        with self._lock:
+            db = self._db()
+            total = db.execute(f'SELECT COUNT(*) FROM backups b {clause}', params).fetchone()[0]
+            rows = db.execute(
+                f'SELECT b.* FROM backups b {clause} ORDER BY b.created_at DESC LIMIT ? OFFSET ?',
+                params + [limit, offset]
+            ).fetchall()
+        return {
+            'total': total,
+            'limit': limit,
+            'offset': offset,
+            'backups': [self._backup_dict(r) for r in rows]
+        }
+
+    def devices(self) -> List[Dict]:
+        """Backed-up devices with their backup count and newest backup"""
+        with self._lock:
+            rows = self._db().execute(
+                'SELECT device_id, usb_id, chipset, serial, COUNT(*) AS backups, '
+                'SUM(total_size) AS total_size, MAX(created_at) AS latest '
+                'FROM backups GROUP BY device_id ORDER BY latest DESC'
+            ).fetchall()
+        return [dict(r, latest=datetime.fromtimestamp(r['latest']).isoformat()) for r in rows]
+
+    def set_pinned(self, backup_id: int, pinned: bool = True) -> bool:
+        """Pinned backups are exempt from retention"""
+        with self._lock:
+            db = self._db()
+            with db:
+                cur = db.execute('UPDATE backups SET pinned = ? WHERE id = ?',
+                                 (int(pinned), backup_id))
+        return cur.rowcount > 0
+
+    def expired(self, keep_last: int = None, max_age_days: float = None,
+                max_total_bytes: int = None, keep_min: int = 1, now: float = None) -> List[Dict]:
+        """
+        Backups a retention policy would delete, oldest first.
+
+        A backup expires when it is beyond the newest keep_last of its device
+        or older than max_age_days. If the archive is still over
+        max_total_bytes, the oldest remaining ones go too. Pinned backups and
+        the newest keep_min per device always stay.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._db().execute(
+                'SELECT *, ROW_NUMBER() OVER ('
+                # Backups of unknown devices share one group
+                "  PARTITION BY COALESCE(device_id, '') ORDER BY created_at DESC"
+                ') AS rank FROM backups ORDER BY created_at ASC'
+            ).fetchall()
+
+        doomed, kept = [], []
+        for row in rows:
+            if row['pinned'] or row['rank'] <= keep_min:
+                kept.append(row)
+            elif keep_last is not None and row['rank'] > keep_last:
+                doomed.append(row)
+            elif max_age_days is not None and now - row['created_at'] > max_age_days * 86400:
+                doomed.append(row)
+            else:
+                kept.append(row)
+
+        if max_total_bytes is not None:
+            total = sum(r['total_size'] for r in kept)
+            for row in kept:
+                if total <= max_total_bytes:
+                    break
+                if row['pinned'] or row['rank'] <= keep_min:
+                    continue
+                doomed.append(row)
+                total -= row['total_size']
+
+        doomed.sort(key=lambda r: r['created_at'])
+        return [self._backup_dict(r) for r in doomed]
+
+    def gc(self, policy: Dict = None, dry_run: bool = False) -> Dict:
+        """
+        Apply a retention policy and tidy the index.
+
+        Deletes expired backup directories (only ones inside the backup root)
+        and drops entries whose directory has disappeared. A backup whose
+        directory holds other catalogued backups loses only its own files.
+        """
+        policy = {**DEFAULT_RETENTION, **(policy or {})}
+        doomed = self.expired(**policy)
+        deleted, freed, errors = [], 0, []
+        with self._lock:
+            paths = {r[0] for r in self._db().execute('SELECT path FROM backups')}
+
+        for backup in doomed:
+            path = backup['path']
+            if not dry_run:
+                if os.path.commonpath([self.root, path]) != self.root:
+                    errors.append({'path': path, 'error': 'outside backup root'})
+                    continue
+                try:
+                    if any(p != path and os.path.commonpath([path, p]) == path for p in paths):
+                        self._remove_files(backup['id'], path)
+                    else:
+                        shutil.rmtree(path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    errors.append({'path': path, 'error': str(e)})
+                    continue
+                self._delete(backup['id'])
+                paths.discard(path)
+            deleted.append(path)
+            freed += backup['total_size']
+
+        missing = [] if dry_run else self._drop_missing()
+        return {
+            'dry_run': dry_run,
+            'policy': policy,
+            'deleted': deleted,
+            'freed_bytes': freed,
+            'missing_removed': missing,
+            'errors': errors
+        }
+
+    def sync(self, directory: str = None, hash_files: bool = False) -> Dict:
+        """
+        Index backup directories that aren't in the catalog yet.
+
+        Meant for archives written before the catalog existed; such backups
+        have no device identity and use the directory mtime as their date.
+        Loose files in a directory that also holds backup directories (the
+        old single-folder mtk_dump) are one legacy backup of those files.
+        """
+        directory = directory or os.path.join(self.root, 'mtk_dump')
+        if not os.path.isdir(directory):
+            return {'added': [], 'missing_removed': self._drop_missing()}
+
+        with self._lock:
+            known = {r[0] for r in self._db().execute('SELECT path FROM backups')}
+
+        candidates = [directory] + [e.path for e in os.scandir(directory) if e.is_dir()]
+        added = []
+        for path in candidates:
+            path = os.path.realpath(path)
+            if path in known or not any(e.is_file() for e in os.scandir(path)):
+                continue
+            nested = any(e.is_dir() for e in os.scandir(path))
+            self.record_backup(path, source='legacy' if nested else 'sync',
+                               hash_files=hash_files, created_at=os.stat(path).st_mtime)
+            added.append(path)
+        return {'added': added, 'missing_removed': self._drop_missing()}
+
+    def _remove_files(self, backup_id: int, path: str):
+        """Delete only the partition files recorded for a backup"""
+        with self._lock:
+            files = [r[0] for r in self._db().execute(
+                'SELECT file FROM partitions WHERE backup_id = ?', (backup_id,))]
+        for name in files:
+            try:
+                os.remove(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+
+    def _delete(self, backup_id: int):
+        with self._lock:
+            db = self._db()
+            with db:
+                db.execute('DELETE FROM backups WHERE id = ?', (backup_id,))
+
+    def _drop_missing(self) -> List[str]:
+        with self._lock:
+            db = self._db()
+            paths = [r[0] for r in db.execute('SELECT path FROM backups')]
+            missing = [p for p in paths if not os.path.isdir(p)]
+            if missing:
+                with db:
+                    db.executemany('DELETE FROM backups WHERE path = ?', [(p,) for p in missing])
+        return missing
+
+    @staticmethod
+    def _backup_dict(row: sqlite3.Row) -> Dict:
+        backup = {k: row[k] for k in row.keys() if k != 'rank'}
+        backup['created_at'] = datetime.fromtimestamp(row['created_at']).isoformat()
+        backup['sparse'] = bool(row['sparse'])
+        backup['pinned'] = bool(row['pinned'])
+        return backup
+
+
+# Shared by the MTK blueprint and MTKAutomation
+catalog = BackupCatalog()
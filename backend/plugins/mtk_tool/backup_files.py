@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Backup File Serving
+Lists backup images and serves byte ranges of them without buffering in Python
+"""
+
+import os
+from datetime import datetime
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+
+from .sparse_image import is_sparse_file
+
+BACKUP_ROOT = os.path.expanduser(os.environ.get('KN3AUX_BACKUP_ROOT', '~/kn3aux_backups'))
+
+# Block size for servers that iterate the file wrapper instead of using sendfile
+BLOCK_SIZE = 1024 * 1024
+
+
+def new_backup_dir(kind: str = 'mtk_dump') -> str:
+    """Fresh timestamped directory under the backup root, so runs never overwrite"""
+    base = os.path.join(BACKUP_ROOT, kind, datetime.now().strftime('%Y%m%d-%H%M%S'))
+    path, n = base, 1
+    while os.path.exists(path):
+        n += 1
+        path = f'{base}-{n}'
+    return path
+
+
+class RangeNotSatisfiable(ValueError):
+    """The requested byte range lies outside the file"""
+
+
+def resolve_backup_path(name: str, root: str = BACKUP_ROOT) -> str:
+    """
+    Map a path relative to the backup root to a regular file inside it.
+
+    Raises FileNotFoundError for anything else, including paths that escape
+    the root through '..' or symlinks.
+    """
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise FileNotFoundError(name)
+    return path
+
+
+def list_backups(root: str = BACKUP_ROOT) -> List[Dict]:
+    """Every file under the backup root, newest first"""
+    files = []
+    root = os.path.realpath(root)
+    for dirpath, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.commonpath([root, os.path.realpath(path)]) != root:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append({
+                'name': os.path.relpath(path, root),
+                'size': st.st_size,
+                'modified': datetime.fromtimestamp(st.st_mtime).isoformat(),
+                'sparse': is_sparse_file(path)
+            })
+    files.sort(key=lambda f: f['modified'], reverse=True)
+    return files
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a Range header into (start, length).
+
+    Returns None when the whole file should be sent: no header, a unit other
+    than bytes, or several ranges (a full 200 is a valid answer to those).
+    Raises RangeNotSatisfiable for a range past the end of the file.
+    """
+    if not header or not header.startswith('bytes='):
+        return None
+    spec = header[6:].strip()
+    if ',' in spec:
+        return None
+
+    first, sep, last = spec.partition('-')
+    try:
+        if not sep:
+            return None
+        if first == '':
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            start = max(0, size - suffix)
+            return start, size - start
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    end = min(end, size - 1)
+    return start, end - start + 1
+
+
+class RangeFile:
+    """
+    File object limited to one byte range.
+
+    fileno() exposes the real descriptor, positioned at the range start, so a
+    server with sendfile support (gunicorn) transfers Content-Length bytes
+    straight from the page cache. read() stops at the range end for servers
+    that iterate the wrapper instead.
+    """
+
+    def __init__(self, path: str, start: int, length: int):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self._offset = start
+        self._remaining = length
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining <= 0:
+            return b''
+        if size < 0 or size > self._remaining:
+            size = self._remaining
+        # pread leaves the descriptor offset at the range start for sendfile
+        data = os.pread(self._file.fileno(), size, self._offset)
+        self._offset += len(data)
+        self._remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def _iter_range(range_file: RangeFile, block_size: int):
+    """Fallback body for servers without wsgi.file_wrapper"""
+    try:
+        while True:
+            block = range_file.read(block_size)
+            if not block:
+                break
+            yield block
+    finally:
+        range_file.close()
+
+
+def file_etag(st: os.stat_result) -> str:
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}"'
+
+
+def serve_file(environ: Dict, path: str, download_name: str = None):
+    """
+    Build (status, headers, body) for a GET/HEAD of path honouring Range.
+
+    The body is the server's wsgi.file_wrapper around a RangeFile when one
+    is available, so no bytes pass through Python on servers with sendfile.
+    """
+    st = os.stat(path)
+    size = st.st_size
+    etag = file_etag(st)
+    headers = [
+        ('Accept-Ranges', 'bytes'),
+        ('ETag', etag),
+        ('Last-Modified', formatdate(st.st_mtime, usegmt=True)),
+        ('Content-Type', 'application/octet-stream'),
+        ('Content-Disposition',
+         f'attachment; filename="{download_name or os.path.basename(path)}"')
+    ]
+
+    if environ.get('HTTP_IF_NONE_MATCH') == etag:
+        return '304 Not Modified', headers, []
+
+    range_header = environ.get('HTTP_RANGE')
+    if_range = environ.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag:
+        # File changed since the client's first segment; send it whole
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except RangeNotSatisfiable:
+        headers.append(('Content-Range', f'bytes */{size}'))
+        return '416 Range Not Satisfiable', headers, []
+
+    if byte_range is None:
+        status, start, length = '200 OK', 0, size
+    else:
+        start, length = byte_range
+        status = '206 Partial Content'
+        headers.append(('Content-Range', f'bytes {start}-{start + length - 1}/{size}'))
+    headers.append(('Content-Length', str(length)))
+
+    if environ.get('REQUEST_METHOD') == 'HEAD':
+        return status, headers, []
+
+    range_file = RangeFile(path, start, length)
+    file_wrapper = environ.get('wsgi.file_wrapper')
+    if file_wrapper:
+        body = file_wrapper(range_file, BLOCK_SIZE)
+    else:
+        body = _iter_range(range_file, BLOCK_SIZE)
+    return status, headers, body
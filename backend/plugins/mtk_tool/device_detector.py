@@ -4,10 +4,11 @@ MTK Device Auto-Detection
 Identifies chipset, bypass method, and optimal workflow
 """
 
-import subprocess
 import json
 import os
 
+from .usb_scanner import scanner, MTK_VENDOR_ID
+
 # Comprehensive MTK device database
 DEVICE_DATABASE = {
     # USB ID: {chipset, method, notes}
@@ -82,44 +83,51 @@ BRAND_WORKFLOWS = {
     }
 }
 
-def detect_mtk_device():
+def detect_mtk_device(force: bool = False):
     """Detect connected MTK device and return info"""
     try:
-        result = subprocess.run(['lsusb'], capture_output=True, text=True, timeout=5)
-        
-        for line in result.stdout.split('\n'):
-            if '0e8d' in line.lower():
-                # Extract vendor:product ID
-                parts = line.split()
-                for part in parts:
-                    if ':' in part and len(part) == 9:
-                        device_id = part.lower()
-                        
-                        if device_id in DEVICE_DATABASE:
-                            info = DEVICE_DATABASE[device_id]
-                            return {
-                                'detected': True,
-                                'usb_id': device_id,
-                                'chipset': info['chipset'],
-                                'bypass_method': info['method'],
-                                'notes': info.get('notes', ''),
-                                'raw_info': line
-                            }
-                        
-                        # Unknown MTK device
-                        return {
-                            'detected': True,
-                            'usb_id': device_id,
-                            'chipset': 'Unknown MTK',
-                            'bypass_method': 'generic',
-                            'notes': 'Unknown device - try generic bypass',
-                            'raw_info': line
-                        }
+        for device in scanner.find(MTK_VENDOR_ID, force=force):
+            device_id = device['usb_id']
+            
+            if device_id in DEVICE_DATABASE:
+                info = DEVICE_DATABASE[device_id]
+                return {
+                    'detected': True,
+                    'usb_id': device_id,
+                    'chipset': info['chipset'],
+                    'bypass_method': info['method'],
+                    'notes': info.get('notes', ''),
+                    'serial': device.get('serial', ''),
+                    'raw_info': device['raw_info']
+                }
+            
+            # Unknown MTK device
+            return {
+                'detected': True,
+                'usb_id': device_id,
+                'chipset': 'Unknown MTK',
+                'bypass_method': 'generic',
+                'notes': 'Unknown device - try generic bypass',
+                'serial': device.get('serial', ''),
+                'raw_info': device['raw_info']
+            }
         
         return {'detected': False, 'message': 'No MTK device found'}
     except Exception as e:
         return {'detected': False, 'error': str(e)}
 
+def get_device_key(force: bool = False):
+    """
+    Identity of the attached MTK device for caching, None if none attached.
+
+    Includes the bus device number so a re-enumerated device (after reset or
+    crash to BROM) gets a fresh key.
+    """
+    for device in scanner.find(MTK_VENDOR_ID, force=force):
+        location = device['sysfs_name'] or device['busnum']
+        return f"{device['usb_id']}@{location}#{device['devnum']}"
+    return None
+
 def detect_brand(device_info: str) -> str:
     """Detect device brand from USB info"""
     device_info_lower = device_info.lower()
@@ -248,14 +256,9 @@ def check_prerequisites():
     }
     
     # Check USB access
-    try:
-        result = subprocess.run(['lsusb'], capture_output=True, text=True, timeout=5)
-        if result.returncode != 0:
-            results['usb_accessible'] = False
-            results['issues'].append('USB access issue - check permissions')
-    except:
+    if not scanner.available:
         results['usb_accessible'] = False
-        results['issues'].append('Cannot access USB - check permissions')
+        results['issues'].append(f'Cannot read {scanner.sysfs_root} - check permissions')
     
     # Check MTK tool
     if not results['mtk_tool_installed']:
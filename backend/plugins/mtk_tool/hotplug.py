@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+USB Hotplug Watcher
+Tracks attached USB devices from kernel uevents and publishes attach/detach
+"""
+
+import json
+import socket
+import threading
+from datetime import datetime
+from queue import Queue, Full
+from typing import Dict, List
+
+from .usb_scanner import scanner as default_scanner
+
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1
+UEVENT_BUFFER = 64 * 1024
+
+
+class HotplugWatcher:
+    """
+    Background thread keeping an in-memory table of attached USB devices.
+
+    Uses the kernel uevent netlink socket when the platform allows it and
+    falls back to diffing sysfs scans every poll_interval seconds otherwise.
+    """
+
+    def __init__(self, scanner=None, poll_interval: float = 1.0):
+        self.scanner = scanner or default_scanner
+        self.poll_interval = poll_interval
+        self.mode = None
+        self.devices = {}
+        self._lock = threading.Lock()
+        self._subscribers = []
+        self._thread = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the watcher thread (no-op if already running)"""
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the watcher thread"""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+        self._thread = None
+
+    def snapshot(self) -> List[Dict]:
+        """Current device table"""
+        with self._lock:
+            return list(self.devices.values())
+
+    def subscribe(self, maxsize: int = 256) -> Queue:
+        """Register for attach/detach events"""
+        q = Queue(maxsize=maxsize)
+        with self._lock:
+            self._subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q: Queue):
+        with self._lock:
+            if q in self._subscribers:
+                self._subscribers.remove(q)
+
+    def _publish(self, event: Dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except Full:
+                # Slow viewers drop events rather than stall the watcher
+                pass
+
+    def sync(self):
+        """Rescan, update the device table and publish any differences"""
+        self.scanner.invalidate()
+        current = {_device_key(d): d for d in self.scanner.scan(force=True)}
+
+        with self._lock:
+            previous = self.devices
+            self.devices = current
+
+        timestamp = datetime.now().isoformat()
+        for key in previous.keys() - current.keys():
+            self._publish({'event': 'detach', 'device': previous[key], 'timestamp': timestamp})
+        for key in current.keys() - previous.keys():
+            self._publish({'event': 'attach', 'device': current[key], 'timestamp': timestamp})
+
+    def _run(self):
+        sock = _open_uevent_socket()
+        self.sync()
+
+        if sock is None:
+            self.mode = 'poll'
+            while not self._stop.wait(self.poll_interval):
+                self.sync()
+            return
+
+        self.mode = 'netlink'
+        sock.settimeout(self.poll_interval)
+        try:
+            while not self._stop.is_set():
+                try:
+                    data = sock.recv(UEVENT_BUFFER)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    # Socket died (e.g. ENOBUFS); resync and keep listening
+                    self.sync()
+                    continue
+                if _is_usb_device_event(data):
+                    self.sync()
+        finally:
+            sock.close()
+
+
+def _open_uevent_socket():
+    """Open the kernel uevent socket, None where netlink is unavailable"""
+    if not hasattr(socket, 'AF_NETLINK'):
+        return None
+    try:
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_KOBJECT_UEVENT)
+        sock.bind((0, UEVENT_KERNEL_GROUP))
+        return sock
+    except OSError:
+        return None
+
+
+def _is_usb_device_event(data: bytes) -> bool:
+    """Check a raw uevent for add/remove of a whole USB device"""
+    fields = data.split(b'\x00')
+    if not fields or b'@' not in fields[0]:
+        return False
+    action = fields[0].split(b'@', 1)[0]
+    if action not in (b'add', b'remove'):
+        return False
+    return b'SUBSYSTEM=usb' in fields and b'DEVTYPE=usb_device' in fields
+
+
+def _device_key(device: Dict) -> str:
+    """
+    Key for one enumeration of a device, as in device_detector. devnum
+    changes on every re-enumeration, so preloader -> BROM on the same port
+    is a detach and an attach even though sysfs_name stays the same.
+    """
+    location = device.get('sysfs_name') or device['busnum']
+    return f"{device['usb_id']}@{location}#{device['devnum']}"
+
+
+def format_sse(event: Dict) -> str:
+    """Serialise an event for text/event-stream"""
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+# Shared watcher used by the MTK blueprint
+watcher = HotplugWatcher()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+MTK Command Runner
+Process runner for mtk commands, routing short ones through the warm worker
+"""
+
+import os
+import time
+from typing import Dict, List
+
+from core.process_runner import ProcessRunner, ProcessBackend, RunResult
+
+from .mtk_worker import worker as default_worker, WARM_COMMANDS, WorkerCrashed, MTK_PATH
+from .result_cache import mtk_args
+
+MTK_CMD = ['python3', os.path.join(MTK_PATH, 'mtk')]
+
+# The warm worker needs a bound; commands sent to it are short anyway
+WARM_TIMEOUT = 300
+
+
+class WarmWorkerBackend:
+    """Runs WARM_COMMANDS in the warm worker and everything else via fallback"""
+
+    name = 'warm-worker'
+
+    def __init__(self, worker=None, fallback=None):
+        self.worker = worker or default_worker
+        self.fallback = fallback or ProcessBackend()
+
+    def run(self, args: List[str], timeout: float = None, cwd: str = None,
+            env: Dict = None, collector=None, merge_stderr: bool = False) -> RunResult:
+        command = mtk_args(args)
+        if env or not command or command[0] not in WARM_COMMANDS or not self.worker.available:
+            return self.fallback.run(args, timeout=timeout, cwd=cwd, env=env,
+                                     collector=collector, merge_stderr=merge_stderr)
+
+        started = time.monotonic()
+        try:
+            # The worker merges stderr into its output frames
+            returncode = self.worker.run(
+                command,
+                on_output=lambda text: collector.add(text.encode()),
+                timeout=WARM_TIMEOUT if timeout is None else timeout,
+                cwd=cwd
+            )
+        except TimeoutError:
+            return collector.result(args, self.name, started, timed_out=True)
+        except WorkerCrashed as e:
+            return collector.result(args, self.name, started, error=str(e))
+        return collector.result(args, self.name, started, returncode=returncode)
+
+
+# Shared runner for the MTK blueprint and MTKAutomation
+mtk_runner = ProcessRunner(WarmWorkerBackend())
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Warm MTK Tool Worker
+Long-lived interpreter that imports the mtk tool once and runs commands on demand
+
+Run as a script this module is the worker side: it reads one JSON request per
+line on stdin and answers with JSON frames on stdout. Imported, it provides
+WarmWorker, the client used by MTKExecutor and MTKAutomation.
+"""
+
+import json
+import os
+import select
+import subprocess
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+# Directory holding the `mtk` script; KN3AUX_MTK_PATH points it elsewhere
+# (e.g. backend/benchmarks/fake_mtk for hardware-free runs)
+MTK_PATH = os.environ.get('KN3AUX_MTK_PATH') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'mtk-unlock-tool-version-2.0'
+)
+
+# Short commands where interpreter startup dominates; long dumps stay cold
+WARM_COMMANDS = {'printgpt', 'gettargetconfig'}
+
+WARM_ENABLED = os.environ.get('KN3AUX_MTK_WARM', '1') != '0'
+
+
+class WorkerCrashed(RuntimeError):
+    """The worker process exited while running a command"""
+
+
+class WarmWorker:
+    """Client for a persistent mtk worker process; restarts it after a crash"""
+
+    def __init__(self, mtk_path: str = MTK_PATH, python: str = None):
+        self.mtk_path = mtk_path
+        self.script = os.path.join(mtk_path, 'mtk')
+        self.python = python or sys.executable or 'python3'
+        self.process = None
+        self._pending = b''
+        self.restarts = 0
+        self.commands_run = 0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return WARM_ENABLED and os.path.exists(self.script)
+
+    def _ensure_started(self):
+        if self.process and self.process.poll() is None:
+            return
+        if self.process is not None:
+            self.restarts += 1
+        self._pending = b''
+        self.process = subprocess.Popen(
+            [self.python, os.path.abspath(__file__), self.script],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=self.mtk_path
+        )
+
+    def _kill(self):
+        if self.process and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+
+    def run(self, args: List[str], on_output: Callable[[str], None] = None,
+            timeout: float = 300, cwd: str = None) -> int:
+        """
+        Run `mtk <args>` in the worker, streaming output lines to on_output.
+
+        Returns the exit code. Raises WorkerCrashed if the worker died (it is
+        restarted on the next call) and TimeoutError if the command overran.
+        """
+        with self._lock:
+            self._ensure_started()
+            request = json.dumps({'argv': list(args), 'cwd': cwd or self.mtk_path})
+            try:
+                self.process.stdin.write(request.encode() + b'\n')
+                self.process.stdin.flush()
+            except (BrokenPipeError, OSError):
+                self._kill()
+                raise WorkerCrashed('mtk worker is not accepting commands')
+
+            self.commands_run += 1
+            deadline = time.monotonic() + timeout
+
+            while True:
+                line = self._read_frame(deadline, args)
+                frame = json.loads(line)
+                if 'out' in frame:
+                    if on_output:
+                        on_output(frame['out'])
+                elif 'exit' in frame:
+                    return frame['exit']
+
+    def _read_frame(self, deadline: float, args: List[str]) -> bytes:
+        """Read one protocol line, buffering raw reads so select stays accurate"""
+        fd = self.process.stdout.fileno()
+        while b'\n' not in self._pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                # The tool may be mid-USB transfer; a fresh worker is safer
+                self._kill()
+                raise TimeoutError(f'mtk {" ".join(args)} timed out')
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                continue
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                self._kill()
+                raise WorkerCrashed('mtk worker exited unexpectedly')
+            self._pending += chunk
+        line, self._pending = self._pending.split(b'\n', 1)
+        return line
+
+    def shutdown(self):
+        with self._lock:
+            if self.process and self.process.poll() is None:
+                self.process.stdin.close()
+                try:
+                    self.process.wait(timeout=5)
+                except subprocess.TimeoutExpired:
+                    self._kill()
+
+
+class _FrameWriter:
+    """File-like stdout replacement that emits complete lines as frames"""
+
+    def __init__(self, proto):
+        self.proto = proto
+        self.buffer = ''
+
+    def write(self, text):
+        self.buffer += text
+        while True:
+            # Progress bars redraw with \r; treat it as a line end too
+            ends = [i for i in (self.buffer.find('\n'), self.buffer.find('\r')) if i >= 0]
+            if not ends:
+                break
+            cut = min(ends)
+            line, self.buffer = self.buffer[:cut + 1], self.buffer[cut + 1:]
+            _send(self.proto, {'out': line})
+        return len(text)
+
+    def flush(self):
+        if self.buffer:
+            _send(self.proto, {'out': self.buffer})
+            self.buffer = ''
+        self.proto.flush()
+
+    def isatty(self):
+        return False
+
+
+def _send(proto, frame: Dict):
+    proto.write(json.dumps(frame) + '\n')
+    proto.flush()
+
+
+def _serve(script: str):
+    """Worker loop: import the tool once, then execute requests from stdin"""
+    import runpy
+    import traceback
+
+    # Keep the protocol on a private fd; stray writes to fd 1 go to stderr
+    proto = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+    sys.path.insert(0, os.path.dirname(script))
+
+    try:
+        # Executes the tool's imports without reaching its __main__ block
+        runpy.run_path(script, run_name='__mtk_worker_warmup__')
+    except BaseException:
+        traceback.print_exc()
+
+    for raw in sys.stdin:
+        request = json.loads(raw)
+        writer = _FrameWriter(proto)
+        saved = sys.stdout, sys.stderr, sys.argv
+        sys.stdout = sys.stderr = writer
+        sys.argv = [script] + request['argv']
+        code = 0
+        try:
+            os.chdir(request.get('cwd') or os.path.dirname(script))
+            runpy.run_path(script, run_name='__main__')
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+            code = 1
+        finally:
+            writer.flush()
+            sys.stdout, sys.stderr, sys.argv = saved
+        _send(proto, {'exit': code})
+
+
+# Shared worker for the MTK plugin
+worker = WarmWorker()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print(f"usage: {sys.argv[0]} <path-to-mtk-script>", file=sys.stderr)
+        sys.exit(2)
+    _serve(sys.argv[1])
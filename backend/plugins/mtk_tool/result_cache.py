@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+MTK Query Result Cache
+TTL cache for read-only device queries with single-flight deduplication
+"""
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+# mtk verbs that never change device state; everything else invalidates
+READ_ONLY_COMMANDS = {
+    'printgpt', 'gettargetconfig', 'r', 'rl', 'rf', 'rs', 'ro',
+    'dumpbrom', 'dumppreloader', 'peek'
+}
+
+
+class _Flight:
+    """A computation in progress that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ResultCache:
+    """
+    Cache read-only query results per device.
+
+    Entries expire after ttl seconds and are dropped whenever a state-changing
+    command targets the same device. Concurrent identical requests share one
+    computation instead of each running the tool.
+    """
+
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._inflight = {}
+        self._generation = {}
+        self.stats = {'hits': 0, 'misses': 0, 'shared': 0, 'invalidations': 0}
+
+    def get_or_compute(self, device_key: Optional[str], query: str,
+                       compute: Callable[[], Dict], ttl: float = None,
+                       cacheable: Callable[[Dict], bool] = None) -> Dict:
+        """
+        Return a cached result or run compute() once for all waiting callers.
+
+        Without a device_key nothing is cached, since the result can't be
+        tied to a device. cacheable(result) decides whether to keep it.
+        """
+        if device_key is None:
+            return compute()
+
+        key = (device_key, query)
+        ttl = self.ttl if ttl is None else ttl
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.stats['hits'] += 1
+                return entry[1]
+
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._inflight[key] = flight
+                generation = self._generation.get(device_key, 0)
+                self.stats['misses'] += 1
+            else:
+                self.stats['shared'] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                # Skip storing if a write landed while we were computing
+                unchanged = self._generation.get(device_key, 0) == generation
+                if (flight.error is None and unchanged
+                        and (cacheable is None or cacheable(flight.result))):
+                    self._entries[key] = (time.monotonic() + ttl, flight.result)
+            flight.done.set()
+
+        return flight.result
+
+    def invalidate(self, device_key: Optional[str] = None):
+        """Drop entries for one device, or for all devices"""
+        with self._lock:
+            self.stats['invalidations'] += 1
+            if device_key is None:
+                devices = {k[0] for k in self._entries} | {k[0] for k in self._inflight}
+                for dev in devices | set(self._generation):
+                    self._generation[dev] = self._generation.get(dev, 0) + 1
+                self._entries.clear()
+                return
+            self._generation[device_key] = self._generation.get(device_key, 0) + 1
+            for key in [k for k in self._entries if k[0] == device_key]:
+                del self._entries[key]
+
+    def note_command(self, args: List[str], device_key: Optional[str] = None):
+        """Invalidate the device's entries if args is a state-changing command"""
+        if is_read_only(args):
+            return
+        self.invalidate(device_key)
+
+
+def is_read_only(args: List[str]) -> bool:
+    """Check whether mtk arguments describe a read-only operation"""
+    return bool(args) and args[0] in READ_ONLY_COMMANDS
+
+
+def mtk_args(command: List[str]) -> List[str]:
+    """Strip the interpreter and script from a full MTK command"""
+    for i, part in enumerate(command):
+        if part.endswith('/mtk') or part == 'mtk':
+            return command[i + 1:]
+    return command
+
+
+# Shared cache used by the MTK blueprint and MTKAutomation
+result_cache = ResultCache()
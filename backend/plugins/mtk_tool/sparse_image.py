@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Android Sparse Image Support
+Streaming sparse <-> raw conversion for partition backup and restore
+"""
+
+import os
+import struct
+import zlib
+from typing import BinaryIO, Dict, Iterator, Tuple
+
+SPARSE_MAGIC = 0xED26FF3A
+
+CHUNK_TYPE_RAW = 0xCAC1
+CHUNK_TYPE_FILL = 0xCAC2
+CHUNK_TYPE_DONT_CARE = 0xCAC3
+CHUNK_TYPE_CRC32 = 0xCAC4
+
+FILE_HEADER = struct.Struct('<IHHHHIIII')
+CHUNK_HEADER = struct.Struct('<HHII')
+
+DEFAULT_BLOCK_SIZE = 4096
+SPARSE_SUFFIX = '.simg'
+# Partition dumps worth converting; logs, manifests and the like are left alone
+RAW_IMAGE_SUFFIXES = ('.img', '.bin')
+
+# Upper bound for a single RAW chunk so chunk sizes stay well inside 32 bits
+MAX_RAW_CHUNK_BLOCKS = (64 * 1024 * 1024) // DEFAULT_BLOCK_SIZE
+COPY_BUFFER = 1024 * 1024
+
+
+class SparseImageError(ValueError):
+    """Raised for malformed or unsupported sparse images"""
+
+
+def is_sparse_file(path: str) -> bool:
+    """Check whether a file starts with the sparse image magic"""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(4)
+    except OSError:
+        return False
+    return len(head) == 4 and struct.unpack('<I', head)[0] == SPARSE_MAGIC
+
+
+def read_header(src: BinaryIO) -> Dict:
+    """Read and validate the sparse file header"""
+    raw = src.read(FILE_HEADER.size)
+    if len(raw) < FILE_HEADER.size:
+        raise SparseImageError('Truncated sparse header')
+
+    (magic, major, minor, file_hdr_sz, chunk_hdr_sz,
+     blk_sz, total_blks, total_chunks, checksum) = FILE_HEADER.unpack(raw)
+
+    if magic != SPARSE_MAGIC:
+        raise SparseImageError('Not a sparse image')
+    if major != 1:
+        raise SparseImageError(f'Unsupported sparse version {major}.{minor}')
+    if file_hdr_sz < FILE_HEADER.size or chunk_hdr_sz < CHUNK_HEADER.size:
+        raise SparseImageError('Invalid sparse header sizes')
+    if blk_sz == 0 or blk_sz % 4:
+        raise SparseImageError(f'Invalid block size {blk_sz}')
+
+    # Newer writers may extend the header; skip whatever we don't understand
+    if file_hdr_sz > FILE_HEADER.size:
+        src.read(file_hdr_sz - FILE_HEADER.size)
+
+    return {
+        'block_size': blk_sz,
+        'total_blocks': total_blks,
+        'total_chunks': total_chunks,
+        'chunk_header_size': chunk_hdr_sz,
+        'image_checksum': checksum
+    }
+
+
+def iter_chunks(src: BinaryIO, header: Dict) -> Iterator[Tuple[int, int, int]]:
+    """Yield (chunk_type, blocks, payload_size) leaving src at the payload"""
+    extra = header['chunk_header_size'] - CHUNK_HEADER.size
+
+    for _ in range(header['total_chunks']):
+        raw = src.read(CHUNK_HEADER.size)
+        if len(raw) < CHUNK_HEADER.size:
+            raise SparseImageError('Truncated chunk header')
+        chunk_type, _, chunk_blocks, total_sz = CHUNK_HEADER.unpack(raw)
+        if extra:
+            src.read(extra)
+        yield chunk_type, chunk_blocks, total_sz - header['chunk_header_size']
+
+
+def _copy_exact(src: BinaryIO, dst: BinaryIO, size: int, crc: int) -> int:
+    """Copy size bytes from src to dst, returning the updated CRC"""
+    remaining = size
+    while remaining:
+        buf = src.read(min(COPY_BUFFER, remaining))
+        if not buf:
+            raise SparseImageError('Truncated RAW chunk')
+        dst.write(buf)
+        crc = zlib.crc32(buf, crc)
+        remaining -= len(buf)
+    return crc
+
+
+def _write_repeated(dst: BinaryIO, pattern: bytes, size: int, crc: int) -> int:
+    """Write a repeating 4-byte pattern without materialising the whole run"""
+    buf = pattern * (COPY_BUFFER // 4)
+    if not buf and size:
+        raise SparseImageError('empty fill pattern')
+    remaining = size
+    while remaining:
+        piece = buf if remaining >= len(buf) else buf[:remaining]
+        dst.write(piece)
+        crc = zlib.crc32(piece, crc)
+        remaining -= len(piece)
+    return crc
+
+
+def expand(src: BinaryIO, dst: BinaryIO, verify_crc: bool = True) -> Dict:
+    """Expand a sparse stream into a raw stream"""
+    header = read_header(src)
+    blk_sz = header['block_size']
+    seekable = dst.seekable()
+    zero = b'\x00' * 4
+
+    crc = 0
+    blocks = 0
+    stats = {'raw': 0, 'fill': 0, 'dont_care': 0, 'crc32': 0}
+
+    for chunk_type, chunk_blocks, payload in iter_chunks(src, header):
+        size = chunk_blocks * blk_sz
+
+        if chunk_type == CHUNK_TYPE_RAW:
+            if payload != size:
+                raise SparseImageError('RAW chunk size mismatch')
+            crc = _copy_exact(src, dst, size, crc)
+            stats['raw'] += 1
+        elif chunk_type == CHUNK_TYPE_FILL:
+            if payload != 4:
+                raise SparseImageError('FILL chunk size mismatch')
+            pattern = src.read(4)
+            if len(pattern) != 4:
+                raise SparseImageError('truncated FILL chunk')
+            crc = _write_repeated(dst, pattern, size, crc)
+            stats['fill'] += 1
+        elif chunk_type == CHUNK_TYPE_DONT_CARE:
+            if seekable:
+                dst.seek(size, os.SEEK_CUR)
+                if verify_crc:
+                    crc = _write_repeated(_NullSink(), zero, size, crc)
+            else:
+                crc = _write_repeated(dst, zero, size, crc)
+            stats['dont_care'] += 1
+        elif chunk_type == CHUNK_TYPE_CRC32:
+            if payload != 4:
+                raise SparseImageError('CRC32 chunk size mismatch')
+            raw_crc = src.read(4)
+            if len(raw_crc) != 4:
+                raise SparseImageError('truncated CRC32 chunk')
+            expected = struct.unpack('<I', raw_crc)[0]
+            if verify_crc and expected != crc & 0xFFFFFFFF:
+                raise SparseImageError('CRC32 mismatch in sparse image')
+            stats['crc32'] += 1
+            continue
+        else:
+            raise SparseImageError(f'Unknown chunk type 0x{chunk_type:04x}')
+
+        blocks += chunk_blocks
+
+    if blocks != header['total_blocks']:
+        raise SparseImageError(
+            f"Block count mismatch: {blocks} != {header['total_blocks']}"
+        )
+
+    if seekable:
+        # A trailing DONT_CARE leaves a hole; make the file length explicit
+        dst.truncate(blocks * blk_sz)
+
+    return {
+        'block_size': blk_sz,
+        'total_blocks': blocks,
+        'raw_size': blocks * blk_sz,
+        'chunks': stats,
+        'crc32': crc & 0xFFFFFFFF
+    }
+
+
+class _NullSink:
+    """Write target used to keep the CRC running over skipped regions"""
+
+    def write(self, data):
+        return len(data)
+
+
+def _is_fill_block(block: bytes) -> bool:
+    """A block is a FILL candidate when it repeats its first 4 bytes"""
+    return block[4:] == block[:-4]
+
+
+class _SparseWriter:
+    """Stateful chunk emitter; patches RAW chunk headers on close"""
+
+    def __init__(self, dst: BinaryIO, block_size: int, skip_zeros: bool):
+        self.dst = dst
+        self.block_size = block_size
+        self.skip_zeros = skip_zeros
+        self.chunks = 0
+        self.blocks = 0
+        self.crc = 0
+        self.stats = {'raw': 0, 'fill': 0, 'dont_care': 0, 'crc32': 0}
+        # Current run: ('raw', header_pos, n) or ('fill', pattern, n)
+        self.run = None
+
+    def add_block(self, block: bytes):
+        self.crc = zlib.crc32(block, self.crc)
+        self.blocks += 1
+
+        if _is_fill_block(block):
+            pattern = block[:4]
+            if self.run and self.run[0] == 'fill' and self.run[1] == pattern:
+                self.run = ('fill', pattern, self.run[2] + 1)
+                return
+            self.flush()
+            self.run = ('fill', pattern, 1)
+            return
+
+        if (self.run and self.run[0] == 'raw'
+                and self.run[2] < MAX_RAW_CHUNK_BLOCKS):
+            self.dst.write(block)
+            self.run = ('raw', self.run[1], self.run[2] + 1)
+            return
+
+        self.flush()
+        header_pos = self.dst.tell()
+        self.dst.write(b'\x00' * CHUNK_HEADER.size)
+        self.dst.write(block)
+        self.run = ('raw', header_pos, 1)
+
+    def flush(self):
+        if not self.run:
+            return
+
+        kind, value, count = self.run
+        self.run = None
+        self.chunks += 1
+
+        if kind == 'raw':
+            end = self.dst.tell()
+            self.dst.seek(value)
+            self.dst.write(CHUNK_HEADER.pack(
+                CHUNK_TYPE_RAW, 0, count,
+                CHUNK_HEADER.size + count * self.block_size
+            ))
+            self.dst.seek(end)
+            self.stats['raw'] += 1
+        elif self.skip_zeros and value == b'\x00' * 4:
+            self.dst.write(CHUNK_HEADER.pack(
+                CHUNK_TYPE_DONT_CARE, 0, count, CHUNK_HEADER.size
+            ))
+            self.stats['dont_care'] += 1
+        else:
+            self.dst.write(CHUNK_HEADER.pack(
+                CHUNK_TYPE_FILL, 0, count, CHUNK_HEADER.size + 4
+            ))
+            self.dst.write(value)
+            self.stats['fill'] += 1
+
+    def add_crc(self):
+        self.flush()
+        self.chunks += 1
+        self.dst.write(CHUNK_HEADER.pack(
+            CHUNK_TYPE_CRC32, 0, 0, CHUNK_HEADER.size + 4
+        ))
+        self.dst.write(struct.pack('<I', self.crc & 0xFFFFFFFF))
+        self.stats['crc32'] += 1
+
+
+def compress(src: BinaryIO, dst: BinaryIO, block_size: int = DEFAULT_BLOCK_SIZE,
+             skip_zeros: bool = False, add_crc: bool = True) -> Dict:
+    """
+    Convert a raw stream into a sparse stream.
+
+    Zero runs are written as FILL chunks by default so a restore overwrites
+    stale data; pass skip_zeros=True to emit DONT_CARE instead. A trailing
+    partial block is zero padded, as the sparse format is block granular.
+    dst must be seekable because chunk and file headers are patched in place.
+    """
+    if block_size <= 0 or block_size % 4:
+        raise SparseImageError(f'Invalid block size {block_size}')
+
+    start = dst.tell()
+    dst.write(b'\x00' * FILE_HEADER.size)
+
+    writer = _SparseWriter(dst, block_size, skip_zeros)
+    raw_size = 0
+
+    while True:
+        block = src.read(block_size)
+        if not block:
+            break
+        raw_size += len(block)
+        if len(block) < block_size:
+            block += b'\x00' * (block_size - len(block))
+        writer.add_block(block)
+
+    if add_crc:
+        writer.add_crc()
+    else:
+        writer.flush()
+
+    end = dst.tell()
+    dst.seek(start)
+    dst.write(FILE_HEADER.pack(
+        SPARSE_MAGIC, 1, 0, FILE_HEADER.size, CHUNK_HEADER.size,
+        block_size, writer.blocks, writer.chunks, 0
+    ))
+    dst.seek(end)
+
+    return {
+        'block_size': block_size,
+        'total_blocks': writer.blocks,
+        'raw_size': raw_size,
+        'sparse_size': end - start,
+        'chunks': writer.stats,
+        'crc32': writer.crc & 0xFFFFFFFF
+    }
+
+
+def sparse_to_raw(src_path: str, dst_path: str, verify_crc: bool = True) -> Dict:
+    """Expand a sparse image file into a raw image file"""
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        return expand(src, dst, verify_crc=verify_crc)
+
+
+def raw_to_sparse(src_path: str, dst_path: str,
+                  block_size: int = DEFAULT_BLOCK_SIZE,
+                  skip_zeros: bool = False) -> Dict:
+    """Convert a raw image file into a sparse image file"""
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        return compress(src, dst, block_size=block_size, skip_zeros=skip_zeros)
+
+
+def prepare_for_write(input_file: str, work_dir: str = None) -> Tuple[str, bool]:
+    """
+    Return a raw image path suitable for `mtk w`.
+
+    Sparse inputs are expanded into work_dir (defaults to the input's
+    directory); the boolean tells the caller to delete the temp file after.
+    """
+    if not is_sparse_file(input_file):
+        return input_file, False
+
+    work_dir = work_dir or os.path.dirname(os.path.abspath(input_file))
+    base = os.path.basename(input_file)
+    if base.endswith(SPARSE_SUFFIX):
+        base = base[:-len(SPARSE_SUFFIX)]
+    raw_path = os.path.join(work_dir, f'.{base}.{os.getpid()}.raw')
+
+    try:
+        sparse_to_raw(input_file, raw_path)
+    except Exception:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+        raise
+    return raw_path, True
+
+
+def sparsify_directory(directory: str, remove_raw: bool = True) -> Dict:
+    """Convert every raw .img/.bin partition image in a backup directory to sparse form"""
+    results = {}
+
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not name.lower().endswith(RAW_IMAGE_SUFFIXES) or not os.path.isfile(path):
+            continue
+        if is_sparse_file(path):
+            continue
+
+        sparse_path = path + SPARSE_SUFFIX
+        try:
+            results[name] = raw_to_sparse(path, sparse_path)
+        except Exception as e:
+            if os.path.exists(sparse_path):
+                os.remove(sparse_path)
+            results[name] = {'error': str(e)}
+            continue
+
+        if remove_raw:
+            os.remove(path)
+
+    return results
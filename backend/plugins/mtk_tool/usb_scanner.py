@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+USB Device Scanner
+Reads attached USB devices straight from sysfs with a short-lived cache
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from core.process_runner import runner
+
+SYSFS_USB_DEVICES = '/sys/bus/usb/devices'
+MTK_VENDOR_ID = '0e8d'
+
+# Attributes read per device; idVendor/idProduct are required, the rest optional
+DEVICE_ATTRIBUTES = ('idVendor', 'idProduct', 'manufacturer', 'product',
+                     'serial', 'busnum', 'devnum', 'speed')
+
+
+class USBScanner:
+    """Enumerate USB devices from sysfs, caching results between calls"""
+
+    def __init__(self, sysfs_root: str = SYSFS_USB_DEVICES, ttl: float = 2.0):
+        self.sysfs_root = sysfs_root
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._devices = None
+        self._scanned_at = 0.0
+        self.scan_count = 0
+
+    @property
+    def available(self) -> bool:
+        """True when the sysfs USB tree can be read"""
+        return os.path.isdir(self.sysfs_root) and os.access(self.sysfs_root, os.R_OK)
+
+    def invalidate(self):
+        """Drop cached results so the next call rescans"""
+        with self._lock:
+            self._devices = None
+
+    def scan(self, force: bool = False) -> List[Dict]:
+        """Return all attached USB devices"""
+        with self._lock:
+            fresh = time.monotonic() - self._scanned_at < self.ttl
+            if self._devices is not None and fresh and not force:
+                return list(self._devices)
+
+            if self.available:
+                devices = self._scan_sysfs()
+            else:
+                devices = self._scan_lsusb()
+
+            self._devices = devices
+            self._scanned_at = time.monotonic()
+            self.scan_count += 1
+            return list(devices)
+
+    def find(self, vendor_id: str = MTK_VENDOR_ID, force: bool = False) -> List[Dict]:
+        """Return attached devices matching a vendor ID"""
+        vendor_id = vendor_id.lower()
+        return [d for d in self.scan(force) if d['vendor_id'] == vendor_id]
+
+    def _scan_sysfs(self) -> List[Dict]:
+        """Read idVendor/idProduct for each device node under sysfs"""
+        devices = []
+
+        try:
+            entries = sorted(os.listdir(self.sysfs_root))
+        except OSError:
+            return devices
+
+        for name in entries:
+            # Interfaces look like "1-1:1.0"; only whole devices carry IDs
+            if ':' in name:
+                continue
+            path = os.path.join(self.sysfs_root, name)
+            attrs = {}
+            for attr in DEVICE_ATTRIBUTES:
+                value = _read_attr(path, attr)
+                if value is not None:
+                    attrs[attr] = value
+            if 'idVendor' not in attrs or 'idProduct' not in attrs:
+                continue
+            devices.append(_make_device(
+                attrs['idVendor'], attrs['idProduct'],
+                sysfs_name=name, attrs=attrs
+            ))
+
+        return devices
+
+    def _scan_lsusb(self) -> List[Dict]:
+        """Fallback for hosts without a readable sysfs (e.g. some Termux setups)"""
+        result = runner.run(['lsusb'], timeout=5)
+        if result.failed_to_run:
+            return []
+
+        devices = []
+        for line in result.text.split('\n'):
+            parts = line.split()
+            # Bus 001 Device 004: ID 0e8d:0003 MediaTek Inc. ...
+            if len(parts) < 6 or parts[4] != 'ID' or ':' not in parts[5]:
+                continue
+            vendor, product = parts[5].lower().split(':', 1)
+            attrs = {
+                'busnum': parts[1].lstrip('0') or '0',
+                'devnum': parts[3].rstrip(':').lstrip('0') or '0',
+                'product': ' '.join(parts[6:])
+            }
+            devices.append(_make_device(vendor, product, attrs=attrs, raw_info=line.strip()))
+        return devices
+
+
+def _read_attr(device_path: str, attr: str) -> Optional[str]:
+    """Read a single sysfs attribute, None if it doesn't exist"""
+    try:
+        with open(os.path.join(device_path, attr)) as f:
+            return f.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _make_device(vendor: str, product: str, sysfs_name: str = None,
+                 attrs: Dict = None, raw_info: str = None) -> Dict:
+    """Build the device record shared by the sysfs and lsusb paths"""
+    attrs = attrs or {}
+    vendor = vendor.lower()
+    product = product.lower()
+    busnum = attrs.get('busnum', '')
+    devnum = attrs.get('devnum', '')
+    description = ' '.join(
+        x for x in (attrs.get('manufacturer'), attrs.get('product')) if x
+    )
+
+    if raw_info is None:
+        # Mirror lsusb's line format so existing consumers keep working
+        raw_info = (
+            f"Bus {busnum.zfill(3)} Device {devnum.zfill(3)}: "
+            f"ID {vendor}:{product} {description}"
+        ).strip()
+
+    return {
+        'usb_id': f'{vendor}:{product}',
+        'vendor_id': vendor,
+        'product_id': product,
+        'busnum': busnum,
+        'devnum': devnum,
+        'manufacturer': attrs.get('manufacturer', ''),
+        'product': attrs.get('product', ''),
+        'serial': attrs.get('serial', ''),
+        'sysfs_name': sysfs_name,
+        'raw_info': raw_info
+    }
+
+
+# Shared scanner used by device_detector and the MTK blueprint
+scanner = USBScanner()
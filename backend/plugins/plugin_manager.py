@@ -5,11 +5,244 @@ Dynamic plugin loading and marketplace system
 """
 
 import os
+import re
+import sys
 import json
+import shutil
+import hashlib
+import tarfile
+import zipfile
+import time
+import types
+import atexit
+import tempfile
+import threading
 import importlib
+import importlib.util
+import importlib.machinery
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from core.process_runner import runner
+
+# Every plugin is imported as a package under this namespace
+PLUGIN_NAMESPACE = 'kn3aux_plugins'
+
+
+def plugin_package_name(plugin_name: str) -> str:
+    """Unique package name for a plugin directory"""
+    return PLUGIN_NAMESPACE + '.' + re.sub(r'\W', '_', plugin_name)
+
+
+def import_plugin_module(plugin_name: str, plugin_dir: Path):
+    """
+    Import <plugin_dir>/plugin.py as kn3aux_plugins.<name>.plugin.
+
+    The plugin directory becomes a package, so plugins can use relative
+    imports between their own files and never collide with each other in
+    sys.modules. Nothing is added to sys.path.
+    """
+    if PLUGIN_NAMESPACE not in sys.modules:
+        root = types.ModuleType(PLUGIN_NAMESPACE)
+        root.__path__ = []
+        sys.modules[PLUGIN_NAMESPACE] = root
+    
+    package_name = plugin_package_name(plugin_name)
+    if package_name not in sys.modules:
+        init_file = plugin_dir / '__init__.py'
+        spec = importlib.util.spec_from_file_location(
+            package_name,
+            str(init_file) if init_file.exists() else None,
+            submodule_search_locations=[str(plugin_dir)]
+        )
+        if spec is None:
+            spec = importlib.machinery.ModuleSpec(package_name, None, is_package=True)
+            spec.submodule_search_locations = [str(plugin_dir)]
+        package = importlib.util.module_from_spec(spec)
+        sys.modules[package_name] = package
+        try:
+            if spec.loader:
+                spec.loader.exec_module(package)
+        except Exception:
+            del sys.modules[package_name]
+            raise
+    
+    return importlib.import_module(f'{package_name}.plugin')
+
+
+def purge_plugin_modules(plugin_name: str) -> Dict:
+    """Remove a plugin's modules from sys.modules, returning them"""
+    package_name = plugin_package_name(plugin_name)
+    removed = {}
+    for module_name in list(sys.modules):
+        if module_name == package_name or module_name.startswith(package_name + '.'):
+            removed[module_name] = sys.modules.pop(module_name)
+    return removed
+
+
+def plugin_source_signature(plugin_dir: Path) -> int:
+    """Latest mtime across a plugin's source and manifest files"""
+    latest = 0
+    for root, dirs, files in os.walk(plugin_dir):
+        dirs[:] = [d for d in dirs if d != '__pycache__']
+        for name in files:
+            if name.endswith(('.py', '.json')):
+                try:
+                    latest = max(latest, os.stat(os.path.join(root, name)).st_mtime_ns)
+                except FileNotFoundError:
+                    continue
+    return latest
+
+
+def current_rss_kb() -> Optional[int]:
+    """Resident set size of this process in KiB, None if unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS, but still shows growth between loads
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    except (ImportError, OSError):
+        return None
+
+
+class RequestStats:
+    """Per-plugin request latency counters with a window for percentiles"""
+    
+    def __init__(self, window: int = 512):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._recent = deque(maxlen=window)
+    
+    def record(self, elapsed_ms: float, failed: bool = False):
+        with self._lock:
+            self.count += 1
+            self.errors += failed
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+            self._recent.append(elapsed_ms)
+    
+    def summary(self) -> Dict:
+        with self._lock:
+            recent = sorted(self._recent)
+            count, errors, total, peak = self.count, self.errors, self.total_ms, self.max_ms
+        
+        def pct(q):
+            return round(recent[min(len(recent) - 1, int(q * len(recent)))], 3) if recent else None
+        
+        return {
+            'count': count,
+            'errors': errors,
+            'mean_ms': round(total / count, 3) if count else None,
+            'p50_ms': pct(0.50),
+            'p95_ms': pct(0.95),
+            'max_ms': round(peak, 3)
+        }
+
+
+class PluginConfigStore:
+    """
+    In-memory view of plugins_config.json.
+
+    Reads are dictionary lookups. Writes update memory under a lock and are
+    persisted in batches after flush_delay seconds via write-to-temp + rename,
+    so concurrent updates never lose each other and the file is never torn.
+    """
+    
+    def __init__(self, path: Path, flush_delay: float = 0.5):
+        self.path = Path(path)
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._data = {}
+        self._mtime = None
+        self._dirty = False
+        self._timer = None
+        self.refresh()
+        atexit.register(self.flush)
+    
+    def refresh(self):
+        """Pick up external edits to the file; pending writes take priority"""
+        with self._lock:
+            if self._dirty:
+                return
+            try:
+                mtime = self.path.stat().st_mtime_ns
+            except FileNotFoundError:
+                self._data, self._mtime = {}, None
+                return
+            if mtime != self._mtime:
+                with open(self.path) as f:
+                    self._data = json.load(f)
+                self._mtime = mtime
+    
+    def get(self, plugin_name: str, key: str, default=None):
+        with self._lock:
+            return self._data.get(plugin_name, {}).get(key, default)
+    
+    def is_enabled(self, plugin_name: str) -> bool:
+        # Enabled by default when there is no config entry
+        return self.get(plugin_name, 'enabled', True)
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return json.loads(json.dumps(self._data))
+    
+    def update(self, plugin_name: str, **values):
+        """Merge values into a plugin's entry, keeping its other keys"""
+        with self.transaction() as data:
+            data.setdefault(plugin_name, {}).update(values)
+    
+    @contextmanager
+    def transaction(self):
+        """Mutate the config atomically; persisted with the next batch"""
+        with self._lock:
+            yield self._data
+            self._dirty = True
+            self._schedule_flush()
+    
+    def _schedule_flush(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+    
+    def flush(self):
+        """Write pending changes to disk atomically"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                prefix='.plugins_config.', dir=str(self.path.parent)
+            )
+            try:
+                with os.fdopen(fd, 'w') as f:
+                    json.dump(self._data, f, indent=2)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+            
+            self._mtime = self.path.stat().st_mtime_ns
+            self._dirty = False
+
+
 class PluginManager:
     """Manages plugin discovery, loading, and lifecycle"""
     
@@ -17,144 +250,655 @@ class PluginManager:
         self.plugins_dir = Path(plugins_dir) if plugins_dir else Path(__file__).parent
         self.loaded_plugins = {}
         self.available_plugins = []
+        # Registry caches, revalidated by mtime on each discover
+        self._dir_mtime = None
+        self._plugin_dirs = []
+        self._manifests = {}  # plugin dir name -> (manifest mtime, manifest)
+        self.config = PluginConfigStore(self.plugins_dir.parent / 'plugins_config.json')
+        self.app = None
+        self._routes = []  # (url_prefix, plugin dir name), longest prefix first
+        self._load_lock = threading.RLock()
+        self._watcher = None
+        self._failed_reloads = {}
+        self.request_stats = {}  # plugin dir name -> RequestStats
         
     def discover_plugins(self) -> List[Dict]:
         """Scan plugins directory for available plugins"""
+        # Only re-list the directory when entries were added or removed
+        dir_mtime = self.plugins_dir.stat().st_mtime_ns
+        if dir_mtime != self._dir_mtime:
+            self._plugin_dirs = sorted(
+                p for p in self.plugins_dir.iterdir()
+                if p.is_dir() and not p.name.startswith('_') and p.name != '__pycache__'
+            )
+            self._dir_mtime = dir_mtime
+        
+        self.config.refresh()
         plugins = []
+        seen = set()
         
-        for plugin_dir in self.plugins_dir.iterdir():
-            if not plugin_dir.is_dir():
+        for plugin_dir in self._plugin_dirs:
+            manifest = self._get_manifest(plugin_dir)
+            if manifest is None:
                 continue
-            if plugin_dir.name.startswith('_') or plugin_dir.name == '__pycache__':
-                continue
-                
-            manifest_path = plugin_dir / 'manifest.json'
-            if manifest_path.exists():
-                try:
-                    with open(manifest_path) as f:
-                        manifest = json.load(f)
-                    manifest['path'] = str(plugin_dir)
-                    manifest['enabled'] = self._is_plugin_enabled(manifest['name'])
-                    plugins.append(manifest)
-                except Exception as e:
-                    print(f"Error loading manifest for {plugin_dir.name}: {e}")
+            seen.add(plugin_dir.name)
+            entry = dict(manifest)
+            entry['enabled'] = self.config.is_enabled(entry['name'])
+            plugins.append(entry)
+        
+        for name in set(self._manifests) - seen:
+            del self._manifests[name]
         
         self.available_plugins = plugins
         return plugins
     
+    def _get_manifest(self, plugin_dir: Path) -> Optional[Dict]:
+        """Return the parsed manifest, re-reading only when its mtime changed"""
+        manifest_path = plugin_dir / 'manifest.json'
+        try:
+            mtime = manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._manifests.pop(plugin_dir.name, None)
+            return None
+        
+        cached = self._manifests.get(plugin_dir.name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        
+        try:
+            manifest = _read_manifest(manifest_path)
+            manifest['path'] = str(plugin_dir)
+        except Exception as e:
+            print(f"Error loading manifest for {plugin_dir.name}: {e}")
+            manifest = None
+        
+        self._manifests[plugin_dir.name] = (mtime, manifest)
+        return manifest
+    
     def load_plugin(self, plugin_name: str):
         """Dynamically load a plugin"""
+        with self._load_lock:
+            if plugin_name in self.loaded_plugins:
+                return self.loaded_plugins[plugin_name]['blueprint']
+            
+            plugin_dir = self.plugins_dir / plugin_name
+            
+            if not plugin_dir.exists():
+                raise FileNotFoundError(f"Plugin {plugin_name} not found")
+            
+            # Import plugin module under its own namespace
+            try:
+                entry = self._import_plugin(plugin_name, plugin_dir)
+            except Exception as e:
+                raise ImportError(f"Failed to load plugin {plugin_name}: {e}")
+            if entry is not None:
+                self.loaded_plugins[plugin_name] = entry
+                return entry['blueprint']
+    
+    def _import_plugin(self, plugin_name: str, plugin_dir: Path) -> Optional[Dict]:
+        """Import a plugin and build its registry entry (None without register())"""
+        signature = plugin_source_signature(plugin_dir)
+        modules_before = set(sys.modules)
+        rss_before = current_rss_kb()
+        started = time.perf_counter()
+        
+        plugin_module = import_plugin_module(plugin_name, plugin_dir)
+        if not hasattr(plugin_module, 'register'):
+            return None
+        blueprint = plugin_module.register()
+        
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        rss_after = current_rss_kb()
+        namespace = plugin_package_name(plugin_name)
+        # Third-party modules the plugin dragged in, excluding its own files
+        pulled_in = sorted(
+            m for m in set(sys.modules) - modules_before
+            if m != PLUGIN_NAMESPACE and m != namespace
+            and not m.startswith(namespace + '.')
+        )
+        
+        return {
+            'module': plugin_module,
+            'namespace': namespace,
+            'blueprint': blueprint,
+            'app': None,
+            # Blueprint registered on the main app by mount(); not swappable
+            'mounted': False,
+            'path': str(plugin_dir),
+            'signature': signature,
+            'profile': {
+                'import_ms': round(elapsed_ms, 3),
+                'modules_imported': pulled_in,
+                'module_count': len(pulled_in),
+                'rss_delta_kb': (rss_after - rss_before
+                                 if rss_before is not None and rss_after is not None else None),
+                'loaded_at': datetime.now().isoformat()
+            }
+        }
+    
+    def record_request(self, plugin_name: str, elapsed_ms: float, failed: bool = False):
+        """Record latency of one request served by a plugin"""
+        stats = self.request_stats.get(plugin_name)
+        if stats is None:
+            stats = self.request_stats.setdefault(plugin_name, RequestStats())
+        stats.record(elapsed_ms, failed)
+    
+    def reload_plugin(self, plugin_name: str) -> bool:
+        """
+        Re-import a plugin and swap its dispatch target atomically.
+        
+        The new module namespace and Flask app are built completely before
+        the registry entry is replaced, so requests already running against
+        the old app finish on it. On failure the old version stays live.
+        Only lazily dispatched plugins (manifest url_prefix) can be swapped;
+        blueprints registered directly on the main app need a restart.
+        """
+        if self.needs_restart(plugin_name):
+            print(f"Plugin {plugin_name} is registered on the main app; restart required")
+            return False
+        
+        with self._load_lock:
+            old = self.loaded_plugins.get(plugin_name)
+            plugin_dir = self.plugins_dir / plugin_name
+            previous_modules = purge_plugin_modules(plugin_name)
+            
+            try:
+                if self._is_isolated(plugin_name):
+                    # Fresh workers import the new code; the parent never does
+                    entry = self._isolated_entry(plugin_name)
+                else:
+                    entry = self._import_plugin(plugin_name, plugin_dir)
+                    if entry is None:
+                        raise ImportError('plugin has no register()')
+                    if old is None or old['app'] is not None:
+                        entry['app'] = self._build_plugin_app(plugin_name, entry['blueprint'])
+            except Exception as e:
+                purge_plugin_modules(plugin_name)
+                sys.modules.update(previous_modules)
+                print(f"Reload of plugin {plugin_name} failed: {e}")
+                return False
+            
+            self.loaded_plugins[plugin_name] = entry
+        
+        if old is not None:
+            _teardown(old['module'], old['app'])
+        self.refresh_routes()
+        return True
+    
+    def needs_restart(self, plugin_name: str) -> bool:
+        """Whether a new version of the plugin only takes effect after a restart"""
+        entry = self.loaded_plugins.get(plugin_name)
+        return bool(entry and entry.get('mounted'))
+    
+    def get_plugin_app(self, plugin_name: str):
+        """WSGI app serving a plugin's blueprint, importing the plugin on first use"""
+        entry = self.loaded_plugins.get(plugin_name)
+        if entry and entry['app'] is not None:
+            return entry['app']
+        
+        with self._load_lock:
+            if self._is_isolated(plugin_name):
+                entry = self.loaded_plugins.get(plugin_name)
+                if entry is None:
+                    entry = self._isolated_entry(plugin_name)
+                    self.loaded_plugins[plugin_name] = entry
+                return entry['app']
+            blueprint = self.load_plugin(plugin_name)
+            entry = self.loaded_plugins.get(plugin_name)
+            if entry is None or blueprint is None:
+                raise ImportError(f"Plugin {plugin_name} has no register() blueprint")
+            if entry['app'] is None:
+                entry['app'] = self._build_plugin_app(plugin_name, blueprint)
+            return entry['app']
+    
+    def _is_isolated(self, plugin_name: str) -> bool:
+        """Whether the manifest asks for the plugin to run in worker processes"""
+        manifest = self._get_manifest(self.plugins_dir / plugin_name) or {}
+        return manifest.get('isolation') == 'process'
+    
+    def _isolated_entry(self, plugin_name: str) -> Dict:
+        """
+        Registry entry for a process-isolated plugin.
+        
+        Only the spawned workers import the plugin, so its import side
+        effects and crashes stay out of the server process.
+        """
+        from .plugin_pool import PluginProcessPool
+        
         plugin_dir = self.plugins_dir / plugin_name
+        manifest = self._get_manifest(plugin_dir) or {}
+        return {
+            'module': None,
+            'namespace': plugin_package_name(plugin_name),
+            'blueprint': None,
+            'app': PluginProcessPool(
+                plugin_name,
+                plugin_dir,
+                workers=manifest.get('workers', os.cpu_count() or 2)
+            ),
+            'mounted': False,
+            'path': str(plugin_dir),
+            'signature': plugin_source_signature(plugin_dir),
+            'profile': None
+        }
+    
+    def _build_plugin_app(self, plugin_name: str, blueprint):
+        """Wrap a blueprint in its own Flask app for dispatch"""
+        from flask import Flask
         
-        if not plugin_dir.exists():
-            raise FileNotFoundError(f"Plugin {plugin_name} not found")
+        plugin_app = Flask(
+            plugin_package_name(plugin_name),
+            root_path=str(self.plugins_dir / plugin_name)
+        )
+        if self.app is not None:
+            plugin_app.config.update(self.app.config)
+        plugin_app.register_blueprint(blueprint)
+        return plugin_app
+    
+    def mount(self, app):
+        """
+        Serve plugins through app.
         
-        # Add plugin directory to Python path
-        import sys
-        if str(plugin_dir) not in sys.path:
-            sys.path.insert(0, str(plugin_dir))
+        Plugins whose manifest declares a url_prefix are imported lazily on
+        the first request under that prefix. Others are loaded now and their
+        blueprints registered directly, as before. Process isolation needs a
+        url_prefix; isolated plugins without one are refused.
+        """
+        self.app = app
+        app.wsgi_app = PluginDispatcher(app.wsgi_app, self)
+        self.refresh_routes()
         
-        # Import plugin module
-        try:
-            plugin_module = importlib.import_module('plugin')
-            if hasattr(plugin_module, 'register'):
-                blueprint = plugin_module.register()
-                self.loaded_plugins[plugin_name] = {
-                    'module': plugin_module,
-                    'blueprint': blueprint,
-                    'path': str(plugin_dir)
-                }
-                return blueprint
-        except Exception as e:
-            raise ImportError(f"Failed to load plugin {plugin_name}: {e}")
+        # Blueprint name -> plugin, for timing directly registered plugins
+        blueprint_plugins = {}
+        for plugin in self.available_plugins:
+            if plugin['enabled'] and not plugin.get('url_prefix'):
+                plugin_name = Path(plugin['path']).name
+                if plugin.get('isolation') == 'process':
+                    # Registering on the main app would run it in-process
+                    print(f"Plugin {plugin_name} requests process isolation "
+                          f"but has no url_prefix; not loaded")
+                    continue
+                try:
+                    blueprint = self.load_plugin(plugin_name)
+                    if blueprint is not None:
+                        app.register_blueprint(blueprint)
+                        self.loaded_plugins[plugin_name]['mounted'] = True
+                        blueprint_plugins[blueprint.name] = plugin_name
+                except ImportError as e:
+                    print(e)
+        
+        if blueprint_plugins:
+            self._time_blueprints(app, blueprint_plugins)
+        
+        if app.debug or os.environ.get('KN3AUX_PLUGIN_RELOAD') == '1':
+            self.start_watcher()
+    
+    def _time_blueprints(self, app, blueprint_plugins: Dict):
+        """Record latency for plugin blueprints registered on the main app"""
+        from flask import g, request
+        
+        @app.before_request
+        def _plugin_timer_start():
+            if request.blueprint in blueprint_plugins:
+                g._plugin_timer = time.perf_counter()
+        
+        @app.teardown_request
+        def _plugin_timer_stop(exc):
+            started = g.pop('_plugin_timer', None)
+            if started is not None:
+                self.record_request(
+                    blueprint_plugins[request.blueprint],
+                    (time.perf_counter() - started) * 1000,
+                    failed=exc is not None
+                )
+    
+    def refresh_routes(self):
+        """Rebuild the prefix table used to dispatch lazy plugins"""
+        routes = [
+            (p['url_prefix'].rstrip('/'), Path(p['path']).name)
+            for p in self.discover_plugins()
+            if p['enabled'] and p.get('url_prefix')
+        ]
+        self._routes = sorted(routes, key=lambda r: len(r[0]), reverse=True)
+    
+    def match_route(self, path: str) -> Optional[str]:
+        """Plugin directory name serving path, if any"""
+        for prefix, plugin_name in self._routes:
+            if path == prefix or path.startswith(prefix + '/'):
+                return plugin_name
+        return None
     
     def unload_plugin(self, plugin_name: str):
-        """Unload a plugin"""
-        if plugin_name in self.loaded_plugins:
-            del self.loaded_plugins[plugin_name]
+        """Unload a plugin and drop its modules"""
+        with self._load_lock:
+            entry = self.loaded_plugins.pop(plugin_name, None)
+            if entry is None:
+                return
+            purge_plugin_modules(plugin_name)
+        _teardown(entry['module'], entry['app'])
+    
+    def check_for_changes(self) -> List[str]:
+        """Reload loaded plugins whose source changed; returns reloaded names"""
+        reloaded = []
+        for plugin_name, entry in list(self.loaded_plugins.items()):
+            signature = plugin_source_signature(Path(entry['path']))
+            if signature == entry['signature'] or entry.get('mounted'):
+                continue
+            # Don't retry a broken edit until the files change again
+            if self._failed_reloads.get(plugin_name) == signature:
+                continue
+            if self.reload_plugin(plugin_name):
+                self._failed_reloads.pop(plugin_name, None)
+                reloaded.append(plugin_name)
+            else:
+                self._failed_reloads[plugin_name] = signature
+        return reloaded
+    
+    def start_watcher(self, interval: float = 1.0):
+        """Poll loaded plugin directories and hot-reload on change"""
+        if self._watcher and self._watcher.is_alive():
+            return
+        
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.check_for_changes()
+                except Exception as e:
+                    print(f"Plugin watcher error: {e}")
+        
+        self._watcher = threading.Thread(target=watch, daemon=True)
+        self._watcher.start()
     
     def enable_plugin(self, plugin_name: str):
         """Enable a plugin"""
-        config_path = self.plugins_dir.parent / 'plugins_config.json'
-        config = {}
-        if config_path.exists():
-            with open(config_path) as f:
-                config = json.load(f)
-        config[plugin_name] = {'enabled': True}
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        self.config.update(plugin_name, enabled=True)
+        self.refresh_routes()
     
     def disable_plugin(self, plugin_name: str):
         """Disable a plugin"""
-        config_path = self.plugins_dir.parent / 'plugins_config.json'
-        config = {}
-        if config_path.exists():
-            with open(config_path) as f:
-                config = json.load(f)
-        config[plugin_name] = {'enabled': False}
-        with open(config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        self.config.update(plugin_name, enabled=False)
+        self.refresh_routes()
     
     def _is_plugin_enabled(self, plugin_name: str) -> bool:
         """Check if plugin is enabled"""
-        config_path = self.plugins_dir.parent / 'plugins_config.json'
-        if not config_path.exists():
-            return True  # Enabled by default
-        with open(config_path) as f:
-            config = json.load(f)
-        return config.get(plugin_name, {}).get('enabled', True)
+        return self.config.is_enabled(plugin_name)
     
     def install_plugin(self, plugin_url: str) -> bool:
         """Install plugin from URL (GitHub, etc.)"""
-        import subprocess
-        import tempfile
-        
+        staging = self._new_staging_dir()
         try:
-            # Download plugin
-            with tempfile.TemporaryDirectory() as tmpdir:
-                result = subprocess.run(
-                    ['git', 'clone', '--depth', '1', plugin_url, tmpdir],
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
-                
-                if result.returncode != 0:
-                    return False
-                
-                # Copy to plugins directory
-                plugin_dir = self.plugins_dir / Path(plugin_url).stem
-                subprocess.run(
-                    ['cp', '-r', f'{tmpdir}/.', str(plugin_dir)],
-                    capture_output=True
-                )
-                
-                return True
+            # Clone straight into the staging area; no second copy
+            result = runner.run(
+                ['git', 'clone', '--depth', '1', plugin_url, str(staging)],
+                timeout=60
+            )
+            
+            if not result.ok:
+                print(f"Plugin clone failed: {result.describe()}: {result.tail_text.strip()}")
+                return False
+            
+            self._deploy_staged(staging, Path(plugin_url).stem)
+            return True
         except Exception as e:
             print(f"Plugin installation failed: {e}")
             return False
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    
+    def install_plugin_archive(self, archive_path: str, sha256: str = None) -> Dict:
+        """
+        Install a plugin from a local .zip or .tar(.gz/.bz2/.xz) archive.
+        
+        The archive is verified against sha256 when given and extracted once
+        into a content-addressed cache; installs copy from the cache into a
+        staging directory that is renamed into place, so a failure never
+        leaves a half-installed plugin. Reinstalling a cached archive with a
+        known sha256 skips reading the archive entirely.
+        """
+        cache_root = self.plugins_dir.parent / '.plugin_cache'
+        expected = sha256.lower() if sha256 else None
+        
+        cached_dir = cache_root / expected if expected else None
+        cached = cached_dir is not None and cached_dir.is_dir()
+        
+        if not cached:
+            digest = file_sha256(archive_path)
+            if expected and digest != expected:
+                raise ValueError(f"Checksum mismatch: expected {expected}, got {digest}")
+            cached_dir = cache_root / digest
+            cached = cached_dir.is_dir()
+            if not cached:
+                self._extract_to_cache(archive_path, cache_root, digest)
+        
+        plugin_root = _find_plugin_root(cached_dir)
+        plugin_name = _safe_plugin_dir_name(_read_manifest(plugin_root / 'manifest.json')['name'])
+        
+        staging = None
+        try:
+            staging = self._new_staging_dir()
+            shutil.rmtree(staging)
+            shutil.copytree(plugin_root, staging)
+            target = self._deploy_staged(staging, plugin_name)
+        finally:
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
+        
+        return {
+            'name': plugin_name,
+            'path': str(target),
+            'sha256': cached_dir.name,
+            'cached': cached
+        }
+    
+    def _new_staging_dir(self) -> Path:
+        """Staging directory on the plugins filesystem so rename is atomic"""
+        # Leading underscore keeps discover_plugins from listing it
+        return Path(tempfile.mkdtemp(prefix='_staging-', dir=str(self.plugins_dir)))
+    
+    def _extract_to_cache(self, archive_path: str, cache_root: Path, digest: str):
+        """Extract an archive into cache_root/<digest> atomically"""
+        cache_root.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(prefix='.extract-', dir=str(cache_root)))
+        try:
+            extract_archive(archive_path, tmp_dir)
+            # Archives without a usable manifest never enter the cache
+            _read_manifest(_find_plugin_root(tmp_dir) / 'manifest.json')
+            try:
+                os.rename(tmp_dir, cache_root / digest)
+            except OSError:
+                # Another install populated the same entry first
+                if not (cache_root / digest).is_dir():
+                    raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    def _deploy_staged(self, staging: Path, plugin_name: str) -> Path:
+        """Swap a fully prepared staging directory into plugins/<plugin_name>"""
+        plugin_name = _safe_plugin_dir_name(plugin_name)
+        target = self.plugins_dir / plugin_name
+        retired = None
+        
+        with self._load_lock:
+            if target.exists():
+                retired = Path(tempfile.mkdtemp(prefix='_retired-', dir=str(self.plugins_dir)))
+                os.rmdir(retired)
+                os.rename(target, retired)
+            try:
+                os.rename(staging, target)
+            except OSError:
+                if retired is not None:
+                    os.rename(retired, target)
+                raise
+        
+        if retired is not None:
+            shutil.rmtree(retired, ignore_errors=True)
+        
+        if plugin_name in self.loaded_plugins:
+            self.reload_plugin(plugin_name)
+        self.refresh_routes()
+        return target
     
     def get_plugin_stats(self) -> Dict:
         """Get plugin statistics"""
+        plugins = []
+        for p in self.available_plugins:
+            plugin_name = Path(p['path']).name
+            entry = self.loaded_plugins.get(plugin_name)
+            stats = self.request_stats.get(plugin_name)
+            plugins.append({
+                'name': p.get('name'),
+                'version': p.get('version'),
+                'enabled': p.get('enabled'),
+                'loaded': entry is not None,
+                'profile': entry['profile'] if entry else None,
+                'isolation': p.get('isolation', 'inprocess'),
+                'pool': (entry['app'].stats()
+                         if entry and hasattr(entry['app'], 'stats') else None),
+                'requests': stats.summary() if stats else None
+            })
+        
         return {
             'total_available': len(self.available_plugins),
             'total_loaded': len(self.loaded_plugins),
-            'plugins': [
-                {
-                    'name': p.get('name'),
-                    'version': p.get('version'),
-                    'enabled': p.get('enabled')
-                }
-                for p in self.available_plugins
-            ]
+            'total_import_ms': round(sum(
+                e['profile']['import_ms'] for e in self.loaded_plugins.values() if e['profile']
+            ), 3),
+            'process_rss_kb': current_rss_kb(),
+            'plugins': plugins
         }
 
 
+def file_sha256(path: str) -> str:
+    """Stream a file through SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_archive(archive_path: str, dest: Path):
+    """Extract a zip or tar archive, refusing members that escape dest"""
+    dest = Path(dest).resolve()
+    
+    def check(member_name: str):
+        target = (dest / member_name).resolve()
+        if target != dest and dest not in target.parents:
+            raise ValueError(f"Unsafe path in archive: {member_name}")
+    
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as zf:
+            for member in zf.namelist():
+                check(member)
+            zf.extractall(dest)
+    elif tarfile.is_tarfile(archive_path):
+        with tarfile.open(archive_path) as tf:
+            for member in tf.getmembers():
+                check(member.name)
+                if member.issym():
+                    check(os.path.join(os.path.dirname(member.name), member.linkname))
+                elif member.islnk():
+                    # Hardlink targets are relative to the archive root
+                    check(member.linkname)
+                elif not (member.isfile() or member.isdir()):
+                    raise ValueError(f"Unsupported archive member: {member.name}")
+            if hasattr(tarfile, 'data_filter'):
+                # 3.11.4+: also strips setuid bits and absolute/outside links
+                tf.extractall(dest, filter='data')
+            else:
+                tf.extractall(dest)
+    else:
+        raise ValueError(f"Unsupported archive format: {archive_path}")
+
+
+def _find_plugin_root(extracted: Path) -> Path:
+    """Directory holding manifest.json: the top level or a single wrapper dir"""
+    if (extracted / 'manifest.json').exists():
+        return extracted
+    entries = [p for p in extracted.iterdir() if p.name != '__MACOSX']
+    if len(entries) == 1 and (entries[0] / 'manifest.json').exists():
+        return entries[0]
+    raise ValueError("Archive does not contain a plugin manifest.json")
+
+
+def _read_manifest(manifest_path: Path) -> Dict:
+    """Parse manifest.json; ValueError unless it is an object with a string name"""
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get('name'), str):
+        raise ValueError('manifest must be an object with a string "name"')
+    return manifest
+
+
+def _safe_plugin_dir_name(name: str) -> str:
+    """Validate a plugin directory name derived from a URL or manifest"""
+    name = re.sub(r'[^\w.-]', '_', name or '')
+    if not name or name.startswith(('_', '.')):
+        raise ValueError(f"Invalid plugin name: {name!r}")
+    return name
+
+
+def _teardown(plugin_module, plugin_app=None):
+    """Give an outgoing plugin module the chance to release resources"""
+    # Process pools stop their workers once in-flight requests finish
+    if hasattr(plugin_app, 'close'):
+        plugin_app.close()
+    teardown = getattr(plugin_module, 'teardown', None)
+    if callable(teardown):
+        try:
+            teardown()
+        except Exception as e:
+            print(f"Plugin teardown failed: {e}")
+
+
+class PluginDispatcher:
+    """WSGI middleware routing plugin URL prefixes to lazily built plugin apps"""
+    
+    def __init__(self, app, manager: PluginManager):
+        self.app = app
+        self.manager = manager
+    
+    def __call__(self, environ, start_response):
+        plugin_name = self.manager.match_route(environ.get('PATH_INFO', ''))
+        if plugin_name is None:
+            return self.app(environ, start_response)
+        
+        try:
+            plugin_app = self.manager.get_plugin_app(plugin_name)
+        except (ImportError, FileNotFoundError) as e:
+            body = json.dumps({'error': str(e)}).encode()
+            start_response('503 Service Unavailable', [
+                ('Content-Type', 'application/json'),
+                ('Content-Length', str(len(body)))
+            ])
+            return [body]
+        
+        # Time the handler only; first-hit import cost is in the load profile
+        status = {}
+        
+        def capture_status(status_line, headers, exc_info=None):
+            status['code'] = status_line[:3]
+            return start_response(status_line, headers, exc_info)
+        
+        started = time.perf_counter()
+        try:
+            return plugin_app(environ, capture_status)
+        finally:
+            self.manager.record_request(
+                plugin_name,
+                (time.perf_counter() - started) * 1000,
+                failed=status.get('code', '500').startswith('5')
+            )
+
+
 # Flask integration
 def create_plugin_routes(app, plugin_manager: PluginManager):
     """Create Flask routes for plugin management"""
     from flask import jsonify, request
     
+    plugin_manager.mount(app)
+    
     @app.route('/api/plugins', methods=['GET'])
     def list_plugins():
         """List all available plugins"""
@@ -178,13 +922,31 @@ def create_plugin_routes(app, plugin_manager: PluginManager):
         plugin_manager.disable_plugin(name)
         return jsonify({'status': 'ok', 'message': f'{name} disabled'})
     
+    @app.route('/api/plugins/<name>/reload', methods=['POST'])
+    def reload_plugin(name):
+        """Hot-reload a plugin"""
+        if plugin_manager.needs_restart(name):
+            return jsonify({'error': f'{name} is registered on the main app; restart required'}), 409
+        if plugin_manager.reload_plugin(name):
+            return jsonify({'status': 'ok', 'message': f'{name} reloaded'})
+        return jsonify({'error': f'Reload of {name} failed'}), 500
+    
     @app.route('/api/plugins/install', methods=['POST'])
     def install_plugin():
-        """Install plugin from URL"""
-        data = request.get_json()
+        """Install plugin from URL or local archive"""
+        data = request.get_json() or {}
         url = data.get('url')
+        archive = data.get('archive')
+        
+        if archive:
+            try:
+                installed = plugin_manager.install_plugin_archive(archive, data.get('sha256'))
+            except (OSError, ValueError) as e:
+                return jsonify({'error': str(e)}), 400
+            return jsonify({'status': 'ok', 'message': 'Plugin installed', **installed})
+        
         if not url:
-            return jsonify({'error': 'URL required'}), 400
+            return jsonify({'error': 'URL or archive required'}), 400
         
         success = plugin_manager.install_plugin(url)
         if success:
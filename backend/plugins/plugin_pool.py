@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Plugin Process Pool
+Runs a plugin's request handlers in worker processes, off the main GIL
+"""
+
+import json
+import multiprocessing
+import threading
+from pathlib import Path
+from queue import Queue, Empty
+from typing import Dict, List
+
+# Request headers forwarded from the WSGI environ besides HTTP_*
+_CONTENT_HEADERS = {'CONTENT_TYPE': 'Content-Type', 'CONTENT_LENGTH': 'Content-Length'}
+
+
+class _Worker:
+    """One worker process and the parent end of its pipe"""
+
+    def __init__(self, ctx, plugin_name: str, plugin_dir: str):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, plugin_name, plugin_dir),
+            name=f'plugin-{plugin_name}',
+            daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def stop(self, timeout: float = 5):
+        try:
+            self.conn.send(None)
+        except (OSError, EOFError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class PluginProcessPool:
+    """
+    WSGI app that marshals each request to a pool of plugin processes.
+
+    Requests and responses travel over pipes as plain tuples, so responses
+    are buffered in full; streaming endpoints should stay in-process. A
+    worker that dies is replaced and the request gets a 502.
+    """
+
+    def __init__(self, plugin_name: str, plugin_dir: str, workers: int = 2,
+                 timeout: float = 300):
+        self.plugin_name = plugin_name
+        self.plugin_dir = str(plugin_dir)
+        self.size = max(1, int(workers))
+        self.timeout = timeout
+        # spawn: forking a threaded Flask process is unsafe
+        self._ctx = multiprocessing.get_context('spawn')
+        self._idle = Queue()
+        self._closed = False
+        self.restarts = 0
+        for _ in range(self.size):
+            self._idle.put(_Worker(self._ctx, plugin_name, self.plugin_dir))
+
+    def __call__(self, environ, start_response):
+        if self._closed:
+            return _error(start_response, '503 Service Unavailable', 'Plugin pool closed')
+
+        request = _marshal_request(environ)
+        try:
+            worker = self._idle.get(timeout=self.timeout)
+        except Empty:
+            return _error(start_response, '503 Service Unavailable', 'All plugin workers busy')
+
+        try:
+            worker.conn.send(request)
+            if not worker.conn.poll(self.timeout):
+                raise TimeoutError('Plugin worker timed out')
+            status, headers, body = worker.conn.recv()
+        except (OSError, EOFError, TimeoutError) as e:
+            worker.process.kill()
+            worker = self._replace(worker)
+            return _error(start_response, '502 Bad Gateway', f'Plugin worker failed: {e}')
+        finally:
+            self._idle.put(worker)
+
+        start_response(status, headers)
+        return [body]
+
+    def _replace(self, worker: _Worker) -> _Worker:
+        worker.process.join(1)
+        worker.conn.close()
+        self.restarts += 1
+        return _Worker(self._ctx, self.plugin_name, self.plugin_dir)
+
+    def close(self):
+        """Stop workers once in-flight requests have returned them"""
+        self._closed = True
+
+        def drain():
+            for _ in range(self.size):
+                try:
+                    self._idle.get(timeout=self.timeout).stop()
+                except Empty:
+                    break
+
+        threading.Thread(target=drain, daemon=True).start()
+
+    def stats(self) -> Dict:
+        return {
+            'workers': self.size,
+            'idle': self._idle.qsize(),
+            'restarts': self.restarts
+        }
+
+
+def _marshal_request(environ) -> Dict:
+    """Reduce a WSGI environ to picklable request data"""
+    headers = [
+        (key[5:].replace('_', '-').title(), value)
+        for key, value in environ.items() if key.startswith('HTTP_')
+    ]
+    headers += [
+        (name, environ[key]) for key, name in _CONTENT_HEADERS.items() if environ.get(key)
+    ]
+
+    try:
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        length = 0
+    body = environ['wsgi.input'].read(length) if length else b''
+
+    return {
+        'method': environ.get('REQUEST_METHOD', 'GET'),
+        'path': environ.get('SCRIPT_NAME', '') + environ.get('PATH_INFO', ''),
+        'query_string': environ.get('QUERY_STRING', ''),
+        'headers': headers,
+        'body': body,
+        'scheme': environ.get('wsgi.url_scheme', 'http'),
+        'remote_addr': environ.get('REMOTE_ADDR')
+    }
+
+
+def _error(start_response, status: str, message: str) -> List[bytes]:
+    body = json.dumps({'error': message}).encode()
+    start_response(status, [
+        ('Content-Type', 'application/json'),
+        ('Content-Length', str(len(body)))
+    ])
+    return [body]
+
+
+def _worker_main(conn, plugin_name: str, plugin_dir: str):
+    """Worker process: load the plugin once, then serve marshalled requests"""
+    from flask import Flask
+    from .plugin_manager import import_plugin_module, plugin_package_name
+
+    module = import_plugin_module(plugin_name, Path(plugin_dir))
+    app = Flask(plugin_package_name(plugin_name), root_path=plugin_dir)
+    app.register_blueprint(module.register())
+    client = app.test_client()
+
+    while True:
+        try:
+            request = conn.recv()
+        except EOFError:
+            break
+        if request is None:
+            break
+
+        try:
+            response = client.open(
+                request['path'],
+                method=request['method'],
+                query_string=request['query_string'],
+                headers=request['headers'],
+                data=request['body'],
+                base_url=f"{request['scheme']}://localhost",
+                environ_overrides={'REMOTE_ADDR': request['remote_addr'] or ''}
+            )
+            # Streamed responses are buffered here, so set the real length
+            body = response.get_data()
+            headers = [(k, v) for k, v in response.headers if k.lower() != 'content-length']
+            headers.append(('Content-Length', str(len(body))))
+            conn.send((response.status, headers, body))
+        except Exception as e:
+            body = json.dumps({'error': f'Plugin worker error: {type(e).__name__}: {e}'}).encode()
+            conn.send(('500 INTERNAL SERVER ERROR',
+                       [('Content-Type', 'application/json'),
+                        ('Content-Length', str(len(body)))], body))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+KN3AUX-CODE Backend Server
+Production entry point: evented workers when gevent is installed, threads otherwise
+
+With gevent every connection is a greenlet, so open SSE streams and requests
+waiting on long device commands cost a few KB each instead of an OS thread.
+Without it, the threaded server still works but pins one thread per client.
+
+    python3 serve.py                      # auto: gevent if available
+    python3 serve.py --mode threaded --port 5000
+    python3 serve.py --app app:app        # serve an existing app object
+
+Backup downloads are handed to the server as wsgi.file_wrapper bodies. Under
+gunicorn (e.g. gunicorn -k gevent 'serve:create_app()') they go out with
+sendfile(2); the servers above copy them in 1 MB blocks.
+"""
+
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+
+DEFAULT_HOST = os.environ.get('KN3AUX_HOST', '0.0.0.0')
+DEFAULT_PORT = int(os.environ.get('KN3AUX_PORT', '5000'))
+
+
+def evented_available() -> bool:
+    """Whether the gevent server can be used"""
+    return importlib.util.find_spec('gevent') is not None
+
+
+def resolve_mode(mode: str = 'auto') -> str:
+    """Pick 'gevent' or 'threaded'"""
+    if mode == 'auto':
+        return 'gevent' if evented_available() else 'threaded'
+    if mode == 'gevent' and not evented_available():
+        raise RuntimeError('gevent is not installed (pip install gevent)')
+    return mode
+
+
+def prepare_mode(mode: str):
+    """
+    Patch the standard library for gevent before the app is imported.
+
+    Threads, subprocess pipes, select and queues used by the MTK executor,
+    hotplug watcher and process runner all become cooperative.
+    """
+    if mode == 'gevent':
+        from gevent import monkey
+        monkey.patch_all()
+
+
+def create_app():
+    """Build the backend app with the device, MTK and plugin routes"""
+    from flask import Flask
+    from core.device_intelligence import create_device_routes
+    from plugins.mtk_tool import init_mtk_tool
+    from plugins.plugin_manager import plugin_manager, create_plugin_routes
+
+    app = Flask('kn3aux')
+    create_device_routes(app)
+    init_mtk_tool(app)
+    create_plugin_routes(app, plugin_manager)
+    return app
+
+
+def load_app(target: str = None):
+    """create_app(), or the app named by 'module:attribute'"""
+    if not target:
+        return create_app()
+    module_name, _, attribute = target.partition(':')
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute or 'app')
+
+
+class Server:
+    """Small wrapper so both server kinds start and stop the same way"""
+
+    def __init__(self, app, host: str, port: int, mode: str, access_log: bool = True):
+        self.mode = mode
+        if mode == 'gevent':
+            from gevent.pywsgi import WSGIServer
+            self._server = WSGIServer((host, port), app, log='default' if access_log else None)
+            self._server.init_socket()
+        else:
+            from werkzeug.serving import make_server, WSGIRequestHandler
+
+            class Handler(WSGIRequestHandler):
+                def log_request(self, *args, **kwargs):
+                    if access_log:
+                        super().log_request(*args, **kwargs)
+
+            self._server = make_server(host, port, app, threaded=True, request_handler=Handler)
+        self.port = self._server.server_port
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        if self.mode == 'gevent':
+            self._server.stop()
+        else:
+            self._server.shutdown()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Run the KN3AUX-CODE backend')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--mode', choices=['auto', 'gevent', 'threaded'], default='auto')
+    parser.add_argument('--app', help="serve 'module:attribute' instead of create_app()")
+    args = parser.parse_args(argv)
+
+    mode = resolve_mode(args.mode)
+    prepare_mode(mode)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    server = Server(load_app(args.app), args.host, args.port, mode)
+    print(f"KN3AUX-CODE backend on http://{args.host}:{server.port} ({mode})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
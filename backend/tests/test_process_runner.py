@@ -0,0 +1,53 @@
+"""Pooled adb shell sessions, against a fake adb that runs a local sh"""
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.process_runner import PooledShellBackend, ProcessRunner  # noqa: E402
+
+
+class PooledShellTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.adb = os.path.join(self.tmp.name, 'adb')
+        with open(self.adb, 'w') as f:
+            f.write('#!/bin/sh\nexec sh\n')
+        os.chmod(self.adb, os.stat(self.adb).st_mode | stat.S_IXUSR)
+        self.backend = PooledShellBackend()
+        self.runner = ProcessRunner(self.backend)
+
+    def tearDown(self):
+        self.runner.close()
+        self.tmp.cleanup()
+
+    def shell(self, command, **kwargs):
+        return self.runner.run([self.adb, 'shell', command], timeout=10, **kwargs)
+
+    def test_state_does_not_carry_over(self):
+        self.assertTrue(self.shell('cd / && export KN3AUX_X=1 && set -e').ok)
+        self.assertEqual(self.shell('pwd').text.strip(), os.getcwd())
+        self.assertEqual(self.shell('echo "[$KN3AUX_X]"').text.strip(), '[]')
+        self.assertEqual(self.shell('false; echo still').text.strip(), 'still')
+
+    def test_exit_keeps_session(self):
+        self.assertEqual(self.shell('exit 3').returncode, 3)
+        self.assertEqual(self.shell('echo hi').text, 'hi\n')
+        self.assertEqual(self.backend.sessions_started, 1)
+
+    def test_stderr_kept_apart(self):
+        result = self.shell('echo out; echo err >&2; exit 2')
+        self.assertEqual(result.returncode, 2)
+        self.assertEqual(result.text, 'out\n')
+        self.assertEqual(result.stderr_text, 'err\n')
+        merged = self.shell('echo out; echo err >&2', merge_stderr=True)
+        self.assertEqual(merged.text, 'out\nerr\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,6 +11,13 @@ import {
   Globe, Server, Database, Cloud, WifiOff
 } from 'lucide-react';
 
+// Profile keys this page renders; the rest of the profile isn't fetched
+const DEVICE_FIELDS = [
+  'brand', 'model', 'codename', 'android_version', 'security_patch',
+  'build_id', 'bootloader', 'chipset', 'hardware', 'cpu_abi',
+  'rooted', 'bootloader_unlocked', 'carrier_locked', 'frp_locked'
+].join(',');
+
 // Device Intelligence Dashboard Component
 export default function DeviceIntelligenceDashboard() {
   const [deviceInfo, setDeviceInfo] = useState(null);
@@ -24,10 +31,13 @@ export default function DeviceIntelligenceDashboard() {
     detectDevice();
   }, []);
 
-  const detectDevice = async () => {
+  // The browser revalidates with the ETag, so an unchanged profile is a 304
+  const detectDevice = async (refresh = false) => {
     setLoading(true);
     try {
-      const response = await fetch('/api/device/detect');
+      const params = new URLSearchParams({ fields: DEVICE_FIELDS });
+      if (refresh) params.set('refresh', '1');
+      const response = await fetch(`/api/device/detect?${params}`);
       const data = await response.json();
       setDeviceInfo(data);
       
@@ -87,7 +97,7 @@ export default function DeviceIntelligenceDashboard() {
           <Smartphone className="w-16 h-16 text-slate-600 mx-auto mb-4" />
           <p className="text-slate-400 mb-4">No device detected</p>
           <button
-            onClick={detectDevice}
+            onClick={() => detectDevice(true)}
             className="px-6 py-3 bg-emerald-600 hover:bg-emerald-500 text-white rounded-xl transition-all"
           >
             Detect Device
@@ -115,7 +125,7 @@ export default function DeviceIntelligenceDashboard() {
           </div>
           
           <button
-            onClick={detectDevice}
+            onClick={() => detectDevice(true)}
             className="p-3 hover:bg-slate-800 rounded-xl transition-colors"
             title="Refresh"
           >
@@ -17,6 +17,20 @@ const MTKDashboard = () => {
 
   useEffect(() => {
     checkDevice();
+
+    // Hotplug events replace polling: re-check only when an MTK device comes or goes
+    const events = new EventSource('/api/mtk/devices/events');
+    const onChange = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.device?.vendor_id === '0e8d') {
+        addLog(`${data.event === 'attach' ? '🔌 Attached' : '⏏ Detached'}: ${data.device.usb_id}`);
+        checkDevice();
+      }
+    };
+    events.addEventListener('attach', onChange);
+    events.addEventListener('detach', onChange);
+
+    return () => events.close();
   }, []);
 
   const checkDevice = async () => {
@@ -78,8 +92,10 @@ const MTKDashboard = () => {
     };
     
     eventSource.onerror = () => {
-      eventSource.close();
-      addLog('--- Stream Ended ---');
+      // The browser retries on its own and resumes from the last event id
+      if (eventSource.readyState === EventSource.CLOSED) {
+        addLog('--- Stream Ended ---');
+      }
     };
   };
 
@@ -109,9 +125,8 @@ const MTKDashboard = () => {
 
   const handleDumpAll = async () => {
     try {
-      await runCommand('dump-all', {
-        output_dir: '~/kn3aux_backups/mtk_dump'
-      });
+      // Backend picks a fresh timestamped directory and catalogs it
+      await runCommand('dump-all');
     } catch (err) {
       // Error already logged
     }
@@ -343,7 +358,7 @@ const MTKDashboard = () => {
                 steps={[
                   'Click "Dump All Partitions"',
                   'Wait for dump to complete (10-30 min)',
-                  'Find backups in ~/kn3aux_backups/mtk_dump/',
+                  'Find backups in ~/kn3aux_backups/mtk_dump/<timestamp>/',
                   'Verify backup integrity'
                 ]}
                 warning="Requires sufficient storage space"